@@ -0,0 +1,52 @@
+"""
+同期スタックと非同期スタック (USE_ASYNC_DB=true) の負荷比較
+
+2つのサーバーを起動してから実行する:
+    cd backend/v1
+    USE_ASYNC_DB=false uvicorn main:app --port 8000
+    USE_ASYNC_DB=true uvicorn main:app --port 8001
+    python ../bench/async_vs_sync.py --author-uuid <uuid>
+"""
+
+import argparse
+import asyncio
+import json
+
+import httpx
+
+from common import run_closed_loop
+
+
+async def bench_stack(base_url: str, path: str, concurrency: int, duration: float):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+
+        async def request() -> bool:
+            response = await client.get(path)
+            return response.status_code == 200
+
+        return await run_closed_loop(request, concurrency=concurrency, duration=duration)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sync-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--async-url", default="http://127.0.0.1:8001")
+    parser.add_argument("--author-uuid", required=True)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[50, 100, 200, 500])
+    parser.add_argument("--duration", type=float, default=15.0)
+    args = parser.parse_args()
+
+    path = f"/api/v1/todos/{args.author_uuid}?limit=50"
+    results = []
+    for concurrency in args.concurrency:
+        for stack, url in (("sync", args.sync_url), ("async", args.async_url)):
+            summary = await bench_stack(url, path, concurrency, args.duration)
+            results.append({"stack": stack, "concurrency": concurrency, **summary})
+            print(json.dumps(results[-1]), flush=True)
+
+    print(json.dumps({"path": path, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
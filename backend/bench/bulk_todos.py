@@ -0,0 +1,88 @@
+"""
+Todo の1件ずつ作成と /todos/bulk による一括作成の比較
+
+サーバーを起動してから実行する:
+    cd backend/v1
+    uvicorn main:app --port 8000
+    python ../bench/bulk_todos.py --author-uuid <uuid> --count 1000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+
+def make_todos(author_uuid: str, count: int, prefix: str) -> list[dict]:
+    limit_date = (datetime.now(timezone.utc) + timedelta(days=7)).isoformat()
+    return [
+        {
+            "title": f"{prefix}-{i}",
+            "description": "bench",
+            "limit_date": limit_date,
+            "author_uuid": author_uuid,
+        }
+        for i in range(count)
+    ]
+
+
+async def one_by_one(client: httpx.AsyncClient, todos: list[dict]) -> float:
+    start = time.perf_counter()
+    for todo in todos:
+        response = await client.post("/api/v1/todos", json=todo)
+        response.raise_for_status()
+    return time.perf_counter() - start
+
+
+async def bulk(client: httpx.AsyncClient, todos: list[dict], chunk_size: int) -> float:
+    start = time.perf_counter()
+    for i in range(0, len(todos), chunk_size):
+        response = await client.post("/api/v1/todos/bulk", json=todos[i : i + chunk_size])
+        response.raise_for_status()
+    return time.perf_counter() - start
+
+
+async def cleanup(client: httpx.AsyncClient, author_uuid: str, prefix: str) -> None:
+    response = await client.get(f"/api/v1/todos/{author_uuid}", params={"limit": 100000})
+    response.raise_for_status()
+    ids = [todo["id"] for todo in response.json() if todo["title"].startswith(prefix)]
+    if ids:
+        response = await client.request("DELETE", "/api/v1/todos/bulk", json={"ids": ids})
+        response.raise_for_status()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--author-uuid", required=True)
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    prefix = f"bulk-bench-{int(time.time())}"
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=120) as client:
+        single = await one_by_one(client, make_todos(args.author_uuid, args.count, prefix))
+        batched = await bulk(
+            client, make_todos(args.author_uuid, args.count, prefix), args.chunk_size
+        )
+        await cleanup(client, args.author_uuid, prefix)
+
+    print(
+        json.dumps(
+            {
+                "count": args.count,
+                "chunk_size": args.chunk_size,
+                "one_by_one_seconds": round(single, 3),
+                "bulk_seconds": round(batched, 3),
+                "speedup": round(single / batched, 1) if batched else None,
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
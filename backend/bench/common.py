@@ -0,0 +1,65 @@
+"""ベンチマーク共通の計測ユーティリティ"""
+
+import asyncio
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+
+def percentile(samples: list[float], p: float) -> float:
+    """最近傍法によるパーセンタイル (samples は昇順でなくてもよい)"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, math.ceil(p / 100 * len(ordered)) - 1)
+    return ordered[rank]
+
+
+@dataclass
+class LatencyStats:
+    samples: list[float] = field(default_factory=list)
+    errors: int = 0
+
+    def add(self, seconds: float, ok: bool = True) -> None:
+        self.samples.append(seconds)
+        if not ok:
+            self.errors += 1
+
+    def summary(self, elapsed: float) -> dict:
+        count = len(self.samples)
+        return {
+            "requests": count,
+            "errors": self.errors,
+            "rps": round(count / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": round(percentile(self.samples, 50) * 1000, 2),
+            "p95_ms": round(percentile(self.samples, 95) * 1000, 2),
+            "p99_ms": round(percentile(self.samples, 99) * 1000, 2),
+        }
+
+
+async def run_closed_loop(
+    request: Callable[[], Awaitable[bool]],
+    *,
+    concurrency: int,
+    duration: float,
+) -> dict:
+    """
+    concurrency 個のクライアントが duration 秒間リクエストを送り続ける
+    - request は成功した場合 True を返すコルーチン関数
+    """
+    stats = LatencyStats()
+    deadline = time.perf_counter() + duration
+
+    async def client() -> None:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                ok = await request()
+            except Exception:
+                ok = False
+            stats.add(time.perf_counter() - started, ok)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return stats.summary(time.perf_counter() - started)
@@ -0,0 +1,145 @@
+"""
+一覧レスポンスの圧縮方式・レベル毎の CPU 時間と削減バイト数の比較
+- Todo 一覧 (view=full / view=summary) とユーザー一覧と同じ形の JSON を件数毎に作成して計測する
+- ndjson-stream はエクスポートと同じく EXPORT_BATCH_SIZE 行毎に flush した場合
+- saved_kb_per_cpu_ms が大きいほど CPU 時間あたりの転送量削減が大きい
+
+    cd backend/v1
+    python ../bench/compression.py --rows 50 1000 --iterations 20
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "v1"))
+
+import orjson  # noqa: E402
+
+from core.compression import (  # noqa: E402
+    BrotliEncoder,
+    GzipEncoder,
+    ZstdEncoder,
+    available_encodings,
+)
+from crud.todo import TODO_SUMMARY_FIELDS  # noqa: E402
+
+LEVELS = {
+    "gzip": (GzipEncoder, [1, 6, 9]),
+    "br": (BrotliEncoder, [1, 4, 6, 11]),
+    "zstd": (ZstdEncoder, [1, 3, 9, 19]),
+}
+
+
+def todo_rows(count: int) -> list[dict]:
+    now = datetime.now(timezone.utc)
+    author_uuid = str(uuid4())
+    return [
+        {
+            "id": str(uuid4()),
+            "title": f"買い物リスト {i}",
+            "description": f"牛乳、卵、パンを買う (メモ {i})" if i % 3 else None,
+            "completed": i % 2 == 0,
+            "limit_date": (now + timedelta(days=i % 14)).isoformat(),
+            "created_at": (now - timedelta(days=i % 30)).isoformat(),
+            "updated_at": now.isoformat(),
+            "author_uuid": author_uuid,
+            "author": {"uuid": author_uuid, "email": "user@example.com"},
+        }
+        for i in range(count)
+    ]
+
+
+def user_rows(count: int) -> list[dict]:
+    now = datetime.now(timezone.utc).isoformat()
+    return [
+        {
+            "uuid": str(uuid4()),
+            "email": f"user{i:06d}@example.com",
+            "is_active": True,
+            "is_superuser": i % 50 == 0,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(count)
+    ]
+
+
+def payloads(count: int, batch_size: int) -> dict[str, list[bytes]]:
+    """ペイロード名 -> 送信するチャンクの一覧"""
+    todos = todo_rows(count)
+    summary = [{key: row[key] for key in TODO_SUMMARY_FIELDS} for row in todos]
+    ndjson = [
+        b"".join(orjson.dumps(row) + b"\n" for row in todos[i : i + batch_size])
+        for i in range(0, count, batch_size)
+    ]
+    return {
+        "todos-full": [orjson.dumps({"data": todos, "count": count})],
+        "todos-summary": [orjson.dumps({"data": summary, "count": count})],
+        "users": [orjson.dumps({"data": user_rows(count), "count": count})],
+        "ndjson-stream": ndjson,
+    }
+
+
+def compress(encoder, chunks: list[bytes]) -> int:
+    size = 0
+    for chunk in chunks[:-1]:
+        size += len(encoder.compress(chunk) + encoder.flush())
+    size += len(encoder.compress(chunks[-1]) + encoder.finish())
+    return size
+
+
+def measure(factory, level: int, chunks: list[bytes], iterations: int) -> dict:
+    original = sum(len(chunk) for chunk in chunks)
+    timings = []
+    size = 0
+    for _ in range(iterations):
+        started = time.perf_counter()
+        size = compress(factory(level), chunks)
+        timings.append((time.perf_counter() - started) * 1000)
+    median_ms = statistics.median(timings)
+    saved = original - size
+    return {
+        "median_ms": round(median_ms, 3),
+        "bytes": size,
+        "ratio": round(original / size, 2) if size else 0.0,
+        "saved_kb_per_cpu_ms": round(saved / 1024 / median_ms, 1) if median_ms else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[50, 1000])
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    supported = available_encodings()
+    results = []
+    for count in args.rows:
+        for name, chunks in payloads(count, args.batch_size).items():
+            result = {
+                "payload": name,
+                "rows": count,
+                "original_bytes": sum(len(chunk) for chunk in chunks),
+                "chunks": len(chunks),
+                "encodings": {},
+            }
+            for encoding, (factory, levels) in LEVELS.items():
+                if encoding not in supported:
+                    continue
+                for level in levels:
+                    result["encodings"][f"{encoding}-{level}"] = measure(
+                        factory, level, chunks, args.iterations
+                    )
+            results.append(result)
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Todo一覧1ページあたりのシリアライズ時間の比較
+- before: ORM で取得し List[TodoRead] で検証して jsonable_encoder + json.dumps
+  (response_model を使う FastAPI の既定の処理と同じ手順)
+- after: Core の select で必要な列だけ取得し orjson.dumps
+- summary: after と同じ手順で view=summary の項目だけを取得 (user との JOIN なし)
+
+    cd backend/v1
+    python ../bench/list_serialization.py --author-uuid <uuid> --seed 1000 --limit 1000
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from typing import List
+from uuid import uuid4
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "v1"))
+
+import orjson  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from sqlmodel import Session, delete  # noqa: E402
+
+import models.User  # noqa: E402,F401
+from crud.todo import (  # noqa: E402
+    TODO_SUMMARY_FIELDS,
+    get_todo_rows,
+    get_todos_by_author_uuid,
+)
+from crud.todo_bulk import insert_statement  # noqa: E402
+from db.session import engine  # noqa: E402
+from models.Todo import Todo, TodoRead  # noqa: E402
+
+todo_list = TypeAdapter(List[TodoRead])
+
+
+def before(db: Session, author_uuid: str, limit: int) -> bytes:
+    todos = get_todos_by_author_uuid(db=db, author_uuid=author_uuid, limit=limit)
+    validated = todo_list.validate_python(todos, from_attributes=True)
+    return json.dumps(jsonable_encoder(validated)).encode()
+
+
+def after(db: Session, author_uuid: str, limit: int) -> bytes:
+    return orjson.dumps(get_todo_rows(db=db, author_uuid=author_uuid, limit=limit))
+
+
+def summary(db: Session, author_uuid: str, limit: int) -> bytes:
+    return orjson.dumps(
+        get_todo_rows(
+            db=db, author_uuid=author_uuid, limit=limit, fields=TODO_SUMMARY_FIELDS
+        )
+    )
+
+
+def measure(fn, author_uuid: str, limit: int, iterations: int) -> dict:
+    timings = []
+    size = 0
+    for _ in range(iterations):
+        # 毎回新しいセッションを使い、identity map のキャッシュを効かせない
+        with Session(engine) as db:
+            started = time.perf_counter()
+            size = len(fn(db, author_uuid, limit))
+            timings.append((time.perf_counter() - started) * 1000)
+    return {
+        "median_ms": round(statistics.median(timings), 2),
+        "min_ms": round(min(timings), 2),
+        "bytes": size,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--author-uuid", required=True)
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument(
+        "--seed", type=int, default=0, help="計測用に一時的に作成するTodoの件数"
+    )
+    args = parser.parse_args()
+
+    prefix = f"serialization-bench-{uuid4().hex[:8]}"
+    if args.seed:
+        now = datetime.now(timezone.utc)
+        rows = [
+            {
+                "id": uuid4(),
+                "title": f"{prefix}-{i}",
+                "description": "bench " * 10,
+                "completed": i % 2 == 0,
+                "limit_date": now,
+                "created_at": now,
+                "updated_at": now,
+                "author_uuid": args.author_uuid,
+            }
+            for i in range(args.seed)
+        ]
+        with Session(engine) as db:
+            db.exec(insert_statement(rows))
+            db.commit()
+
+    try:
+        # 接続の確立などを計測から除くため1回ずつ実行しておく
+        with Session(engine) as db:
+            before(db, args.author_uuid, args.limit)
+            after(db, args.author_uuid, args.limit)
+        results = {
+            "limit": args.limit,
+            "before": measure(before, args.author_uuid, args.limit, args.iterations),
+            "after": measure(after, args.author_uuid, args.limit, args.iterations),
+            "summary": measure(summary, args.author_uuid, args.limit, args.iterations),
+        }
+        results["speedup"] = round(
+            results["before"]["median_ms"] / results["after"]["median_ms"], 1
+        )
+        print(json.dumps(results, indent=2))
+    finally:
+        if args.seed:
+            with Session(engine) as db:
+                db.exec(delete(Todo).where(Todo.title.startswith(prefix)))
+                db.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+HTTP 負荷試験: seed.py で作成したユーザーでシナリオを再生し、ルート毎の結果を JSON で出力する
+- 仮想ユーザーは計測前にログインし、計測中は --mix の比率で操作を選び続ける (closed loop)
+- edit / delete は仮想ユーザー自身が作成したTodoに対してのみ行う (seed のデータは変更しない)
+- 出力にはコミットのハッシュを含めるため、コミット間の比較に使える
+
+    cd backend/v1
+    uvicorn main:app --port 8000
+    python ../bench/seed.py --users 1000 --todos-per-user 50
+    python ../bench/load.py --concurrency 50 --duration 30 --output ../bench/results/load.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import time
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+from common import LatencyStats
+
+# シナリオ毎の操作の比率
+MIXES = {
+    "read_heavy": {"list": 60, "me": 20, "create": 10, "edit": 6, "delete": 4},
+    "write_heavy": {"list": 30, "me": 10, "create": 30, "edit": 20, "delete": 10},
+    "list_only": {"list": 100},
+}
+
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, user: dict, password: str, stats, rng):
+        self.client = client
+        self.user = user
+        self.password = password
+        self.stats = stats
+        self.rng = rng
+        self.headers: dict[str, str] = {}
+        self.created: list[str] = []
+
+    async def call(self, route: str, method: str, url: str, expected: int = 200, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, headers=self.headers, **kwargs)
+            ok = response.status_code == expected
+        except httpx.HTTPError:
+            response, ok = None, False
+        self.stats[route].add(time.perf_counter() - started, ok)
+        return response if ok else None
+
+    async def login(self) -> bool:
+        response = await self.call(
+            "login",
+            "POST",
+            "/api/v1/auth/login/access_token",
+            data={"username": self.user["email"], "password": self.password},
+        )
+        if response is None:
+            return False
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        return True
+
+    async def list(self) -> None:
+        await self.call("list", "GET", f"/api/v1/todos/{self.user['uuid']}?limit=50")
+
+    async def me(self) -> None:
+        await self.call("me", "GET", "/api/v1/auth/me")
+
+    async def create(self) -> None:
+        limit_date = datetime.now(timezone.utc) + timedelta(days=self.rng.randint(0, 30))
+        response = await self.call(
+            "create",
+            "POST",
+            "/api/v1/todos",
+            json={
+                "title": "load test",
+                "description": "created by bench/load.py",
+                "limit_date": limit_date.isoformat(),
+                "author_uuid": self.user["uuid"],
+            },
+        )
+        if response is not None:
+            self.created.append(response.json()["id"])
+
+    async def edit(self) -> None:
+        if not self.created:
+            return await self.create()
+        todo_id = self.rng.choice(self.created)
+        await self.call(
+            "edit",
+            "PUT",
+            f"/api/v1/todos/edit/{todo_id}",
+            json={"title": "load test (edited)", "completed": self.rng.random() < 0.5},
+        )
+
+    async def delete(self) -> None:
+        if not self.created:
+            return await self.create()
+        todo_id = self.created.pop(self.rng.randrange(len(self.created)))
+        await self.call("delete", "DELETE", f"/api/v1/todos/delete/{todo_id}")
+
+    async def cleanup(self) -> None:
+        # 計測後に残ったTodoを削除する (結果には含めない)
+        for todo_id in self.created:
+            await self.client.delete(f"/api/v1/todos/delete/{todo_id}", headers=self.headers)
+
+
+async def run(args: argparse.Namespace, manifest: dict) -> dict:
+    mix = MIXES[args.mix]
+    operations, weights = zip(*mix.items())
+    stats = {route: LatencyStats() for route in ("login",) + operations}
+    rng = random.Random(args.random_seed)
+    users = manifest["users"]
+
+    limits = httpx.Limits(
+        max_connections=args.concurrency, max_keepalive_connections=args.concurrency
+    )
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=30) as client:
+        virtual_users = [
+            VirtualUser(
+                client,
+                rng.choice(users),
+                manifest["password"],
+                stats,
+                random.Random(rng.random()),
+            )
+            for _ in range(args.concurrency)
+        ]
+        # ログインは計測期間の前にまとめて行う (bcrypt のプロセスプールの起動を含むため)
+        login_started = time.perf_counter()
+        logged_in = await asyncio.gather(*(user.login() for user in virtual_users))
+        login_elapsed = time.perf_counter() - login_started
+        deadline = time.perf_counter() + args.duration
+
+        async def loop(user: VirtualUser) -> None:
+            while time.perf_counter() < deadline:
+                operation = user.rng.choices(operations, weights)[0]
+                await getattr(user, operation)()
+
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(loop(user) for user, ok in zip(virtual_users, logged_in) if ok)
+        )
+        elapsed = time.perf_counter() - started
+        await asyncio.gather(*(user.cleanup() for user in virtual_users))
+
+    total = LatencyStats()
+    for route_stats in (stats[operation] for operation in operations):
+        total.samples.extend(route_stats.samples)
+        total.errors += route_stats.errors
+    return {
+        "elapsed_seconds": round(elapsed, 2),
+        "total": total.summary(elapsed),
+        "login": stats["login"].summary(login_elapsed),
+        "routes": {operation: stats[operation].summary(elapsed) for operation in operations},
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--manifest", default=os.path.join(os.path.dirname(__file__), "seed.json"))
+    parser.add_argument("--mix", choices=MIXES, default="read_heavy")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--random-seed", type=int, default=0)
+    parser.add_argument("--output", help="結果を書き出すファイル (省略時は標準出力のみ)")
+    args = parser.parse_args()
+
+    with open(args.manifest) as f:
+        manifest = json.load(f)
+
+    result = {
+        "commit": git_commit(),
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "base_url": args.base_url,
+            "mix": args.mix,
+            "weights": MIXES[args.mix],
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "seeded_users": len(manifest["users"]),
+        },
+        **asyncio.run(run(args, manifest)),
+    }
+    output = json.dumps(result, indent=2)
+    print(output)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,343 @@
+"""
+ホットパスの関数単位のマイクロベンチマークと、保存したベースラインとの比較
+- HTTP を通さずに関数を直接呼び出すため、1回あたりの小さな劣化も検出できる
+- 各ベンチマークは1回の計測が --min-time 秒以上になるよう呼び出し回数を調整し、
+  --repeat 回計測した1回あたりの時間の中央値と最小値を記録する
+- users_register は bcrypt のコストを除くため rounds=4 のハッシュで計測する
+  (bcrypt 自体は password_hashing.py で計測する)
+
+    cd backend/v1
+    python ../bench/micro.py run --save ../bench/baselines/micro.json
+    python ../bench/micro.py compare --baseline ../bench/baselines/micro.json --threshold 0.15
+
+- ベースラインは pyproject の requires-python を満たす Python で記録する
+- compare は Python のバージョン・CPU数などがベースラインと異なる場合に stderr に警告する
+"""
+
+import argparse
+import csv
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List
+from uuid import uuid4
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "v1"))
+
+# users_register を呼び出しスレッドでハッシュ化させる (プロセスプールを使わない)
+os.environ.setdefault("PASSWORD_HASH_WORKERS", "0")
+
+from passlib.context import CryptContext  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from sqlmodel import Session, delete, select  # noqa: E402
+
+from core.config import settings  # noqa: E402
+from core.security import create_tokens, verify_token  # noqa: E402
+from core.tokens import token_verifier  # noqa: E402
+from crud.base import CRUDBase  # noqa: E402
+from crud.todo import get_todos, get_todos_by_author_uuid  # noqa: E402
+from crud.todo_bulk import insert_statement  # noqa: E402
+from crud.user import users_register  # noqa: E402
+from db.session import engine  # noqa: E402
+from models.Todo import Todo, TodoRead  # noqa: E402
+from models.User import User  # noqa: E402
+
+EMAIL_DOMAIN = "micro-bench.example.com"
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "micro.json")
+
+
+class Fixture:
+    """計測用のユーザーとTodoを作成し、終了時に削除する"""
+
+    def __init__(self, todos: int):
+        self.todos = todos
+        self.author_uuid = str(uuid4())
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def __enter__(self) -> "Fixture":
+        now = datetime.now(timezone.utc)
+        with Session(engine) as db:
+            db.add(
+                User(
+                    uuid=self.author_uuid,
+                    username=f"micro-{self.author_uuid[:8]}",
+                    email=f"micro-{self.author_uuid[:8]}@{EMAIL_DOMAIN}",
+                    hashed_password="x",
+                )
+            )
+            db.commit()
+            rows = [
+                {
+                    "id": uuid4(),
+                    "title": f"micro-bench-{i}",
+                    "description": "bench " * 10,
+                    "completed": i % 2 == 0,
+                    "limit_date": now + timedelta(days=i % 30),
+                    "created_at": now - timedelta(minutes=i),
+                    "updated_at": now,
+                    "author_uuid": self.author_uuid,
+                }
+                for i in range(self.todos)
+            ]
+            db.exec(insert_statement(rows))
+            db.commit()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        with Session(engine) as db:
+            # todo は CASCADE で削除される
+            db.exec(delete(User).where(User.email.endswith(f"@{EMAIL_DOMAIN}")))
+            db.commit()
+        self.tmpdir.cleanup()
+
+    def write_csv(self, rows: int) -> str:
+        run = uuid4().hex[:8]
+        path = os.path.join(self.tmpdir.name, f"users-{run}.csv")
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["username", "email", "password", "is_active", "is_superuser"])
+            for i in range(rows):
+                writer.writerow(
+                    [f"micro-{run}-{i}", f"micro-{run}-{i}@{EMAIL_DOMAIN}", "password", "true", "false"]
+                )
+        return path
+
+
+# 名前 -> (fixture から計測する関数を作る関数, 1回の計測で呼び出す最大回数)
+BENCHMARKS: dict[str, tuple[Callable[[Fixture], Callable[[], object]], int | None]] = {}
+
+
+def benchmark(name: str, max_number: int | None = None):
+    def register(factory):
+        BENCHMARKS[name] = (factory, max_number)
+        return factory
+
+    return register
+
+
+@benchmark("crud.todo.get_todos[limit=100]")
+def _get_todos(fixture: Fixture):
+    def run():
+        with Session(engine) as db:
+            return get_todos(db, limit=100)
+
+    return run
+
+
+@benchmark("crud.todo.get_todos_by_author_uuid[limit=100]")
+def _get_todos_by_author_uuid(fixture: Fixture):
+    def run():
+        with Session(engine) as db:
+            return get_todos_by_author_uuid(db=db, author_uuid=fixture.author_uuid, limit=100)
+
+    return run
+
+
+@benchmark("crud.base.CRUDBase.update[Todo]")
+def _crud_update(fixture: Fixture):
+    crud = CRUDBase(Todo)
+    db = Session(engine)
+    todo = db.exec(select(Todo).where(Todo.author_uuid == fixture.author_uuid)).first()
+    counter = iter(range(10**9))
+
+    def run():
+        return crud.update(db, db_obj=todo, obj_in={"title": f"micro-bench-{next(counter)}"})
+
+    return run
+
+
+@benchmark("core.security.create_tokens")
+def _create_tokens(fixture: Fixture):
+    return lambda: create_tokens(fixture.author_uuid)
+
+
+@benchmark("core.security.verify_token[uncached]")
+def _verify_token_uncached(fixture: Fixture):
+    # 署名の検証を毎回行わせるため、検証済みトークンのキャッシュを無効にする
+    token_verifier.cache_size = 0
+    token = create_tokens(fixture.author_uuid)["access_token"]
+    return lambda: verify_token(token)
+
+
+@benchmark("core.security.verify_token[cached]")
+def _verify_token_cached(fixture: Fixture):
+    token_verifier.cache_size = max(settings.TOKEN_CACHE_SIZE, 1)
+    token = create_tokens(fixture.author_uuid)["access_token"]
+    return lambda: verify_token(token)
+
+
+@benchmark("TodoRead.validate[1000 rows]")
+def _validate_todo_read(fixture: Fixture):
+    adapter = TypeAdapter(List[TodoRead])
+    with Session(engine) as db:
+        todos = get_todos_by_author_uuid(db=db, author_uuid=fixture.author_uuid, limit=1000)
+    return lambda: adapter.validate_python(todos, from_attributes=True)
+
+
+@benchmark("crud.user.users_register[10000-row CSV]", max_number=1)
+def _users_register(fixture: Fixture):
+    type(settings).pwd_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4)
+    # CSV の作成は計測に含めないよう、あらかじめ作成したファイルを1回ずつ使う
+    paths = iter([fixture.write_csv(10000) for _ in range(10)])
+
+    def run():
+        with Session(engine) as db:
+            return users_register(db, next(paths))
+
+    return run
+
+
+def measure(fn: Callable[[], object], repeat: int, min_time: float, max_number: int | None) -> dict:
+    fn()  # ウォームアップ (接続の確立、キャッシュの作成など)
+    number = 1
+    while max_number is None or number < max_number:
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - started >= min_time:
+            break
+        number *= 2
+    if max_number is not None:
+        number = min(number, max_number)
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        timings.append((time.perf_counter() - started) / number * 1000)
+    return {
+        "median_ms": round(statistics.median(timings), 4),
+        "min_ms": round(min(timings), 4),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "processor": platform.processor() or None,
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def environment_differences(baseline: dict, current: dict) -> dict:
+    """ベースラインと計測した環境の違い (異なる環境同士の比較は劣化の判定があてにならない)"""
+    base = baseline.get("environment", {})
+    now = current.get("environment", {})
+    return {
+        key: {"baseline": base.get(key), "current": now.get(key)}
+        for key in sorted(set(base) | set(now))
+        if base.get(key) != now.get(key)
+    }
+
+
+def run_benchmarks(args: argparse.Namespace) -> dict:
+    results = {}
+    with Fixture(todos=1000) as fixture:
+        for name, (factory, max_number) in BENCHMARKS.items():
+            if args.only and not any(pattern in name for pattern in args.only):
+                continue
+            repeat = min(args.repeat, 3) if max_number == 1 else args.repeat
+            results[name] = measure(factory(fixture), repeat, args.min_time, max_number)
+            print(f"{name}: {results[name]['median_ms']} ms", file=sys.stderr)
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "environment": environment(),
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> tuple[list[dict], bool]:
+    rows = []
+    regressed = False
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            rows.append({"name": name, "current_ms": result["median_ms"], "status": "new"})
+            continue
+        ratio = result["median_ms"] / base["median_ms"]
+        status = "ok"
+        if ratio > 1 + threshold:
+            status = "slower"
+            regressed = True
+        elif ratio < 1 - threshold:
+            status = "faster"
+        rows.append(
+            {
+                "name": name,
+                "baseline_ms": base["median_ms"],
+                "current_ms": result["median_ms"],
+                "ratio": round(ratio, 3),
+                "status": status,
+            }
+        )
+    return rows, regressed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="計測して結果を出力する")
+    compare_parser = subparsers.add_parser(
+        "compare", help="計測 (または --current の結果) をベースラインと比較する"
+    )
+    for sub in (run_parser, compare_parser):
+        sub.add_argument("--repeat", type=int, default=7)
+        sub.add_argument("--min-time", type=float, default=0.2)
+        sub.add_argument("--only", nargs="+", help="名前にこの文字列を含むベンチマークのみ実行する")
+    run_parser.add_argument("--save", help="結果をベースラインとして書き出すファイル")
+    compare_parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    compare_parser.add_argument("--current", help="run --save で保存した結果 (省略時はこの場で計測する)")
+    compare_parser.add_argument(
+        "--threshold", type=float, default=0.15, help="中央値がこの割合を超えて遅くなった場合に失敗する"
+    )
+    args = parser.parse_args()
+
+    if args.command == "run":
+        result = run_benchmarks(args)
+        output = json.dumps(result, indent=2, ensure_ascii=False)
+        print(output)
+        if args.save:
+            os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+            with open(args.save, "w") as f:
+                f.write(output + "\n")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if args.current:
+        with open(args.current) as f:
+            current = json.load(f)
+    else:
+        current = run_benchmarks(args)
+    differences = environment_differences(baseline, current)
+    for key, values in differences.items():
+        print(
+            f"warning: {key} differs from the baseline "
+            f"(baseline: {values['baseline']}, current: {values['current']}). "
+            "Re-record the baseline on this environment before trusting the comparison.",
+            file=sys.stderr,
+        )
+    rows, regressed = compare(baseline, current, args.threshold)
+    print(
+        json.dumps(
+            {"threshold": args.threshold, "environment_differences": differences, "results": rows},
+            indent=2,
+            ensure_ascii=False,
+        )
+    )
+    # CI で失敗させるため、閾値を超えて遅くなったものがあれば終了コード 1
+    sys.exit(1 if regressed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+bcrypt のログイン (verify) スループットをワーカー数ごとに計測する
+
+    cd backend/v1
+    python ../bench/password_hashing.py --duration 5
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "v1"))
+
+
+def run(workers: int, clients: int, duration: float) -> dict:
+    os.environ["PASSWORD_HASH_WORKERS"] = str(workers)
+    os.environ["PASSWORD_HASH_MAX_PENDING"] = str(max(clients, 1) * 2)
+
+    from core import password
+    from core.config import Settings
+
+    password.settings = Settings()
+    password.shutdown()
+    hashed = password.hash_password("benchmark-password")
+
+    done = 0
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client() -> None:
+        nonlocal done
+        while time.perf_counter() < deadline:
+            password.verify_password("benchmark-password", hashed)
+            with lock:
+                done += 1
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    password.shutdown()
+
+    per_second = done / elapsed
+    return {
+        "workers": workers,
+        "clients": clients,
+        "verifications": done,
+        "logins_per_second": round(per_second, 2),
+        "logins_per_second_per_core": round(per_second / max(workers, 1), 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--workers", type=int, nargs="+")
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    # 0 はプロセスプールを使わずスレッドで直接実行する従来の方式
+    worker_counts = args.workers or sorted({0, 1, max(cores // 2, 1), cores})
+    results = [
+        run(workers, clients=max(workers, 1) * 2, duration=args.duration)
+        for workers in worker_counts
+    ]
+    print(json.dumps({"cpu_count": cores, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
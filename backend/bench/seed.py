@@ -0,0 +1,164 @@
+"""
+負荷試験用のデータ作成
+- N 人のユーザーと、1人あたり平均 M 件のTodoを作成する
+- 1人あたりの件数はパレート分布で偏らせる (--skew が小さいほど一部のユーザーに集中する)
+- limit_date は過去・今週・数か月先・未設定に散らばるように設定する
+- 作成したユーザーの一覧 (email, uuid, Todo件数) を manifest として JSON に書き出す
+- 作成したデータは --purge で削除できる (メールアドレスのドメインで判別する)
+
+    cd backend/v1
+    python ../bench/seed.py --users 1000 --todos-per-user 50 --manifest ../bench/seed.json
+    python ../bench/seed.py --purge
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "v1"))
+
+from sqlalchemy import delete, insert  # noqa: E402
+from sqlmodel import Session  # noqa: E402
+
+from core.config import settings  # noqa: E402
+from crud.todo_bulk import insert_statement  # noqa: E402
+from db.session import engine  # noqa: E402
+from models.Todo import Todo  # noqa: E402
+from models.User import User  # noqa: E402
+
+EMAIL_DOMAIN = "bench.example.com"
+DEFAULT_PASSWORD = "bench-password"
+WORDS = ["買い物", "会議", "レポート", "掃除", "支払い", "予約", "返信", "確認", "準備", "連絡"]
+
+
+def todo_counts(users: int, mean: float, skew: float, rng: random.Random) -> list[int]:
+    """平均が mean になるよう正規化したパレート分布の件数"""
+    weights = [rng.paretovariate(skew) for _ in range(users)]
+    scale = mean * users / sum(weights)
+    return [int(weight * scale) for weight in weights]
+
+
+def limit_date(now: datetime, rng: random.Random) -> datetime | None:
+    bucket = rng.random()
+    if bucket < 0.15:
+        return None
+    if bucket < 0.35:
+        # 期限切れ
+        return now - timedelta(days=rng.uniform(1, 60))
+    if bucket < 0.60:
+        # 今週
+        return now + timedelta(days=rng.uniform(0, 7))
+    return now + timedelta(days=rng.uniform(7, 180))
+
+
+def todo_rows(author_uuid: str, count: int, now: datetime, rng: random.Random) -> list[dict]:
+    rows = []
+    for i in range(count):
+        created_at = now - timedelta(days=rng.uniform(0, 365))
+        rows.append(
+            {
+                "id": uuid4(),
+                "title": f"{rng.choice(WORDS)} {i}",
+                "description": f"{rng.choice(WORDS)}と{rng.choice(WORDS)}" if rng.random() < 0.7 else None,
+                "completed": rng.random() < 0.4,
+                "limit_date": limit_date(now, rng),
+                "created_at": created_at,
+                "updated_at": created_at + timedelta(days=rng.uniform(0, 30)),
+                "author_uuid": author_uuid,
+            }
+        )
+    return rows
+
+
+def seed(args: argparse.Namespace) -> list[dict]:
+    rng = random.Random(args.random_seed)
+    now = datetime.now(timezone.utc)
+    # bcrypt は遅いため全員同じパスワードのハッシュを使う
+    hashed_password = settings.pwd_context.hash(args.password)
+    run = uuid4().hex[:8]
+    counts = todo_counts(args.users, args.todos_per_user, args.skew, rng)
+
+    manifest = []
+    started = time.perf_counter()
+    with Session(engine) as db:
+        for start in range(0, args.users, args.batch_size):
+            users = []
+            for i in range(start, min(start + args.batch_size, args.users)):
+                users.append(
+                    {
+                        "uuid": str(uuid4()),
+                        "username": f"bench-{run}-{i}",
+                        "email": f"bench-{run}-{i}@{EMAIL_DOMAIN}",
+                        "hashed_password": hashed_password,
+                        "is_active": True,
+                        "is_stuff": False,
+                        "is_superuser": False,
+                        "created_at": now,
+                        "updated_at": now,
+                    }
+                )
+            db.exec(insert(User), params=users)
+
+            rows = []
+            for user, count in zip(users, counts[start : start + len(users)]):
+                rows.extend(todo_rows(user["uuid"], count, now, rng))
+                manifest.append(
+                    {"email": user["email"], "uuid": user["uuid"], "todos": count}
+                )
+            for offset in range(0, len(rows), args.batch_size):
+                db.exec(insert_statement(rows[offset : offset + args.batch_size]))
+            db.commit()
+            print(f"seeded {start + len(users)}/{args.users} users", file=sys.stderr)
+
+    print(
+        json.dumps(
+            {
+                "users": args.users,
+                "todos": sum(counts),
+                "max_todos_per_user": max(counts, default=0),
+                "seconds": round(time.perf_counter() - started, 2),
+            }
+        ),
+        file=sys.stderr,
+    )
+    return manifest
+
+
+def purge() -> None:
+    with Session(engine) as db:
+        # todo は user の削除に合わせて CASCADE で削除される
+        result = db.exec(delete(User).where(User.email.endswith(f"@{EMAIL_DOMAIN}")))
+        db.commit()
+    print(f"purged {result.rowcount} users", file=sys.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--todos-per-user", type=float, default=50)
+    parser.add_argument(
+        "--skew", type=float, default=1.5, help="パレート分布の形状パラメータ (小さいほど偏る)"
+    )
+    parser.add_argument("--password", default=DEFAULT_PASSWORD)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--random-seed", type=int, default=0)
+    parser.add_argument("--manifest", default=os.path.join(os.path.dirname(__file__), "seed.json"))
+    parser.add_argument("--purge", action="store_true", help="作成したデータを削除する")
+    args = parser.parse_args()
+
+    if args.purge:
+        purge()
+        return
+
+    manifest = seed(args)
+    with open(args.manifest, "w") as f:
+        json.dump({"password": args.password, "users": manifest}, f)
+
+
+if __name__ == "__main__":
+    main()
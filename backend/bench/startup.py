@@ -0,0 +1,112 @@
+"""
+起動時間の計測
+- import: 新しいプロセスで main を import するまでの時間 (と -X importtime で時間のかかるモジュール)
+- first_response: uvicorn のプロセスを起動してから最初のレスポンスを受け取るまでの時間
+  (DB_STARTUP_MODE 毎に計測する)
+
+    cd backend/v1
+    python ../bench/startup.py --runs 5 --modes create_all check
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "v1")
+
+IMPORT_SNIPPET = (
+    "import time; started = time.perf_counter(); import main; "
+    "print(time.perf_counter() - started)"
+)
+
+
+def summarize(samples: list[float]) -> dict:
+    return {
+        "median_ms": round(statistics.median(samples) * 1000, 1),
+        "min_ms": round(min(samples) * 1000, 1),
+        "max_ms": round(max(samples) * 1000, 1),
+    }
+
+
+def run_python(args: list[str], env: dict) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args], cwd=APP_DIR, env=env, capture_output=True, text=True, check=True
+    )
+
+
+def import_time(runs: int, env: dict) -> dict:
+    samples = [float(run_python(["-c", IMPORT_SNIPPET], env).stdout) for _ in range(runs)]
+
+    # 累積時間の大きいトップレベルに近いモジュール (1回分)
+    stderr = run_python(["-X", "importtime", "-c", "import main"], env).stderr
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        modules.append((int(cumulative), name.rstrip()))
+    top = [
+        {"module": name.strip(), "depth": (len(name) - len(name.lstrip())) // 2, "cumulative_ms": round(us / 1000, 1)}
+        for us, name in sorted(modules, reverse=True)[:15]
+    ]
+    return {**summarize(samples), "top_modules": top}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def first_response(mode: str, path: str, timeout: float, env: dict) -> float:
+    port = free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=APP_DIR,
+        env={**env, "DB_STARTUP_MODE": mode},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=timeout) as client:
+            while time.perf_counter() - started < timeout:
+                try:
+                    if client.get(path).status_code < 500:
+                        return time.perf_counter() - started
+                except httpx.TransportError:
+                    pass
+                if process.poll() is not None:
+                    raise RuntimeError(f"uvicorn exited with code {process.returncode} (mode={mode}).")
+                time.sleep(0.01)
+        raise TimeoutError(f"No response within {timeout} seconds (mode={mode}).")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--modes", nargs="+", default=["create_all", "check", "skip"])
+    parser.add_argument("--path", default="/api/v1/todos?limit=1")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    env = {**os.environ, "PYTHONPATH": APP_DIR}
+    results = {"import": import_time(args.runs, env), "first_response": {}}
+    for mode in args.modes:
+        samples = [first_response(mode, args.path, args.timeout, env) for _ in range(args.runs)]
+        results["first_response"][mode] = summarize(samples)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
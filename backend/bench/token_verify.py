@@ -0,0 +1,78 @@
+"""
+JWT 検証の1秒あたりの処理数を比較する
+- legacy: 呼び出し毎に os.environ から鍵を読み jose.jwt.decode する従来の方式
+- verifier (cold): 鍵を事前に読み込んだ TokenVerifier (キャッシュ無効)
+- verifier (warm): 検証済みトークンのキャッシュが効いている状態
+
+    cd backend/v1
+    python ../bench/token_verify.py
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "v1"))
+
+from jose import jwt  # noqa: E402
+
+from core.config import settings  # noqa: E402
+from core.tokens import TokenVerifier  # noqa: E402
+
+
+def ops_per_second(fn, tokens: list[str], duration: float) -> float:
+    done = 0
+    deadline = time.perf_counter() + duration
+    started = time.perf_counter()
+    while time.perf_counter() < deadline:
+        for token in tokens:
+            fn(token)
+        done += len(tokens)
+    return done / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--duration", type=float, default=3.0)
+    parser.add_argument("--clients", type=int, default=100, help="異なるトークンの数")
+    args = parser.parse_args()
+
+    def make_verifier(cache_size: int) -> TokenVerifier:
+        return TokenVerifier(
+            algorithm=settings.ALGORITHM,
+            signing_key=settings.SECRET_KEY,
+            verify_key=settings.SECRET_KEY,
+            cache_size=cache_size,
+        )
+
+    exp = datetime.now(timezone.utc) + timedelta(days=1)
+    signer = make_verifier(0)
+    tokens = [
+        signer.encode({"token_type": "access_token", "exp": exp, "uuid": str(i)})
+        for i in range(args.clients)
+    ]
+
+    def legacy(token: str):
+        return jwt.decode(
+            token, os.environ["SECRET_KEY"], algorithms=[os.environ["ALGORITHM"]]
+        )
+
+    cold = make_verifier(0)
+    warm = make_verifier(args.clients * 2)
+    for token in tokens:
+        warm.decode(token)
+
+    results = {
+        "algorithm": settings.ALGORITHM,
+        "legacy": ops_per_second(legacy, tokens, args.duration),
+        "verifier_cold": ops_per_second(cold.decode, tokens, args.duration),
+        "verifier_warm": ops_per_second(warm.decode, tokens, args.duration),
+    }
+    print(json.dumps({k: round(v, 1) if isinstance(v, float) else v for k, v in results.items()}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
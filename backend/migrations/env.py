@@ -10,6 +10,7 @@ import sys
 from sqlmodel import SQLModel
 from v1.models.User import User
 from v1.models.Todo import Todo
+from v1.models.UserImportJob import UserImportJob
 
 from dotenv import load_dotenv
 
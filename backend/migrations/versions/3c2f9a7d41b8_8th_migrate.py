@@ -0,0 +1,37 @@
+"""8th migrate
+
+Revision ID: 3c2f9a7d41b8
+Revises: affd151c5732
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c2f9a7d41b8'
+down_revision: Union[str, Sequence[str], None] = 'affd151c5732'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # タイトル + 説明欄の部分一致検索用トライグラムインデックス
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        'ix_todo_search_trgm',
+        'todo',
+        [sa.text("(title || ' ' || coalesce(description, '')) gin_trgm_ops")],
+        unique=False,
+        postgresql_using='gin',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_todo_search_trgm', table_name='todo', postgresql_using='gin')
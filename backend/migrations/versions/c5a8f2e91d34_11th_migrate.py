@@ -0,0 +1,35 @@
+"""11th migrate
+
+Revision ID: c5a8f2e91d34
+Revises: b7d3e58f1c20
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5a8f2e91d34'
+down_revision: Union[str, Sequence[str], None] = 'b7d3e58f1c20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # メールアドレスの前方一致検索 (大文字小文字を区別しない) 用
+    op.create_index(
+        'ix_user_email_lower_pattern',
+        'user',
+        [sa.text('lower(email) text_pattern_ops')],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_user_email_lower_pattern', table_name='user')
@@ -0,0 +1,57 @@
+"""12th migrate
+
+Revision ID: d81b4c6e07a9
+Revises: c5a8f2e91d34
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd81b4c6e07a9'
+down_revision: Union[str, Sequence[str], None] = 'c5a8f2e91d34'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # ユーザー一覧の ETag 用 (件数の代わりに max(updated_at) と削除回数を使う)
+    op.create_index('ix_user_updated_at', 'user', ['updated_at'], unique=False)
+    op.create_table(
+        'user_list_version',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('deletions', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.execute("INSERT INTO user_list_version (id, deletions) VALUES (1, 0)")
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION bump_user_list_version() RETURNS trigger AS $$
+        BEGIN
+            UPDATE user_list_version SET deletions = deletions + 1 WHERE id = 1;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER user_list_version_on_delete
+        AFTER DELETE ON "user"
+        FOR EACH STATEMENT EXECUTE FUNCTION bump_user_list_version()
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP TRIGGER IF EXISTS user_list_version_on_delete ON "user"')
+    op.execute("DROP FUNCTION IF EXISTS bump_user_list_version()")
+    op.drop_table('user_list_version')
+    op.drop_index('ix_user_updated_at', table_name='user')
@@ -0,0 +1,34 @@
+"""13th migrate
+
+Revision ID: e4b7a19c3f52
+Revises: d81b4c6e07a9
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b7a19c3f52'
+down_revision: Union[str, Sequence[str], None] = 'd81b4c6e07a9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 一括登録ジョブを受け付けたプロセスと生存の記録 (再起動で止まったジョブを interrupted にするため)
+    op.add_column('user_import_job', sa.Column('owner', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=True))
+    op.add_column('user_import_job', sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+    op.create_index('ix_user_import_job_status', 'user_import_job', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_user_import_job_status', table_name='user_import_job')
+    op.drop_column('user_import_job', 'heartbeat_at')
+    op.drop_column('user_import_job', 'owner')
@@ -0,0 +1,69 @@
+"""
+テスト共通の fixture
+- POSTGRES_* で指定したデータベース (テスト用) に create_all でテーブルを作成して使う
+- db.pytest_plugin の query_budget を読み込む
+"""
+
+import os
+from uuid import uuid4
+
+# アプリの Settings を読み込む前に設定する
+os.environ.setdefault("DB_STARTUP_MODE", "create_all")
+# bcrypt をリクエストスレッドで実行する (テスト毎にプロセスプールを起動しない)
+os.environ.setdefault("PASSWORD_HASH_WORKERS", "0")
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+pytest_plugins = ["db.pytest_plugin"]
+
+
+@pytest.fixture(scope="session")
+def client():
+    from main import app
+
+    # with で起動・終了処理 (init_db など) を実行する
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def user(client):
+    """テスト毎に作成して削除するユーザー"""
+    name = f"test-{uuid4().hex[:12]}"
+    password = "password1234"
+    response = client.post(
+        "/api/v1/users/signup",
+        json={"username": name, "email": f"{name}@example.com", "password": password},
+    )
+    assert response.status_code == 200, response.text
+    token = response.json()
+    me = client.get(
+        "/api/v1/auth/me",
+        headers={"Authorization": f"Bearer {token['access_token']}"},
+    ).json()
+    yield {
+        **me,
+        "password": password,
+        "access_token": token["access_token"],
+    }
+    client.delete(f"/api/v1/users/delete_user/{me['uuid']}")
+
+
+@pytest.fixture
+def todos(client, user):
+    """user の Todo を数件作成する"""
+    response = client.post(
+        "/api/v1/todos/bulk",
+        json=[
+            {
+                "title": f"todo {i}",
+                "description": "query budget",
+                "limit_date": None,
+                "author_uuid": user["uuid"],
+            }
+            for i in range(5)
+        ],
+    )
+    assert response.status_code == 200, response.text
+    return [result["id"] for result in response.json()]
@@ -0,0 +1,86 @@
+"""
+エンドポイント毎のクエリ数の上限 (db.pytest_plugin.QUERY_BUDGETS) の確認
+- 上限を超えた場合や同じ形の SQL が繰り返された場合 (N+1) に失敗する
+"""
+
+from uuid import uuid4
+
+
+def auth_headers(user) -> dict:
+    return {"Authorization": f"Bearer {user['access_token']}"}
+
+
+def test_signup(client, query_budget):
+    name = f"test-{uuid4().hex[:12]}"
+    with query_budget("POST", "/api/v1/users/signup"):
+        response = client.post(
+            "/api/v1/users/signup",
+            json={"username": name, "email": f"{name}@example.com", "password": "password1234"},
+        )
+    assert response.status_code == 200
+    me = client.get(
+        "/api/v1/auth/me",
+        headers={"Authorization": f"Bearer {response.json()['access_token']}"},
+    ).json()
+    client.delete(f"/api/v1/users/delete_user/{me['uuid']}")
+
+
+def test_login(client, user, query_budget):
+    with query_budget("POST", "/api/v1/auth/login/access_token"):
+        response = client.post(
+            "/api/v1/auth/login/access_token",
+            data={"username": user["email"], "password": user["password"]},
+        )
+    assert response.status_code == 200
+
+
+def test_me(client, user, query_budget):
+    with query_budget("GET", "/api/v1/auth/me"):
+        response = client.get("/api/v1/auth/me", headers=auth_headers(user))
+    assert response.status_code == 200
+
+
+def test_all_user(client, user, query_budget):
+    with query_budget("GET", "/api/v1/users/all_user"):
+        response = client.get("/api/v1/users/all_user", params={"limit": 10})
+    assert response.status_code == 200
+
+
+def test_user(client, user, query_budget):
+    with query_budget("GET", "/api/v1/users/{user_uuid}"):
+        response = client.get(f"/api/v1/users/{user['uuid']}")
+    assert response.status_code == 200
+
+
+def test_todos(client, todos, query_budget):
+    with query_budget("GET", "/api/v1/todos"):
+        response = client.get("/api/v1/todos", params={"limit": 10})
+    assert response.status_code == 200
+
+
+def test_search_todos(client, user, todos, query_budget):
+    with query_budget("GET", "/api/v1/todos/search"):
+        response = client.get(
+            "/api/v1/todos/search", params={"q": "budget", "author_uuid": user["uuid"]}
+        )
+    assert response.status_code == 200
+
+
+def test_author_todos(client, user, todos, query_budget):
+    # Todo の件数に関わらず author を1件ずつ読み込まないこと (N+1)
+    with query_budget("GET", "/api/v1/todos/{author_uuid}"):
+        response = client.get(f"/api/v1/todos/{user['uuid']}")
+    assert response.status_code == 200
+    assert len(response.json()) == len(todos)
+
+
+def test_author_todos_changes(client, user, todos, query_budget):
+    with query_budget("GET", "/api/v1/todos/{author_uuid}/changes"):
+        response = client.get(f"/api/v1/todos/{user['uuid']}/changes")
+    assert response.status_code == 200
+
+
+def test_todo(client, todos, query_budget):
+    with query_budget("GET", "/api/v1/todo/{todo_id}"):
+        response = client.get(f"/api/v1/todo/{todos[0]}")
+    assert response.status_code == 200
@@ -0,0 +1,127 @@
+"""
+Todo一覧の絞り込み条件ごとの実行計画 (EXPLAIN) がインデックスを使うこと
+- enable_seqscan を無効にしたうえで todo テーブルを Seq Scan せず、複合インデックスで読むことを確認する
+  (行数の少ないテスト用DBでもインデックスで処理できるかどうかを判定するため)
+- 絞り込みなしの2ページ目以降 (created_at / updated_at 順) は、キーセット条件
+  (ROW(order_by, id) > ...) が Index Scan の Index Cond になり、Sort なしで
+  インデックス順に読めることも確認する
+  (Filter や BitmapOr + Sort の実行計画ではページが深くなるほど遅くなるため)
+"""
+
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import text
+from sqlmodel import Session
+
+from core.pagination import encode_cursor
+from crud.todo import TODO_ORDER_COLUMNS, _cursor_key, todos_page_statement
+from db.explain import explain_plan
+from db.session import engine
+from models.Todo import Todo, TodoFilter
+
+# 一覧用に追加した複合インデックス (主キーや全文検索用のインデックスは含めない)
+COMPOSITE_INDEXES = {index.name for index in Todo.__table__.indexes if len(index.columns) > 1}
+TODO_INDEXES = {index.name for index in Todo.__table__.indexes} | {"todo_pkey"}
+
+FILTER_NAMES = (
+    "none",
+    "completed",
+    "overdue",
+    "this_week",
+    "limit_date_range",
+    "completed_range",
+    "updated_since",
+)
+
+
+def make_filter(name: str) -> TodoFilter:
+    now = datetime.now(timezone.utc)
+    return {
+        "none": lambda: TodoFilter(),
+        "completed": lambda: TodoFilter(completed=False),
+        "overdue": lambda: TodoFilter(due="overdue"),
+        "this_week": lambda: TodoFilter(due="this_week"),
+        "limit_date_range": lambda: TodoFilter(
+            limit_date_from=now, limit_date_to=now + timedelta(days=30)
+        ),
+        "completed_range": lambda: TodoFilter(
+            completed=True, limit_date_from=now - timedelta(days=30)
+        ),
+        "updated_since": lambda: TodoFilter(updated_since=now - timedelta(days=1)),
+    }[name]()
+
+
+def nodes(plan: dict) -> list[dict]:
+    found = [plan]
+    for child in plan.get("Plans", []):
+        found.extend(nodes(child))
+    return found
+
+
+@pytest.fixture
+def todo_plan(client):
+    """Seq Scan を無効にした todos_page_statement の実行計画"""
+
+    def plan(*, author: bool, filter_name: str, order_by: str, with_cursor: bool) -> dict:
+        cursor = None
+        if with_cursor:
+            # 2ページ目以降 (キーセット条件付き) のクエリ
+            cursor = encode_cursor(
+                _cursor_key(order_by, False),
+                [datetime.now(timezone.utc).isoformat(), str(uuid4())],
+            )
+        statement = todos_page_statement(
+            author_uuid=str(uuid4()) if author else None,
+            filters=make_filter(filter_name),
+            cursor=cursor,
+            order_by=order_by,
+            limit=100,
+        )
+        # SET LOCAL はトランザクションの終了 (Session を閉じた時) に元に戻る
+        with Session(engine) as session:
+            session.exec(text("SET LOCAL enable_seqscan = off"))
+            return explain_plan(session, statement)
+
+    return plan
+
+
+@pytest.mark.parametrize("with_cursor", (False, True), ids=("first", "cursor"))
+@pytest.mark.parametrize("order_by", tuple(TODO_ORDER_COLUMNS))
+@pytest.mark.parametrize("filter_name", FILTER_NAMES)
+@pytest.mark.parametrize("author", (False, True), ids=("all", "author"))
+def test_todo_filters_use_composite_indexes(todo_plan, author, filter_name, order_by, with_cursor):
+    plan = nodes(
+        todo_plan(author=author, filter_name=filter_name, order_by=order_by, with_cursor=with_cursor)
+    )
+
+    seq_scans = [
+        node.get("Filter", "")
+        for node in plan
+        if node["Node Type"] == "Seq Scan" and node.get("Relation Name") == "todo"
+    ]
+    assert not seq_scans, seq_scans
+    used = {node["Index Name"] for node in plan if node.get("Index Name") in TODO_INDEXES}
+    assert used, plan
+    assert used <= COMPOSITE_INDEXES, used
+
+
+@pytest.mark.parametrize("order_by", ("created_at", "updated_at"))
+@pytest.mark.parametrize("author", (False, True), ids=("all", "author"))
+def test_keyset_page_reads_index_in_order(todo_plan, author, order_by):
+    # limit_date は NULL の行を含めるため OR 条件になり、範囲検索にはならない
+    plan = nodes(todo_plan(author=author, filter_name="none", order_by=order_by, with_cursor=True))
+
+    assert not [node for node in plan if "Sort" in node["Node Type"]], plan
+    keyset_scans = [
+        node
+        for node in plan
+        if node["Node Type"] in ("Index Scan", "Index Only Scan")
+        and f"ROW({order_by}, id)" in node.get("Index Cond", "")
+    ]
+    assert keyset_scans, plan
+    assert {node["Index Name"] for node in keyset_scans} <= {
+        f"ix_todo_{order_by}_id",
+        f"ix_todo_author_uuid_{order_by}_id",
+    }
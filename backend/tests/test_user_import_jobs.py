@@ -0,0 +1,139 @@
+"""
+一括登録ジョブの状態
+- 再起動・異常終了したプロセスが残した未完了のジョブは interrupted になり、ポーリングが終わる
+- 他のプロセスが処理中・処理待ちのジョブ (生存の記録が新しい) はそのまま残る
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from uuid import uuid4
+
+import pytest
+from sqlmodel import Session, delete
+
+import main
+from core.config import settings
+from crud import user_import_job
+from db.session import engine
+from models.User import User
+from models.UserImportJob import UserImportJob
+
+
+@pytest.fixture
+def make_job():
+    """指定したプロセス・状態のジョブを直接登録する (終了時に削除する)"""
+    created = []
+
+    def make(*, owner: str, status: str = "queued", heartbeat_age: float | None = 0) -> UserImportJob:
+        now = user_import_job._now()
+        job = UserImportJob(
+            filename="users.csv",
+            status=status,
+            owner=owner,
+            heartbeat_at=None if heartbeat_age is None else now - timedelta(seconds=heartbeat_age),
+        )
+        with Session(engine) as session:
+            session.add(job)
+            session.commit()
+            session.refresh(job)
+        created.append(job.id)
+        return job
+
+    yield make
+    with Session(engine) as session:
+        session.exec(delete(UserImportJob).where(UserImportJob.id.in_(created)))
+        session.commit()
+
+
+def read_status(client, job_id) -> dict:
+    response = client.get(f"/api/v1/users/upload_jobs/{job_id}")
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_startup_interrupts_jobs_left_by_previous_process(client, make_job):
+    stale = settings.USER_IMPORT_HEARTBEAT_TIMEOUT + 1
+    queued = make_job(owner="previous-host:1", heartbeat_age=stale)
+    running = make_job(owner="previous-host:1", status="running", heartbeat_age=stale)
+    legacy = make_job(owner=None, heartbeat_age=None)
+
+    # 再起動後の起動処理
+    main.on_startup()
+
+    for job in (queued, running, legacy):
+        body = read_status(client, job.id)
+        assert body["status"] == "interrupted"
+        assert body["error"] == user_import_job.INTERRUPTED_ERROR
+        assert body["finished_at"] is not None
+
+
+def test_startup_keeps_jobs_of_live_processes(client, make_job):
+    queued = make_job(owner="other-worker:2")
+    running = make_job(owner="other-worker:2", status="running")
+
+    main.on_startup()
+
+    assert read_status(client, queued.id)["status"] == "queued"
+    assert read_status(client, running.id)["status"] == "running"
+
+
+def test_polling_interrupts_job_whose_process_stopped(client, make_job):
+    job = make_job(owner="previous-host:1", heartbeat_age=settings.USER_IMPORT_HEARTBEAT_TIMEOUT + 1)
+    assert read_status(client, job.id)["status"] == "interrupted"
+
+
+def test_heartbeat_keeps_own_jobs_alive(make_job):
+    job = make_job(
+        owner=user_import_job._owner(),
+        status="running",
+        heartbeat_age=settings.USER_IMPORT_HEARTBEAT_TIMEOUT + 1,
+    )
+
+    assert user_import_job.record_heartbeat() >= 1
+    user_import_job.interrupt_orphaned_jobs()
+
+    with Session(engine) as session:
+        assert session.get(UserImportJob, job.id).status == "running"
+
+
+def test_shutdown_interrupts_own_queued_jobs(monkeypatch, make_job):
+    own = make_job(owner=user_import_job._owner())
+    other = make_job(owner="other-worker:2")
+    # 他のテストが使う実行用のスレッドプールは止めない
+    monkeypatch.setattr(user_import_job, "_executor", ThreadPoolExecutor(max_workers=1))
+
+    user_import_job.shutdown()
+
+    with Session(engine) as session:
+        assert session.get(UserImportJob, own.id).status == "interrupted"
+        assert session.get(UserImportJob, other.id).status == "queued"
+
+
+def test_upload_records_owner_and_finishes(client):
+    name = f"test-{uuid4().hex[:12]}"
+    csv = f"username,email,password\n{name},{name}@example.com,password1234\n"
+    response = client.post(
+        "/api/v1/users/upload_users",
+        files={"file": ("users.csv", csv.encode(), "text/csv")},
+    )
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+    try:
+        with Session(engine) as session:
+            job = session.get(UserImportJob, job_id)
+            assert job.owner == user_import_job._owner()
+            assert job.heartbeat_at is not None
+
+        for _ in range(100):
+            body = read_status(client, job_id)
+            if body["status"] not in user_import_job.UNFINISHED_STATUSES:
+                break
+            time.sleep(0.1)
+        assert body["status"] == "succeeded", body
+        assert body["processed_rows"] == 1
+    finally:
+        with Session(engine) as session:
+            session.exec(delete(User).where(User.username == name))
+            session.exec(delete(UserImportJob).where(UserImportJob.id == job_id))
+            session.commit()
@@ -0,0 +1,103 @@
+"""api.routes.auth の async 版 (USE_ASYNC_DB が有効な場合に使用)"""
+
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from crud.async_user import (
+    authenticate,
+    get_current_user,
+    get_user_from_refresh_token,
+)
+from db.session import get_async_session
+from core.config import settings
+from core.security import (
+    create_tokens,
+    verify_token,
+)
+from models.User import User, UserLogin, UserPublic
+from models.GenericSchema import Token
+
+router = APIRouter()
+
+
+@router.post("/login/access_token")
+async def login_access_token(
+    form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
+    session: AsyncSession = Depends(get_async_session),
+) -> Token:
+    """
+    OAuth2 compatible token login, get an access token for future requests
+    """
+    user = await authenticate(
+        session=session, email=form_data.username, password=form_data.password
+    )
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Incorrect email or password",
+        )
+    elif not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Inactive user"
+        )
+    token = create_tokens(user.uuid)
+    user.refresh_token = token["refresh_token"]
+    session.add(user)
+    await session.commit()
+    return token
+
+
+@router.post("/auth_token", response_model=Token)
+async def login(
+    login_user_info: UserLogin, session: AsyncSession = Depends(get_async_session)
+):
+    """
+    - json形式でPOSTする場合のAPI
+    - OAuth2PasswordRequestFormは使用していません
+    """
+    user = await authenticate(
+        session=session,
+        email=login_user_info.email,
+        password=login_user_info.password,
+    )
+
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password.",
+        )
+
+    token = create_tokens(user.uuid)
+    user.refresh_token = token["refresh_token"]
+    session.add(user)
+    await session.commit()
+    return token
+
+
+@router.get("/refresh_token", response_model=Token)
+async def refresh_token(
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_user_from_refresh_token),
+):
+    token = create_tokens(current_user.uuid)
+    current_user.refresh_token = token["refresh_token"]
+    session.add(current_user)
+    await session.commit()
+    return token
+
+
+@router.get("/me", response_model=UserPublic)
+async def get_me(current_user: User = Depends(get_current_user)):
+    return current_user
+
+
+@router.post("/verify_token")
+async def verify_token_route(token: str = Depends(settings.oauth2_schema)):
+    token_data = verify_token(token)
+    return {
+        "isAuthenticated": True,
+        "uuid": token_data.uuid,
+    }
@@ -0,0 +1,261 @@
+"""api.routes.todos の async 版 (USE_ASYNC_DB が有効な場合に使用)"""
+
+from datetime import datetime
+from typing import List, Literal, Union
+from uuid import UUID
+
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from core.config import settings
+from core.etag import if_none_match, not_modified, require_if_match, weak_etag
+from crud.async_todo import (
+    create_todo,
+    create_todos,
+    delete_todo,
+    delete_todos,
+    get_author_todos_version,
+    get_todo,
+    get_todo_changes,
+    get_todo_rows,
+    get_todo_rows_page,
+    get_todo_version,
+    search_todos,
+    update_todo,
+    update_todos,
+)
+from crud.export import (
+    TODO_EXPORT_FIELDS,
+    aiter_export,
+    export_response,
+    todos_export_statement,
+)
+from crud.todo import parse_todo_fields
+from db.session import get_async_read_session, get_async_session
+from models.Todo import (
+    Todo,
+    TodoBulkDelete,
+    TodoBulkResult,
+    TodoBulkUpdateItem,
+    TodoChanges,
+    TodoCreate,
+    TodoFilter,
+    TodoRead,
+    TodosPublic,
+    TodoUpdate,
+)
+
+router = APIRouter()
+
+
+@router.post("/todos", response_model=Todo)
+async def create_new_todo(
+    *, db: AsyncSession = Depends(get_async_session), todo: TodoCreate
+):
+    return await create_todo(db=db, todo=todo)
+
+
+@router.post("/todos/bulk", response_model=List[TodoBulkResult])
+async def create_todos_bulk(
+    *,
+    db: AsyncSession = Depends(get_async_session),
+    todos: List[TodoCreate] = Body(max_length=settings.TODO_BULK_MAX_ITEMS),
+):
+    return await create_todos(db=db, todos=todos)
+
+
+@router.patch("/todos/bulk", response_model=List[TodoBulkResult])
+async def update_todos_bulk(
+    *,
+    db: AsyncSession = Depends(get_async_session),
+    todos: List[TodoBulkUpdateItem] = Body(max_length=settings.TODO_BULK_MAX_ITEMS),
+):
+    return await update_todos(db=db, items=todos)
+
+
+@router.delete("/todos/bulk", response_model=List[TodoBulkResult])
+async def delete_todos_bulk(
+    *, db: AsyncSession = Depends(get_async_session), body: TodoBulkDelete
+):
+    return await delete_todos(db=db, ids=body.ids)
+
+
+@router.get("/todos", response_model=Union[List[TodoRead], TodosPublic])
+async def read_todos(
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    filters: TodoFilter = Depends(),
+    order_by: Literal["created_at", "updated_at", "limit_date"] = "created_at",
+    desc: bool = False,
+    fields: str | None = None,
+    view: Literal["full", "summary"] = "full",
+    db: AsyncSession = Depends(get_async_read_session),
+):
+    columns = parse_todo_fields(fields, view)
+    if cursor is None:
+        todos = await get_todo_rows(
+            db=db,
+            skip=skip,
+            limit=limit,
+            filters=filters,
+            order_by=order_by,
+            desc=desc,
+            fields=columns,
+        )
+        return ORJSONResponse(todos)
+    todos, next_cursor = await get_todo_rows_page(
+        db=db,
+        filters=filters,
+        cursor=cursor,
+        order_by=order_by,
+        desc=desc,
+        limit=limit,
+        fields=columns,
+    )
+    return ORJSONResponse({"data": todos, "next_cursor": next_cursor})
+
+
+@router.get("/todos/export", response_class=StreamingResponse)
+async def export_todos(
+    since: datetime | None = None,
+    format: Literal["ndjson", "csv"] = "ndjson",
+):
+    chunks = aiter_export(todos_export_statement(since), TODO_EXPORT_FIELDS, format)
+    return export_response(chunks, "todos", format)
+
+
+@router.get("/todos/search", response_model=TodosPublic)
+async def search_todo_items(
+    q: str = Query(min_length=1, max_length=200),
+    author_uuid: str | None = None,
+    limit: int = 100,
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_async_session),
+):
+    todos, next_cursor = await search_todos(
+        db=db, q=q, author_uuid=author_uuid, cursor=cursor, limit=limit
+    )
+    return TodosPublic(data=todos, next_cursor=next_cursor)
+
+
+@router.get("/todos/{author_uuid}", response_model=Union[List[TodoRead], TodosPublic])
+async def read_todos_by_author_uuid(
+    author_uuid: str,
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    filters: TodoFilter = Depends(),
+    order_by: Literal["created_at", "updated_at", "limit_date"] = "created_at",
+    desc: bool = False,
+    fields: str | None = None,
+    view: Literal["full", "summary"] = "full",
+    db: AsyncSession = Depends(get_async_read_session),
+):
+    headers = {}
+    if filters.due is None:
+        version = await get_author_todos_version(db=db, author_uuid=author_uuid)
+        etag = weak_etag("todos", author_uuid, request.url.query, *version)
+        if if_none_match(request, etag):
+            return not_modified(etag)
+        headers["ETag"] = etag
+
+    columns = parse_todo_fields(fields, view)
+    if cursor is None:
+        todos = await get_todo_rows(
+            db=db,
+            skip=skip,
+            limit=limit,
+            author_uuid=author_uuid,
+            filters=filters,
+            order_by=order_by,
+            desc=desc,
+            fields=columns,
+        )
+        return ORJSONResponse(todos, headers=headers)
+    todos, next_cursor = await get_todo_rows_page(
+        db=db,
+        author_uuid=author_uuid,
+        filters=filters,
+        cursor=cursor,
+        order_by=order_by,
+        desc=desc,
+        limit=limit,
+        fields=columns,
+    )
+    return ORJSONResponse({"data": todos, "next_cursor": next_cursor}, headers=headers)
+
+
+@router.get("/todos/{author_uuid}/changes", response_model=TodoChanges)
+async def read_todo_changes(
+    author_uuid: str,
+    since: str | None = None,
+    db: AsyncSession = Depends(get_async_session),
+):
+    return await get_todo_changes(db=db, author_uuid=author_uuid, since=since)
+
+
+@router.get("/todo/{todo_id}", response_model=TodoRead)
+async def read_todo(
+    *,
+    todo_id: str,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_session),
+):
+    try:
+        todo_id = UUID(todo_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid UUID format.",
+        )
+
+    version = await get_todo_version(db=db, todo_id=todo_id)
+    if not version:
+        raise HTTPException(status_code=404, detail="Todo not found")
+    etag = weak_etag("todo", todo_id, *version)
+    if if_none_match(request, etag):
+        return not_modified(etag)
+
+    todo = await get_todo(db=db, todo_id=todo_id)
+    if not todo:
+        raise HTTPException(status_code=404, detail="Todo not found")
+    response.headers["ETag"] = etag
+    return todo
+
+
+@router.put("/todos/edit/{todo_id}", response_model=Todo)
+async def update_existing_todo(
+    *,
+    todo_id: UUID,
+    todo: TodoUpdate,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_session),
+):
+    if "if-match" in request.headers:
+        # 更新が終わるまで行をロックし、確認と更新の間に他の更新が入らないようにする
+        version = await get_todo_version(db=db, todo_id=todo_id, for_update=True)
+        if not version:
+            raise HTTPException(status_code=404, detail="Todo not found")
+        require_if_match(request, weak_etag("todo", todo_id, *version))
+
+    updated_todo = await update_todo(db=db, todo_id=todo_id, todo_update=todo)
+    if not updated_todo:
+        raise HTTPException(status_code=404, detail="Todo not found")
+    version = await get_todo_version(db=db, todo_id=todo_id)
+    response.headers["ETag"] = weak_etag("todo", todo_id, *version)
+    return updated_todo
+
+
+@router.delete("/todos/delete/{todo_id}", response_model=Todo)
+async def delete_existing_todo(
+    *, todo_id: UUID, db: AsyncSession = Depends(get_async_session)
+):
+    deleted_todo = await delete_todo(db=db, todo_id=todo_id)
+    if not deleted_todo:
+        raise HTTPException(status_code=404, detail="Todo not found")
+    return deleted_todo
@@ -1,11 +1,13 @@
+import logging
 from datetime import timedelta
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlmodel import Session
+from starlette.concurrency import run_in_threadpool
 
-from crud.user import authenticate, get_current_user, get_user_from_refresh_token
+from crud.user import aauthenticate, get_current_user, get_user_from_refresh_token
 from db.session import get_session
 from core.config import settings
 from core.security import (
@@ -15,26 +17,35 @@ from core.security import (
 from models.User import User, UserLogin, UserPublic
 from models.GenericSchema import Token
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 
+def _issue_tokens(session: Session, user: User) -> dict:
+    token = create_tokens(user.uuid)
+    user.refresh_token = token["refresh_token"]
+    session.add(user)
+    session.commit()
+    session.refresh(user)
+    return token
+
+
+# ログインは bcrypt の検証をプロセスプールで待つ間スレッドプールを占有しないよう async def とし、
+# 同期の Session を使う処理だけをスレッドプールで実行する
 @router.post("/login/access_token")
-def login_access_token(
+async def login_access_token(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
     session: Session = Depends(get_session),
 ) -> Token:
     """
     OAuth2 compatible token login, get an access token for future requests
     """
-    user = authenticate(
+    user = await aauthenticate(
         session=session, email=form_data.username, password=form_data.password
     )
-    if user is None:
-        print("User not foumd.")
-    else:
-        print(f"user_uuid: {user.uuid}")  # ok
-
     if not user:
+        logger.info("Login failed: user not found or incorrect password.")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Incorrect email or password",
@@ -43,21 +54,17 @@ def login_access_token(
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Inactive user"
         )
-    token = create_tokens(user.uuid)
-    user.refresh_token = token["refresh_token"]
-    session.add(user)
-    session.commit()
-    session.refresh(user)
-    return token
+    logger.debug("User %s logged in.", user.uuid)
+    return await run_in_threadpool(_issue_tokens, session, user)
 
 
 @router.post("/auth_token", response_model=Token)
-def login(login_user_info: UserLogin, session: Session = Depends(get_session)):
+async def login(login_user_info: UserLogin, session: Session = Depends(get_session)):
     """
     - json形式でPOSTする場合のAPI
     - OAuth2PasswordRequestFormは使用していません
     """
-    user = authenticate(
+    user = await aauthenticate(
         session=session,
         email=login_user_info.email,
         password=login_user_info.password,
@@ -75,12 +82,7 @@ def login(login_user_info: UserLogin, session: Session = Depends(get_session)):
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found."
         )
 
-    token = create_tokens(user.uuid)
-    user.refresh_token = token["refresh_token"]
-    session.add(user)
-    session.commit()
-    session.refresh(user)
-    return token
+    return await run_in_threadpool(_issue_tokens, session, user)
 
 
 @router.get("/refresh_token", response_model=Token)
@@ -0,0 +1,23 @@
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+
+from core.warmup import readiness
+
+router = APIRouter()
+
+
+@router.get("/healthz")
+def read_health():
+    """プロセスが応答できるか (DB やコネクションプールには触れない)"""
+    return {"status": "ok"}
+
+
+@router.get("/readyz")
+def read_readiness():
+    """ウォームアップが終わりリクエストを受け付けられるか (SIGTERM を受けた後の待機中は 503)"""
+    if not readiness.ready:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "not ready"},
+        )
+    return {"status": "ready"}
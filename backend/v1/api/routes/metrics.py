@@ -0,0 +1,118 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from core import metrics
+from core.tokens import token_verifier
+from core.user_cache import user_cache
+from db.pool import pool_status
+from db.session import async_engine, engine, replica_set
+
+router = APIRouter()
+
+
+def _pools() -> dict:
+    pools = {"sync": engine.pool}
+    if async_engine is not None:
+        pools["async"] = async_engine.sync_engine.pool
+    for replica in replica_set.replicas if replica_set is not None else []:
+        pools[f"{replica.name}-sync"] = replica.engine.pool
+        if replica.async_engine is not None:
+            pools[f"{replica.name}-async"] = replica.async_engine.sync_engine.pool
+    return pools
+
+
+def _pool_gauges() -> list[str]:
+    pools = _pools()
+    samples: dict[str, dict] = {}
+    for name, pool in pools.items():
+        for key, value in pool_status(pool).items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                samples.setdefault(key, {})[(("engine", name),)] = value
+    lines = []
+    for key, values in samples.items():
+        lines.extend(metrics.gauge(f"db_pool_{key}", f"Connection pool {key}.", values))
+    return lines
+
+
+def _replica_gauges() -> list[str]:
+    if replica_set is None:
+        return []
+    status = replica_set.status()
+    healthy = {}
+    lag = {}
+    for name, replica in status["replicas"].items():
+        healthy[(("replica", name),)] = int(replica["healthy"])
+        if replica["lag_seconds"] is not None:
+            lag[(("replica", name),)] = replica["lag_seconds"]
+    reads = {(("target", target),): count for target, count in status["reads"].items()}
+    return [
+        *metrics.gauge("db_replica_healthy", "Read replica is in rotation.", healthy),
+        *metrics.gauge("db_replica_lag_seconds", "Read replica replay lag.", lag),
+        *metrics.gauge("db_read_sessions", "Read sessions by target.", reads),
+    ]
+
+
+def _cache_gauges() -> list[str]:
+    samples: dict[str, dict] = {}
+    for name, stats in (
+        ("user", user_cache.stats()),
+        ("token", token_verifier.stats()),
+    ):
+        for key, value in stats.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                samples.setdefault(key, {})[(("cache", name),)] = value
+    lines = []
+    for key, values in samples.items():
+        lines.extend(metrics.gauge(f"cache_{key}", f"Cache {key}.", values))
+    return lines
+
+
+@router.get("", response_class=PlainTextResponse)
+def read_metrics():
+    """
+    Prometheus テキスト形式の計測値
+    - http_request_duration_seconds: ルート毎のレイテンシ
+    - http_request_db_duration_seconds / http_request_db_queries: リクエスト毎のDB時間とクエリ数
+    - password_hash_duration_seconds: bcrypt のハッシュ化・検証の時間
+    - db_pool_* / cache_*: コネクションプールとキャッシュの状態
+    - db_replica_* / db_read_sessions: レプリカの状態と読み取り先毎のセッション数
+    """
+    return PlainTextResponse(
+        metrics.expose([*_pool_gauges(), *_replica_gauges(), *_cache_gauges()]),
+        media_type="text/plain; version=0.0.4",
+    )
+
+
+@router.get("/pool")
+def read_pool_metrics():
+    """
+    コネクションプールの使用状況
+    - checked_out / overflow: 現在の使用数
+    - checkout_wait_seconds_*: チェックアウト待ち時間の累計と最大値
+    - checkout_timeouts: pool_timeout を超えたチェックアウトの回数
+    """
+    return {name: pool_status(pool) for name, pool in _pools().items()}
+
+
+@router.get("/replicas")
+def read_replica_metrics():
+    """
+    レプリカの状態 (READ_REPLICA_URLS が空の場合は enabled=false)
+    - healthy / lag_seconds / last_error: 直近の確認結果
+    - reads: 読み取り先 (レプリカ名 / primary) 毎のセッション数
+    """
+    if replica_set is None:
+        return {"enabled": False}
+    return {"enabled": True, **replica_set.status()}
+
+
+@router.get("/user_cache")
+def read_user_cache_metrics():
+    """認証済みユーザーキャッシュのヒット率"""
+    return user_cache.stats()
+
+
+@router.get("/token_cache")
+def read_token_cache_metrics():
+    """検証済みトークンキャッシュのヒット率"""
+    return token_verifier.stats()
@@ -1,19 +1,46 @@
-from typing import List
+from datetime import datetime
+from typing import List, Literal, Union
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from sqlmodel import Session
 
+from core.config import settings
+from core.etag import if_none_match, not_modified, require_if_match, weak_etag
+from crud.export import (
+    TODO_EXPORT_FIELDS,
+    export_response,
+    iter_export,
+    todos_export_statement,
+)
 from crud.todo import (
     create_todo,
     delete_todo,
+    get_author_todos_version,
     get_todo,
-    get_todos,
+    get_todo_rows,
+    get_todo_rows_page,
+    get_todo_version,
+    parse_todo_fields,
+    search_todos,
     update_todo,
-    get_todos_by_author_uuid,
 )
-from db.session import get_session
-from models.Todo import Todo, TodoCreate, TodoRead, TodoUpdate
+from crud.todo_bulk import create_todos, delete_todos, update_todos
+from crud.todo_sync import get_todo_changes
+from db.session import get_read_session, get_session
+from models.Todo import (
+    Todo,
+    TodoBulkDelete,
+    TodoBulkResult,
+    TodoBulkUpdateItem,
+    TodoChanges,
+    TodoCreate,
+    TodoFilter,
+    TodoRead,
+    TodosPublic,
+    TodoUpdate,
+)
 
 router = APIRouter()
 
@@ -23,25 +50,183 @@ def create_new_todo(*, db: Session = Depends(get_session), todo: TodoCreate):
     return create_todo(db=db, todo=todo)
 
 
-@router.get("/todos", response_model=List[TodoRead])
-def read_todos(skip: int = 0, limit: int = 100, db: Session = Depends(get_session)):
-    return get_todos(db=db, skip=skip, limit=limit)
+@router.post("/todos/bulk", response_model=List[TodoBulkResult])
+def create_todos_bulk(
+    *,
+    db: Session = Depends(get_session),
+    todos: List[TodoCreate] = Body(max_length=settings.TODO_BULK_MAX_ITEMS),
+):
+    """複数のTodoを1トランザクションで作成し、項目毎の結果を返す"""
+    return create_todos(db=db, todos=todos)
+
+
+@router.patch("/todos/bulk", response_model=List[TodoBulkResult])
+def update_todos_bulk(
+    *,
+    db: Session = Depends(get_session),
+    todos: List[TodoBulkUpdateItem] = Body(max_length=settings.TODO_BULK_MAX_ITEMS),
+):
+    return update_todos(db=db, items=todos)
+
+
+@router.delete("/todos/bulk", response_model=List[TodoBulkResult])
+def delete_todos_bulk(*, db: Session = Depends(get_session), body: TodoBulkDelete):
+    return delete_todos(db=db, ids=body.ids)
+
+
+@router.get("/todos", response_model=Union[List[TodoRead], TodosPublic])
+def read_todos(
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    filters: TodoFilter = Depends(),
+    order_by: Literal["created_at", "updated_at", "limit_date"] = "created_at",
+    desc: bool = False,
+    fields: str | None = None,
+    view: Literal["full", "summary"] = "full",
+    db: Session = Depends(get_read_session),
+):
+    """
+    - cursor を指定しない場合は従来どおり skip/limit でページングしたリストを返す
+    - cursor を指定した場合 (先頭ページは空文字) はキーセットページネーションで
+      {data, next_cursor} を返す
+    - 一覧は ORM と response_model の検証を通さず、Core の select の行を orjson で直接返す
+    - fields (カンマ区切り) または view=summary (id, title, completed, limit_date) で
+      返す項目を絞ると、SQL で選択する列も絞られ author を含まない場合は JOIN しない
+    - completed / due (overdue, this_week) / limit_date_from / limit_date_to /
+      updated_since で絞り込み、order_by と desc で並び順を指定する
+    """
+    columns = parse_todo_fields(fields, view)
+    if cursor is None:
+        todos = get_todo_rows(
+            db=db,
+            skip=skip,
+            limit=limit,
+            filters=filters,
+            order_by=order_by,
+            desc=desc,
+            fields=columns,
+        )
+        return ORJSONResponse(todos)
+    todos, next_cursor = get_todo_rows_page(
+        db=db,
+        filters=filters,
+        cursor=cursor,
+        order_by=order_by,
+        desc=desc,
+        limit=limit,
+        fields=columns,
+    )
+    return ORJSONResponse({"data": todos, "next_cursor": next_cursor})
+
+
+@router.get("/todos/export", response_class=StreamingResponse)
+def export_todos(
+    since: datetime | None = None,
+    format: Literal["ndjson", "csv"] = "ndjson",
+):
+    """
+    全Todoを NDJSON (既定) または CSV でストリーミング出力する
+    - since を指定すると updated_at が since 以降のTodoのみ出力する
+    """
+    chunks = iter_export(todos_export_statement(since), TODO_EXPORT_FIELDS, format)
+    return export_response(chunks, "todos", format)
 
 
-@router.get("/todos/{author_uuid}", response_model=List[TodoRead])
+@router.get("/todos/search", response_model=TodosPublic)
+def search_todo_items(
+    q: str = Query(min_length=1, max_length=200),
+    author_uuid: str | None = None,
+    limit: int = 100,
+    cursor: str | None = None,
+    db: Session = Depends(get_session),
+):
+    """
+    タイトルまたは説明欄に q を含むTodoを関連度順に返す
+    - author_uuid を指定するとそのユーザーのTodoに絞り込む
+    - 続きは next_cursor を cursor に指定して取得する
+    """
+    todos, next_cursor = search_todos(
+        db=db, q=q, author_uuid=author_uuid, cursor=cursor, limit=limit
+    )
+    return TodosPublic(data=todos, next_cursor=next_cursor)
+
+
+@router.get("/todos/{author_uuid}", response_model=Union[List[TodoRead], TodosPublic])
 def read_todos_by_author_uuid(
     author_uuid: str,
+    request: Request,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_session),
+    cursor: str | None = None,
+    filters: TodoFilter = Depends(),
+    order_by: Literal["created_at", "updated_at", "limit_date"] = "created_at",
+    desc: bool = False,
+    fields: str | None = None,
+    view: Literal["full", "summary"] = "full",
+    db: Session = Depends(get_read_session),
 ):
-    return get_todos_by_author_uuid(
-        db=db, skip=skip, limit=limit, author_uuid=author_uuid
+    """
+    - ETag (件数・最終更新時刻・クエリ文字列から計算) を返し、If-None-Match が一致すれば 304 を返す
+    - due を指定した場合は結果が現在時刻に依存するため ETag を付けない
+    """
+    headers = {}
+    if filters.due is None:
+        version = get_author_todos_version(db=db, author_uuid=author_uuid)
+        etag = weak_etag("todos", author_uuid, request.url.query, *version)
+        if if_none_match(request, etag):
+            return not_modified(etag)
+        headers["ETag"] = etag
+
+    columns = parse_todo_fields(fields, view)
+    if cursor is None:
+        todos = get_todo_rows(
+            db=db,
+            skip=skip,
+            limit=limit,
+            author_uuid=author_uuid,
+            filters=filters,
+            order_by=order_by,
+            desc=desc,
+            fields=columns,
+        )
+        return ORJSONResponse(todos, headers=headers)
+    todos, next_cursor = get_todo_rows_page(
+        db=db,
+        author_uuid=author_uuid,
+        filters=filters,
+        cursor=cursor,
+        order_by=order_by,
+        desc=desc,
+        limit=limit,
+        fields=columns,
     )
+    return ORJSONResponse({"data": todos, "next_cursor": next_cursor}, headers=headers)
+
+
+@router.get("/todos/{author_uuid}/changes", response_model=TodoChanges)
+def read_todo_changes(
+    author_uuid: str,
+    since: str | None = None,
+    db: Session = Depends(get_session),
+):
+    """
+    since のトークン以降に作成・更新されたTodoと、削除されたTodoの id を返す
+    - since を省略すると全件を返す
+    - 次回は next_token を since に指定する
+    - トークンが古すぎる場合は 410 を返すので、since を省略して取得し直す
+    """
+    return get_todo_changes(db=db, author_uuid=author_uuid, since=since)
 
 
 @router.get("/todo/{todo_id}", response_model=TodoRead)
-def read_todo(*, todo_id: str, db: Session = Depends(get_session)):
+def read_todo(
+    *,
+    todo_id: str,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_session),
+):
     try:
         todo_id = UUID(todo_id)
     except ValueError:
@@ -50,19 +235,44 @@ def read_todo(*, todo_id: str, db: Session = Depends(get_session)):
             detail="Invalid UUID format.",
         )
 
+    version = get_todo_version(db=db, todo_id=todo_id)
+    if not version:
+        raise HTTPException(status_code=404, detail="Todo not found")
+    etag = weak_etag("todo", todo_id, *version)
+    if if_none_match(request, etag):
+        return not_modified(etag)
+
     todo = get_todo(db=db, todo_id=todo_id)
     if not todo:
         raise HTTPException(status_code=404, detail="Todo not found")
+    response.headers["ETag"] = etag
     return todo
 
 
 @router.put("/todos/edit/{todo_id}", response_model=Todo)
 def update_existing_todo(
-    *, todo_id: UUID, todo: TodoUpdate, db: Session = Depends(get_session)
+    *,
+    todo_id: UUID,
+    todo: TodoUpdate,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_session),
 ):
+    """
+    If-Match が指定された場合は現在のETagと一致する場合のみ更新する (不一致は 412)
+    """
+    if "if-match" in request.headers:
+        # 更新が終わるまで行をロックし、確認と更新の間に他の更新が入らないようにする
+        version = get_todo_version(db=db, todo_id=todo_id, for_update=True)
+        if not version:
+            raise HTTPException(status_code=404, detail="Todo not found")
+        require_if_match(request, weak_etag("todo", todo_id, *version))
+
     updated_todo = update_todo(db=db, todo_id=todo_id, todo_update=todo)
     if not updated_todo:
         raise HTTPException(status_code=404, detail="Todo not found")
+    version = get_todo_version(db=db, todo_id=todo_id)
+    response.headers["ETag"] = weak_etag("todo", todo_id, *version)
     return updated_todo
 
 
@@ -1,33 +1,75 @@
-import shutil
-from typing import Annotated, List
-
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+import logging
+from datetime import datetime
+from typing import Annotated, Literal
+from uuid import UUID
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+    status,
+)
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session, select
-
-from core.security import create_tokens, get_password_hash
+from starlette.concurrency import run_in_threadpool
+
+from core.etag import if_none_match, not_modified, require_if_match, weak_etag
+from core.password import ahash_password
+from core.security import create_tokens
+from crud.export import (
+    USER_EXPORT_FIELDS,
+    export_response,
+    iter_export,
+    users_export_statement,
+)
 from crud.user import (
     check_user,
     delete_user,
     get_user_by_uuid,
+    get_user_version,
+    get_users_page,
+    get_users_version,
     update_user,
-    users_register,
 )
-from db.session import get_session
+from crud.user_import_job import (
+    enqueue_user_import,
+    get_user_import_job,
+    to_public,
+)
+from db.session import get_read_session, get_session
 from models.User import (
     User,
     UserCreate,
     UserPublic,
+    UsersPublic,
     UserUpdate,
 )
 from models.GenericSchema import Token
+from models.UserImportJob import UserImportJobPublic
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
+def _save_new_user(session: Session, new_user: User) -> User:
+    session.add(new_user)
+    session.commit()
+    session.refresh(new_user)
+    return new_user
+
+
 # sign up
+# bcrypt のハッシュ化をプロセスプールで待つ間スレッドプールを占有しないよう async def とし、
+# 同期の Session を使う処理だけをスレッドプールで実行する
 @router.post("/signup", response_model=Token)
-def create_user(userIn: UserCreate, session: Session = Depends(get_session)):
-    user = check_user(session, userIn)
+async def create_user(userIn: UserCreate, session: Session = Depends(get_session)):
+    user = await run_in_threadpool(check_user, session, userIn)
 
     if user:
         raise HTTPException(
@@ -41,48 +83,117 @@ def create_user(userIn: UserCreate, session: Session = Depends(get_session)):
             email=userIn.email,
             is_active=True,
             is_superuser=False,
-            hashed_password=get_password_hash(userIn.password),
+            hashed_password=await ahash_password(userIn.password),
             refresh_token="",
         )
-
-        session.add(new_user)
-        session.commit()
-        session.refresh(new_user)
+        new_user = await run_in_threadpool(_save_new_user, session, new_user)
 
         token = create_tokens(new_user.uuid)
         return token
 
 
-@router.post("/upload_users")
+@router.post(
+    "/upload_users",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=UserImportJobPublic,
+)
 def upload_users(
     session: Session = Depends(get_session),
     file: UploadFile = File(...),
 ):
-    file_location = f"temp_{file.filename}"  # 一時的にファイルを保存
+    """
+    一括登録ジョブを登録してすぐに返す
+    - 進捗は GET /users/upload_jobs/{job_id} で確認する
+    """
+    if not file.filename or not file.filename.endswith((".csv", ".xlsx")):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid file format. Please provide a CSV or EXCEL file.",
+        )
 
-    with open(file_location, "wb+") as file_object:
-        shutil.copyfileobj(file.file, file_object)
+    job = enqueue_user_import(session, file)
+    return to_public(job)
 
-    # 登録処理
-    result = users_register(session, file_location)
 
-    if result:
-        return {
-            "message": "Some users failed to register. Please check each item.",
-            "failed_users": result,
-        }
-    else:
-        return {"message": "Users registered successfully."}
+@router.get("/upload_jobs/{job_id}", response_model=UserImportJobPublic)
+def read_upload_job(job_id: UUID, session: Session = Depends(get_session)):
+    job = get_user_import_job(session, job_id)
 
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Job not found."
+        )
 
-@router.get("/all_user", response_model=List[UserPublic])
-def read_all_user(session: Session = Depends(get_session)):
-    all_user = session.exec(select(User)).all()
-    return all_user
+    return to_public(job)
+
+
+@router.get("/export", response_class=StreamingResponse)
+def export_users(
+    since: datetime | None = None,
+    format: Literal["ndjson", "csv"] = "ndjson",
+):
+    """
+    全ユーザーを NDJSON (既定) または CSV でストリーミング出力する
+    - パスワードハッシュとリフレッシュトークンは出力しない
+    - since を指定すると updated_at が since 以降のユーザーのみ出力する
+    """
+    chunks = iter_export(users_export_statement(since), USER_EXPORT_FIELDS, format)
+    return export_response(chunks, "users", format)
+
+
+@router.get("/all_user", response_model=UsersPublic)
+def read_all_user(
+    request: Request,
+    response: Response,
+    limit: int = Query(default=100, ge=1, le=1000),
+    cursor: str | None = None,
+    is_active: bool | None = None,
+    is_superuser: bool | None = None,
+    email_prefix: str | None = None,
+    exact_count: bool = False,
+    session: Session = Depends(get_read_session),
+):
+    """
+    email 順のキーセットページネーションでユーザーを返す
+    - 続きは next_cursor を cursor に指定して取得する
+    - is_active / is_superuser / email_prefix (前方一致・大文字小文字を区別しない) で絞り込む
+    - count は推定件数。exact_count=true の場合のみ正確な件数を数える
+    """
+    etag = weak_etag("users", request.url.query, *get_users_version(session))
+    if if_none_match(request, etag):
+        return not_modified(etag)
+
+    users = get_users_page(
+        session,
+        limit=limit,
+        cursor=cursor,
+        is_active=is_active,
+        is_superuser=is_superuser,
+        email_prefix=email_prefix,
+        exact_count=exact_count,
+    )
+    response.headers["ETag"] = etag
+    return users
 
 
 @router.get("/{user_uuid}", response_model=UserPublic)
-def get_user(user_uuid: str, session: Session = Depends(get_session)):
+def get_user(
+    user_uuid: str,
+    request: Request,
+    response: Response,
+    session: Session = Depends(get_session),
+):
+    updated_at = get_user_version(session, user_uuid)
+
+    if not updated_at:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="User not found."
+        )
+
+    etag = weak_etag("user", user_uuid, updated_at)
+    if if_none_match(request, etag):
+        return not_modified(etag)
+
     user = get_user_by_uuid(session, user_uuid)
 
     if not user:
@@ -90,6 +201,7 @@ def get_user(user_uuid: str, session: Session = Depends(get_session)):
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found."
         )
 
+    response.headers["ETag"] = etag
     return user
 
 
@@ -99,15 +211,28 @@ def edit_user(
     session: Session = Depends(get_session),
     user_uuid: str,
     user: UserUpdate,
+    request: Request,
+    response: Response,
 ):
-    db_user = session.exec(select(User).where(User.uuid == user_uuid)).first()
+    """
+    If-Match が指定された場合は現在のETagと一致する場合のみ更新する (不一致は 412)
+    """
+    statement = select(User).where(User.uuid == user_uuid)
+    if "if-match" in request.headers:
+        # 更新が終わるまで行をロックする
+        statement = statement.with_for_update()
+    db_user = session.exec(statement).first()
 
-    print(db_user)
     if not db_user:
+        logger.info("User %s not found for update.", user_uuid)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found."
         )
-    return update_user(session=session, db_user=db_user, user_in=user)
+    require_if_match(request, weak_etag("user", user_uuid, db_user.updated_at))
+
+    updated_user = update_user(session=session, db_user=db_user, user_in=user)
+    response.headers["ETag"] = weak_etag("user", user_uuid, updated_user.updated_at)
+    return updated_user
 
 
 @router.delete("/delete_user/{user_uuid}")
@@ -0,0 +1,210 @@
+"""
+レスポンス圧縮ミドルウェア (gzip / brotli / zstd)
+- Accept-Encoding とサーバー側の優先順 (COMPRESSION_ENCODINGS) から圧縮方式を選ぶ
+- 一括で返すレスポンスは minimum_size 未満なら圧縮しない
+- StreamingResponse (エクスポートなど) はチャンク毎に圧縮してフラッシュするため、
+  全体をメモリに溜めずに圧縮済みのデータを順次送信する
+- brotli / zstandard パッケージが無い場合、その方式は使用しない
+"""
+
+import zlib
+from typing import Sequence
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+
+class GzipEncoder:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class BrotliEncoder:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ZstdEncoder:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+def available_encodings() -> set[str]:
+    encodings = {"gzip"}
+    if brotli is not None:
+        encodings.add("br")
+    if zstandard is not None:
+        encodings.add("zstd")
+    return encodings
+
+
+def select_encoding(accept_encoding: str, preferred: Sequence[str]) -> str | None:
+    """Accept-Encoding (q 値を考慮) で受け入れられる方式のうち、サーバー側の優先順で最初のもの"""
+    accepted: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if name:
+            accepted[name.strip().lower()] = q
+
+    wildcard = accepted.get("*", 0.0)
+    for encoding in preferred:
+        if accepted.get(encoding, wildcard) > 0:
+            return encoding
+    return None
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        minimum_size: int = 1024,
+        encodings: Sequence[str] = ("zstd", "br", "gzip"),
+        content_types: Sequence[str] = ("application/json",),
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        zstd_level: int = 3,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        supported = available_encodings()
+        self.encodings = [encoding for encoding in encodings if encoding in supported]
+        self.content_types = tuple(content_types)
+        self.levels = {"gzip": gzip_level, "br": brotli_quality, "zstd": zstd_level}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = select_encoding(
+            Headers(scope=scope).get("accept-encoding", ""), self.encodings
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        await _CompressedResponse(self, encoding, send).run(scope, receive)
+
+    def encoder(self, encoding: str):
+        level = self.levels[encoding]
+        if encoding == "br":
+            return BrotliEncoder(level)
+        if encoding == "zstd":
+            return ZstdEncoder(level)
+        return GzipEncoder(level)
+
+    def compressible(self, headers: Headers) -> bool:
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        return content_type.startswith(self.content_types)
+
+
+class _CompressedResponse:
+    """1リクエスト分の send をラップし、必要に応じて本文を圧縮する"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start_message: Message | None = None
+        self.encoder = None
+        # None: 未判定, True: 圧縮する, False: そのまま送る
+        self.compressing: bool | None = None
+
+    async def run(self, scope: Scope, receive: Receive) -> None:
+        await self.middleware.app(scope, receive, self.wrapped_send)
+
+    async def wrapped_send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # 本文の最初のチャンクを見てから圧縮するかを決めるため、開始メッセージを保留する
+            self.start_message = message
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressing is None:
+            headers = Headers(raw=self.start_message["headers"])
+            self.compressing = self.middleware.compressible(headers) and (
+                more_body or len(body) >= self.middleware.minimum_size
+            )
+            if not self.compressing:
+                await self.send(self.start_message)
+                await self.send(message)
+                return
+
+            self.encoder = self.middleware.encoder(self.encoding)
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                # ストリーミングでは圧縮後の長さが分からないため chunked で送る
+                del headers["Content-Length"]
+                await self.send(self.start_message)
+            else:
+                compressed = self.encoder.compress(body) + self.encoder.finish()
+                headers["Content-Length"] = str(len(compressed))
+                await self.send(self.start_message)
+                await self.send({"type": "http.response.body", "body": compressed})
+                return
+        elif not self.compressing:
+            await self.send(message)
+            return
+
+        if more_body:
+            chunk = self.encoder.compress(body) + self.encoder.flush()
+        else:
+            chunk = self.encoder.compress(body) + self.encoder.finish()
+        await self.send(
+            {"type": "http.response.body", "body": chunk, "more_body": more_body}
+        )
@@ -1,6 +1,6 @@
 from fastapi.security import OAuth2PasswordBearer
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import ClassVar, Optional
+from typing import ClassVar, Literal, Optional
 
 from passlib.context import CryptContext
 
@@ -30,10 +30,120 @@ class Settings(BaseSettings):
     DATABASE_URL: ClassVar[str] = (
         f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_SERVER}:{POSTGRES_PORT}/{POSTGRES_DB}"
     )
+    ASYNC_DATABASE_URL: ClassVar[str] = (
+        f"postgresql+asyncpg://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_SERVER}:{POSTGRES_PORT}/{POSTGRES_DB}"
+    )
+    # True の場合は AsyncEngine(asyncpg) + async def のルートを使用する
+    USE_ASYNC_DB: bool = False
+    # 起動時の DB の扱い
+    # - create_all: テーブルを作成する (開発用)
+    # - check: Alembic のリビジョンが head と一致するかだけを確認する (DDL を実行しない)
+    # - skip: 何もしない
+    DB_STARTUP_MODE: Literal["create_all", "check", "skip"] = "create_all"
+    # 起動時にプール・bcrypt・よく使う SQL を温めてから /readyz を 200 にする
+    WARMUP_ENABLED: bool = False
+    # SIGTERM を受けてから終了処理を始めるまで /readyz を 503 にしてリクエストを受け付け続ける秒数
+    # (この秒数と最も長いリクエストの合計が gunicorn の GRACEFUL_TIMEOUT より短くなるようにする)
+    SHUTDOWN_DRAIN_SECONDS: float = 0.0
+
+    # 読み取り専用レプリカ (postgresql://... のリスト)。空の場合はすべてプライマリで読む
+    READ_REPLICA_URLS: list[str] = []
+    # 遅延がこの秒数を超えたレプリカは使わない
+    READ_REPLICA_MAX_LAG_SECONDS: float = 5.0
+    # レプリカの遅延・死活を確認する間隔 (秒)
+    READ_REPLICA_CHECK_INTERVAL: float = 5.0
+    READ_REPLICA_CONNECT_TIMEOUT: int = 2  # 秒
+    # 書き込み後この秒数の間は、同じクライアントの読み取りをプライマリで行う
+    READ_YOUR_WRITES_SECONDS: float = 5.0
+
+    # Connection pool settings
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800  # 秒 (-1 で無効)
+    DB_POOL_PRE_PING: bool = True
+    # PgBouncer の transaction mode で使用する場合は True (アプリ側でプールしない)
+    DB_USE_NULLPOOL: bool = False
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7  # 7 days
+    ACCESS_TOKEN_EXPIRE_DAYS: int = 7
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+
+    # RS256 / ES256 などの公開鍵方式を使用する場合の鍵 (PEM)
+    JWT_PRIVATE_KEY: Optional[str] = None
+    JWT_PUBLIC_KEY: Optional[str] = None
+    # 現在の署名鍵の kid と、ローテーション前の検証鍵 {kid: 鍵}
+    JWT_KID: Optional[str] = None
+    JWT_PREVIOUS_KEYS: dict[str, str] = {}
+    # 検証済みトークンのキャッシュ件数 (0 で無効)
+    TOKEN_CACHE_SIZE: int = 10000
+
+    # bcrypt 用プロセスプール (None: CPUコア数, 0: リクエストスレッドで直接実行)
+    PASSWORD_HASH_WORKERS: Optional[int] = None
+    # 処理待ちがこの件数を超えた場合は 503 を返す
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    PASSWORD_HASH_RETRY_AFTER: int = 1  # 秒
+
+    # 一括登録で1回のクエリ・コミットにまとめる行数
+    USER_IMPORT_BATCH_SIZE: int = 1000
+    # 一括登録ジョブを実行するスレッド数
+    USER_IMPORT_WORKERS: int = 1
+    # アップロードファイルをメモリ上に保持する上限 (超えるとディスクに退避)
+    USER_IMPORT_SPOOL_MAX_SIZE: int = 10 * 1024 * 1024
+    # この秒数進捗が更新されない実行中のジョブは中断として扱う
+    USER_IMPORT_STALE_SECONDS: int = 900
+    # 未完了のジョブを持つプロセスが生存を記録する間隔 (秒)
+    USER_IMPORT_HEARTBEAT_SECONDS: float = 15.0
+    # 生存の記録がこの秒数途絶えたプロセスの未完了のジョブ (queued / running) は中断として扱う
+    USER_IMPORT_HEARTBEAT_TIMEOUT: int = 60
+
+    # 認証済みユーザーのプロセス内キャッシュ
+    USER_CACHE_ENABLED: bool = False
+    USER_CACHE_TTL_SECONDS: float = 60.0
+    USER_CACHE_MAX_SIZE: int = 10000
+
+    # 一括作成・更新・削除で1回のリクエストに指定できる件数
+    # (作成は1件あたり8個のパラメータを使うため、asyncpg の上限 32767 を超えないよう 4000 以下にする)
+    TODO_BULK_MAX_ITEMS: int = 1000
+
+    # エクスポートでサーバーサイドカーソルから1回に取り出す行数
+    EXPORT_BATCH_SIZE: int = 1000
+
+    # 差分同期: コミット順と updated_at の順序のずれを吸収するため since をこの秒数さかのぼる
+    TODO_SYNC_OVERLAP_SECONDS: float = 5.0
+    # 削除記録の保持日数 (これより古いトークンは 410 を返し全件の再取得を求める)
+    TODO_TOMBSTONE_RETENTION_DAYS: int = 30
+
+    # レスポンス圧縮 (br / zstd は brotli / zstandard がインストールされている場合のみ使用)
+    COMPRESSION_ENABLED: bool = True
+    # これより小さいレスポンスは圧縮しない (ストリーミングのレスポンスは常に圧縮)
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    # クライアントが複数受け入れる場合はこの順で優先する
+    COMPRESSION_ENCODINGS: list[str] = ["zstd", "br", "gzip"]
+    COMPRESSION_CONTENT_TYPES: list[str] = [
+        "application/json",
+        "application/x-ndjson",
+        "text/csv",
+        "text/plain",
+        "text/html",
+    ]
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_ZSTD_LEVEL: int = 3
+
+    # ルート毎のレイテンシ・DB時間・クエリ数を計測し /metrics で公開する
+    METRICS_ENABLED: bool = True
+
+    # N+1 / 遅いクエリの検出 (テスト・ステージング向け。本番では無効のまま)
+    QUERY_INSPECTOR_ENABLED: bool = False
+    # この時間を超えたクエリは EXPLAIN と共にログに出す
+    QUERY_INSPECTOR_SLOW_MS: float = 100.0
+    QUERY_INSPECTOR_EXPLAIN: bool = True
+    # 1リクエスト内で同じ形の SQL がこの回数以上実行された場合は N+1 として警告する
+    QUERY_INSPECTOR_REPEAT_THRESHOLD: int = 5
+    QUERY_INSPECTOR_MAX_QUERIES: int = 20
 
 
 settings = Settings()
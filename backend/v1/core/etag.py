@@ -0,0 +1,44 @@
+import hashlib
+from typing import Any
+
+from fastapi import HTTPException, Request, Response, status
+
+
+def weak_etag(*parts: Any) -> str:
+    """
+    更新時刻や件数などのバージョン情報から弱いETagを作成する
+    - 行の読み込みやシリアライズをせずに計算できる値だけを使う
+    """
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f'W/"{digest[:32]}"'
+
+
+def _etags(header: str | None) -> list[str]:
+    if not header:
+        return []
+    return [value.strip().removeprefix("W/") for value in header.split(",")]
+
+
+def _matches(header: str | None, etag: str) -> bool:
+    # ETag はすべて弱いETagのため、If-Match も含めて弱い比較を行う
+    values = _etags(header)
+    return "*" in values or etag.removeprefix("W/") in values
+
+
+def if_none_match(request: Request, etag: str) -> bool:
+    """If-None-Match が現在のETagと一致する (304 を返せる) 場合に True"""
+    return _matches(request.headers.get("if-none-match"), etag)
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+
+def require_if_match(request: Request, etag: str) -> None:
+    """If-Match が指定されていて現在のETagと一致しない場合は 412 を返す"""
+    header = request.headers.get("if-match")
+    if header is not None and not _matches(header, etag):
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="The resource has been modified.",
+        )
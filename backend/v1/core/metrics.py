@@ -0,0 +1,210 @@
+"""
+リクエスト毎の計測と Prometheus テキスト形式での出力
+- ルート毎のレイテンシ、DB時間、クエリ数、bcrypt の時間をヒストグラムで集計する
+- DB時間とクエリ数は SQLAlchemy の before/after_cursor_execute イベントで計測し、
+  contextvars で実行中のリクエストに紐づける (スレッドプール・greenlet 内のクエリも含む)
+- 集計はプロセス毎のため、複数ワーカーで動かす場合はワーカー毎に収集される
+"""
+
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterable, Sequence
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+@dataclass
+class RequestStats:
+    db_seconds: float = 0.0
+    queries: int = 0
+    password_seconds: float = 0.0
+
+
+_request_stats: ContextVar[RequestStats | None] = ContextVar(
+    "request_stats", default=None
+)
+
+
+def current_request_stats() -> RequestStats | None:
+    """実行中のリクエストの計測値 (リクエスト外では None)"""
+    return _request_stats.get()
+
+
+def _labels(names: Sequence[str], values: tuple) -> str:
+    pairs = ",".join(
+        f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)
+    )
+    return f"{{{pairs}}}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Histogram:
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str], buckets: Iterable[float]
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = sorted(buckets)
+        self._lock = threading.Lock()
+        # ラベル値 -> [バケット毎の件数..., 合計, 件数]
+        self._series: dict[tuple, list[float]] = {}
+
+    def observe(self, value: float, *labels) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def expose(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            series = {labels: list(values) for labels, values in self._series.items()}
+        for labels, values in sorted(series.items()):
+            cumulative = 0
+            for bucket, count in zip(self.buckets, values):
+                cumulative += count
+                le = _labels(self.labelnames + ("le",), labels + (_format(bucket),))
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            inf = _labels(self.labelnames + ("le",), labels + ("+Inf",))
+            lines.append(f"{self.name}_bucket{inf} {values[-1]}")
+            label = _labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label} {_format(values[-2])}")
+            lines.append(f"{self.name}_count{label} {values[-1]}")
+        return lines
+
+
+def gauge(name: str, documentation: str, samples: dict[tuple[tuple, ...], float]) -> list[str]:
+    """その場で値を取得する gauge (samples は ((ラベル名, 値), ...) -> 値)"""
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} gauge"]
+    for labels, value in samples.items():
+        names = tuple(label for label, _ in labels)
+        values = tuple(value for _, value in labels)
+        lines.append(f"{name}{_labels(names, values)} {_format(value)}")
+    return lines
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+PASSWORD_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 1.0, 2.0, 5.0)
+
+request_duration = Histogram(
+    "http_request_duration_seconds",
+    "Time spent handling the request, including sending the response body.",
+    ("method", "route", "status"),
+    LATENCY_BUCKETS,
+)
+request_db_duration = Histogram(
+    "http_request_db_duration_seconds",
+    "Time spent executing database queries per request.",
+    ("method", "route"),
+    LATENCY_BUCKETS,
+)
+request_db_queries = Histogram(
+    "http_request_db_queries",
+    "Number of database queries executed per request.",
+    ("method", "route"),
+    QUERY_COUNT_BUCKETS,
+)
+password_duration = Histogram(
+    "password_hash_duration_seconds",
+    "Time spent waiting for bcrypt hashing / verification (including queueing).",
+    ("operation",),
+    PASSWORD_BUCKETS,
+)
+
+
+def record_password_time(operation: str, seconds: float) -> None:
+    password_duration.observe(seconds, operation)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.password_seconds += seconds
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _request_stats.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _request_stats.get()
+    started = conn.info.get("query_started")
+    if stats is None or not started:
+        return
+    stats.db_seconds += time.perf_counter() - started.pop()
+    stats.queries += 1
+
+
+def route_label(scope: Scope) -> str:
+    """パスパラメータを含まないルートのパス (一致するルートが無い場合は unmatched)"""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            _request_stats.reset(token)
+            method = scope["method"]
+            route = route_label(scope)
+            request_duration.observe(elapsed, method, route, str(status_code))
+            request_db_duration.observe(stats.db_seconds, method, route)
+            request_db_queries.observe(stats.queries, method, route)
+
+
+def expose(extra: Iterable[str] = ()) -> str:
+    lines = []
+    for histogram in (
+        request_duration,
+        request_db_duration,
+        request_db_queries,
+        password_duration,
+    ):
+        lines.extend(histogram.expose())
+    lines.extend(extra)
+    return "\n".join(lines) + "\n"
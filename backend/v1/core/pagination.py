@@ -0,0 +1,31 @@
+import base64
+import json
+from typing import Any, Callable, Sequence
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(key: str, values: list[Any]) -> str:
+    """キーセットページネーション用の不透明なカーソルを作成する"""
+    payload = json.dumps({"k": key, "v": values}, separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(
+    cursor: str, key: str, parsers: Sequence[Callable[[Any], Any]]
+) -> list[Any]:
+    """
+    カーソルを復元する
+    - 並び順(key)が作成時と異なるカーソルは不正として扱う
+    - parsers で各値を元の型に戻す
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if payload["k"] != key or len(payload["v"]) != len(parsers):
+            raise ValueError("cursor key mismatch")
+        return [parse(value) for parse, value in zip(parsers, payload["v"])]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor."
+        )
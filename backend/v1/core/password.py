@@ -0,0 +1,153 @@
+"""
+bcrypt のハッシュ化・検証を専用のプロセスプールで実行する
+- リクエストスレッドやGILを占有せずに複数コアを使用できる
+- 待ち行列が上限に達した場合は 503 (Retry-After) を返す
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from fastapi import HTTPException, status
+
+from core.config import settings
+from core.metrics import record_password_time
+
+_executor: ProcessPoolExecutor | None = None
+_executor_lock = threading.Lock()
+_pending = 0
+_pending_lock = threading.Lock()
+# 一括登録のハッシュ化は 503 を返さず、空きができるまで待つ
+_pending_available = threading.Condition(_pending_lock)
+
+
+def _hash(password: str) -> str:
+    return settings.pwd_context.hash(password)
+
+
+def _verify(password: str, hashed_password: str) -> bool:
+    return settings.pwd_context.verify(password, hashed_password)
+
+
+def _workers() -> int:
+    if settings.PASSWORD_HASH_WORKERS is None:
+        return os.cpu_count() or 1
+    return settings.PASSWORD_HASH_WORKERS
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # スレッドを持つプロセスから fork するとデッドロックの恐れがあるため spawn
+            _executor = ProcessPoolExecutor(
+                max_workers=_workers(),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+def _release(_: Future) -> None:
+    global _pending
+    with _pending_available:
+        _pending -= 1
+        _pending_available.notify()
+
+
+def _submit(fn, *args, wait: bool = False) -> Future:
+    """
+    プロセスプールに投入する
+    - 処理待ちが PASSWORD_HASH_MAX_PENDING に達している場合は 503
+      (wait=True の場合は空きができるまで待つ)
+    """
+    global _pending
+    with _pending_available:
+        while _pending >= settings.PASSWORD_HASH_MAX_PENDING:
+            if not wait:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Server is busy. Please retry later.",
+                    headers={"Retry-After": str(settings.PASSWORD_HASH_RETRY_AFTER)},
+                )
+            _pending_available.wait()
+        _pending += 1
+    try:
+        future = _get_executor().submit(fn, *args)
+    except Exception:
+        _release(None)
+        raise
+    future.add_done_callback(_release)
+    return future
+
+
+def hash_password(password: str) -> str:
+    started = time.perf_counter()
+    try:
+        if _workers() == 0:
+            return _hash(password)
+        return _submit(_hash, password).result()
+    finally:
+        record_password_time("hash", time.perf_counter() - started)
+
+
+def verify_password(password: str, hashed_password: str) -> bool:
+    started = time.perf_counter()
+    try:
+        if _workers() == 0:
+            return _verify(password, hashed_password)
+        return _submit(_verify, password, hashed_password).result()
+    finally:
+        record_password_time("verify", time.perf_counter() - started)
+
+
+def hash_passwords(passwords: list[str]) -> list[str]:
+    """
+    一括登録用に複数のパスワードを並列でハッシュ化する
+    - ログインなどの通常リクエストが割り込めるよう、同時に投入する件数を
+      ワーカー数の2倍までに抑える
+    - 処理待ちの件数に含め、上限に達している場合は 503 にせず空きを待つ
+    """
+    workers = _workers()
+    if workers == 0:
+        return [_hash(password) for password in passwords]
+
+    window = workers * 2
+    hashed: list[str] = []
+    for start in range(0, len(passwords), window):
+        futures = [
+            _submit(_hash, password, wait=True)
+            for password in passwords[start : start + window]
+        ]
+        hashed.extend(future.result() for future in futures)
+    return hashed
+
+
+async def ahash_password(password: str) -> str:
+    started = time.perf_counter()
+    try:
+        if _workers() == 0:
+            return _hash(password)
+        return await asyncio.wrap_future(_submit(_hash, password))
+    finally:
+        record_password_time("hash", time.perf_counter() - started)
+
+
+async def averify_password(password: str, hashed_password: str) -> bool:
+    started = time.perf_counter()
+    try:
+        if _workers() == 0:
+            return _verify(password, hashed_password)
+        return await asyncio.wrap_future(_submit(_verify, password, hashed_password))
+    finally:
+        record_password_time("verify", time.perf_counter() - started)
+
+
+def shutdown() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(cancel_futures=True)
+            _executor = None
@@ -1,15 +1,17 @@
 from datetime import datetime, timedelta, timezone
-import os
 from typing import Any
 
 from fastapi import HTTPException, status
 
-from jose import JWTError, jwt
+from jose import JWTError
 from passlib.context import CryptContext
 
 from core.config import settings
+from core.password import hash_password, verify_password
+from core.tokens import token_verifier
+from core.user_cache import user_cache
 
-from models.GenericSchema import Token
+from models.GenericSchema import TokenData
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -21,29 +23,21 @@ def create_tokens(uuid: str):
     access_token_payload = {
         "token_type": "access_token",
         "exp": datetime.now(timezone.utc)
-        + timedelta(days=int(os.environ["ACCESS_TOKEN_EXPIRE_DAYS"])),
+        + timedelta(days=settings.ACCESS_TOKEN_EXPIRE_DAYS),
         "uuid": uuid,
     }
 
     refresh_token_payload = {
         "token_type": "refresh_token",
         "exp": datetime.now(timezone.utc)
-        + timedelta(days=int(os.environ["REFRESH_TOKEN_EXPIRE_DAYS"])),
+        + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
         "uuid": uuid,
     }
 
     # create token
-    access_token = jwt.encode(
-        access_token_payload,
-        os.environ["SECRET_KEY"],
-        algorithm=os.environ["ALGORITHM"],
-    )
-
-    refresh_token = jwt.encode(
-        refresh_token_payload,
-        os.environ["SECRET_KEY"],
-        algorithm=os.environ["ALGORITHM"],
-    )
+    access_token = token_verifier.encode(access_token_payload)
+
+    refresh_token = token_verifier.encode(refresh_token_payload)
 
     return {
         "access_token": access_token,
@@ -54,20 +48,14 @@ def create_tokens(uuid: str):
 
 def verify_token(token: str):
     try:
-        payload = jwt.decode(
-            token,
-            os.environ["SECRET_KEY"],
-            algorithms=[
-                os.environ["ALGORITHM"],
-            ],
-        )
+        payload = token_verifier.decode(token)
         uuid: str = payload.get("uuid")
         if uuid is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Unauthorized.",
             )
-        token_data = Token(uuid=uuid)
+        token_data = TokenData(uuid=uuid)
         return token_data
     except JWTError:
         raise HTTPException(
@@ -77,24 +65,23 @@ def verify_token(token: str):
 
 def change_password(request, current_user, session):
     """パスワードを変更する処理"""
-    if not settings.pwd_context.verify(
-        request.current_password, current_user.hashed_password
-    ):
+    if not verify_password(request.current_password, current_user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="現在のパスワードが正しくありません",
         )
 
     # 新しいパスワードをハッシュ化
-    hasehd_new_password = settings.pwd_context.hash(request.new_password)
+    hasehd_new_password = hash_password(request.new_password)
 
     # パスワードを更新
     current_user.hashed_password = hasehd_new_password
     session.add(current_user)
     session.commit()
+    user_cache.invalidate(current_user.uuid)
 
     return {"message": "パスワードが正常に更新されました"}
 
 
 def get_password_hash(password: str) -> str:
-    return settings.pwd_context.hash(password)
+    return hash_password(password)
@@ -0,0 +1,115 @@
+"""
+JWT の署名・検証
+- 鍵は起動時に1回だけ読み込む (HS*, RS*, ES* に対応)
+- kid ヘッダーで検証鍵を切り替えることで鍵のローテーションに対応する
+- 検証済みトークンは有効期限まで LRU に保持し、再検証を省略する
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from jose import jwk, jwt
+from jose.exceptions import ExpiredSignatureError, JWTError
+
+from core.config import settings
+
+
+class TokenVerifier:
+    def __init__(
+        self,
+        *,
+        algorithm: str,
+        signing_key: str,
+        verify_key: str,
+        kid: str | None = None,
+        previous_keys: dict[str, str] | None = None,
+        cache_size: int = 0,
+    ):
+        self.algorithm = algorithm
+        self.kid = kid
+        self._signing_key = jwk.construct(signing_key, algorithm)
+        self._verify_keys = {None: jwk.construct(verify_key, algorithm)}
+        if kid is not None:
+            self._verify_keys[kid] = self._verify_keys[None]
+        for previous_kid, key in (previous_keys or {}).items():
+            self._verify_keys[previous_kid] = jwk.construct(key, algorithm)
+
+        self.cache_size = cache_size
+        self._cache: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_settings(cls) -> "TokenVerifier":
+        if settings.ALGORITHM.startswith("HS"):
+            signing_key = verify_key = settings.SECRET_KEY
+        else:
+            signing_key, verify_key = settings.JWT_PRIVATE_KEY, settings.JWT_PUBLIC_KEY
+        return cls(
+            algorithm=settings.ALGORITHM,
+            signing_key=signing_key,
+            verify_key=verify_key,
+            kid=settings.JWT_KID,
+            previous_keys=settings.JWT_PREVIOUS_KEYS,
+            cache_size=settings.TOKEN_CACHE_SIZE,
+        )
+
+    def encode(self, claims: dict[str, Any]) -> str:
+        headers = {"kid": self.kid} if self.kid else None
+        return jwt.encode(
+            claims, self._signing_key, algorithm=self.algorithm, headers=headers
+        )
+
+    def decode(self, token: str) -> dict[str, Any]:
+        """署名と有効期限を検証してペイロードを返す (失敗時は JWTError)"""
+        claims = self._cached(token)
+        if claims is not None:
+            return claims
+
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = self._verify_keys.get(kid)
+        if key is None:
+            raise JWTError("Unknown key id.")
+        claims = jwt.decode(token, key, algorithms=[self.algorithm])
+        self._store(token, claims)
+        return claims
+
+    def _cached(self, token: str) -> dict[str, Any] | None:
+        if not self.cache_size:
+            return None
+        with self._lock:
+            claims = self._cache.get(token)
+            if claims is None:
+                self.misses += 1
+                return None
+            if claims.get("exp") is not None and claims["exp"] <= time.time():
+                del self._cache[token]
+                raise ExpiredSignatureError("Signature has expired.")
+            self._cache.move_to_end(token)
+            self.hits += 1
+            return claims
+
+    def _store(self, token: str, claims: dict[str, Any]) -> None:
+        if not self.cache_size:
+            return
+        with self._lock:
+            self._cache[token] = claims
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._cache),
+                "max_size": self.cache_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+token_verifier = TokenVerifier.from_settings()
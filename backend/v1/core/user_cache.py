@@ -0,0 +1,67 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from core.config import settings
+
+
+class UserCache:
+    """
+    認証済みユーザーのスナップショット (uuid -> dict) を保持するTTL付きLRUキャッシュ
+    - ユーザーの更新・削除・パスワード変更時は invalidate で破棄する
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._items: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, uuid: str) -> dict[str, Any] | None:
+        with self._lock:
+            item = self._items.get(uuid)
+            if item is None or item[0] < time.monotonic():
+                if item is not None:
+                    del self._items[uuid]
+                self.misses += 1
+                return None
+            self._items.move_to_end(uuid)
+            self.hits += 1
+            return item[1]
+
+    def set(self, uuid: str, snapshot: dict[str, Any]) -> None:
+        with self._lock:
+            self._items[uuid] = (time.monotonic() + self.ttl_seconds, snapshot)
+            self._items.move_to_end(uuid)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def invalidate(self, uuid: str) -> None:
+        with self._lock:
+            self._items.pop(uuid, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": settings.USER_CACHE_ENABLED,
+                "size": len(self._items),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+user_cache = UserCache(
+    max_size=settings.USER_CACHE_MAX_SIZE,
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,155 @@
+"""
+起動時のウォームアップ (WARMUP_ENABLED)
+- コネクションプールに DB_POOL_SIZE 本の接続を作っておく
+- bcrypt のプロセスプールを起動しておく (ワーカー数分のダミーのハッシュ化)
+- よく使う SQL を1回ずつ実行し、Engine のコンパイル済みキャッシュに載せておく
+  (READ_REPLICA_URLS のレプリカも同様。接続できないレプリカは外して起動を続ける)
+- 完了するまで /readyz は 503 を返す
+- SIGTERM を受けてから SHUTDOWN_DRAIN_SECONDS 秒間は /readyz が 503 を返したまま
+  リクエストを受け付け、その後 uvicorn の終了処理 (処理中のリクエストを待って終了) に入る
+"""
+
+import asyncio
+import logging
+import signal
+import threading
+import time
+from uuid import UUID
+
+from sqlalchemy import Engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.pool import NullPool
+from sqlmodel import Session, select
+
+from core import password
+from core.config import settings
+from crud.todo import (
+    TODO_FIELDS,
+    author_todos_version_statement,
+    todo_version_statement,
+    todos_statement,
+)
+from db.session import async_engine, engine, replica_set
+from models.User import User
+
+logger = logging.getLogger(__name__)
+
+# 存在しない id で実行する (結果は使わず、コンパイルと実行計画の作成だけが目的)
+_DUMMY_UUID = "00000000-0000-0000-0000-000000000000"
+
+
+class Readiness:
+    """/readyz で返す状態 (ワーカープロセス毎)"""
+
+    def __init__(self):
+        self.ready = False
+
+
+readiness = Readiness()
+
+
+def hot_statements() -> list:
+    """一覧・単体取得・ETag・認証で実行される SQL"""
+    return [
+        todos_statement(author_uuid=_DUMMY_UUID, fields=TODO_FIELDS).offset(0).limit(1),
+        todos_statement(fields=TODO_FIELDS).offset(0).limit(1),
+        author_todos_version_statement(_DUMMY_UUID),
+        todo_version_statement(UUID(_DUMMY_UUID)),
+        select(User).where(User.uuid == _DUMMY_UUID),
+        select(User).where(User.email == _DUMMY_UUID),
+    ]
+
+
+def _pool_size() -> int:
+    return 1 if settings.DB_USE_NULLPOOL else settings.DB_POOL_SIZE
+
+
+def warm_pool(target: Engine = engine) -> None:
+    if isinstance(target.pool, NullPool):
+        return
+    connections = [target.connect() for _ in range(_pool_size())]
+    for connection in connections:
+        connection.close()
+
+
+def warm_statements(target: Engine = engine) -> None:
+    with Session(target) as session:
+        for statement in hot_statements():
+            session.exec(statement).all()
+
+
+async def warm_async_engine(target=None) -> None:
+    target = target if target is not None else async_engine
+
+    async def checkout() -> None:
+        async with target.connect() as connection:
+            for statement in hot_statements():
+                (await connection.execute(statement)).all()
+
+    # 同時にチェックアウトして pool_size 本の接続を作る
+    await asyncio.gather(*(checkout() for _ in range(_pool_size())))
+
+
+def warm_password() -> None:
+    workers = password._workers()
+    password.hash_passwords(["warmup"] * max(workers, 1))
+
+
+async def warm_up() -> None:
+    started = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, warm_password)
+    # USE_ASYNC_DB の場合も users のルートは同期の Engine を使うため両方温める
+    await loop.run_in_executor(None, warm_pool)
+    await loop.run_in_executor(None, warm_statements)
+    if async_engine is not None:
+        await warm_async_engine()
+    if replica_set is not None:
+        await warm_replicas()
+    logger.info("Warmup finished in %.2f seconds.", time.perf_counter() - started)
+
+
+async def warm_replicas() -> None:
+    """GET のルートが読むレプリカも温める (ラウンドロビンで最初に当たるリクエストを遅くしない)"""
+    loop = asyncio.get_running_loop()
+    for replica in replica_set.replicas:
+        try:
+            await loop.run_in_executor(None, warm_pool, replica.engine)
+            await loop.run_in_executor(None, warm_statements, replica.engine)
+            if replica.async_engine is not None:
+                await warm_async_engine(replica.async_engine)
+        except (SQLAlchemyError, OSError) as e:
+            replica_set.mark_down(replica, e)
+
+
+def install_drain_handler(drain_seconds: float) -> None:
+    """
+    SIGTERM を受けたら readiness.ready を False にし、drain_seconds 秒後に元のハンドラ
+    (uvicorn の終了処理) を呼ぶ
+    - uvicorn のワーカーでは gunicorn の worker_int などのフックは SIGTERM で呼ばれないため、
+      起動時に uvicorn が設定したハンドラを包む
+    - 待っている間も新しいリクエストを受け付けるため、ロードバランサーが /readyz の 503 を見て
+      外すまでに届いたリクエストも処理できる
+    - シグナルハンドラはメインスレッドでのみ設定できる (TestClient などでは何もしない)
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return
+    previous = signal.getsignal(signal.SIGTERM)
+    if not callable(previous):
+        return
+
+    def handle_sigterm(signum, frame):
+        if not readiness.ready:
+            # 2回目以降は待たずに終了処理へ
+            previous(signum, frame)
+            return
+        readiness.ready = False
+        logger.info("SIGTERM received. Draining for %.1f seconds.", drain_seconds)
+        if drain_seconds <= 0:
+            previous(signum, frame)
+            return
+        timer = threading.Timer(drain_seconds, previous, args=(signum, None))
+        timer.daemon = True
+        timer.start()
+
+    signal.signal(signal.SIGTERM, handle_sigterm)
@@ -0,0 +1,272 @@
+"""crud.todo の AsyncSession 版"""
+
+from datetime import datetime, timezone
+from typing import Optional, Sequence
+from uuid import UUID
+
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from crud.todo import (
+    TODO_FIELDS,
+    author_todos_version_statement,
+    split_page,
+    split_search_page,
+    todos_page_statement,
+    todos_search_statement,
+    todos_statement,
+    todo_row_to_dict,
+    todo_version_statement,
+)
+from crud.todo_bulk import (
+    authors_statement,
+    delete_statement,
+    insert_statement,
+    mark_missing,
+    plan_create,
+    plan_update,
+    touch_statement,
+    update_statement,
+)
+from crud.todo_sync import (
+    changed_statement,
+    decode_sync_token,
+    deleted_statement,
+    encode_sync_token,
+    tombstone_statements,
+)
+from models.Todo import (
+    Todo,
+    TodoBulkResult,
+    TodoBulkUpdateItem,
+    TodoChanges,
+    TodoCreate,
+    TodoFilter,
+    TodoRead,
+    TodoUpdate,
+)
+
+
+async def create_todo(db: AsyncSession, todo: TodoCreate) -> Todo:
+    db_todo = Todo.model_validate(todo)
+    db.add(db_todo)
+    await db.commit()
+    await db.refresh(db_todo)
+    return db_todo
+
+
+async def get_todo(db: AsyncSession, todo_id: UUID) -> Optional[Todo]:
+    statement = select(Todo).where(Todo.id == todo_id).options(joinedload(Todo.author))
+    return (await db.exec(statement)).first()
+
+
+async def get_todo_version(
+    db: AsyncSession, todo_id: UUID, for_update: bool = False
+) -> Optional[tuple]:
+    return (await db.exec(todo_version_statement(todo_id, for_update))).first()
+
+
+async def get_author_todos_version(db: AsyncSession, author_uuid: str) -> tuple:
+    return (await db.exec(author_todos_version_statement(author_uuid))).one()
+
+
+async def get_todos(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    *,
+    filters: TodoFilter | None = None,
+    order_by: str = "created_at",
+    desc: bool = False
+) -> list[TodoRead]:
+    statement = todos_statement(filters=filters, order_by=order_by, desc=desc)
+    result = await db.exec(statement.offset(skip).limit(limit))
+    return result.all()
+
+
+async def get_todos_by_author_uuid(
+    *,
+    db: AsyncSession,
+    author_uuid: str,
+    skip: int = 0,
+    limit: int = 100,
+    filters: TodoFilter | None = None,
+    order_by: str = "created_at",
+    desc: bool = False
+) -> list[TodoRead]:
+    statement = todos_statement(
+        author_uuid=author_uuid, filters=filters, order_by=order_by, desc=desc
+    )
+    return (await db.exec(statement.offset(skip).limit(limit))).unique().all()
+
+
+async def get_todos_page(
+    *,
+    db: AsyncSession,
+    author_uuid: str | None = None,
+    filters: TodoFilter | None = None,
+    cursor: str | None = None,
+    order_by: str = "created_at",
+    desc: bool = False,
+    limit: int = 100
+) -> tuple[list[Todo], str | None]:
+    statement = todos_page_statement(
+        author_uuid=author_uuid,
+        filters=filters,
+        cursor=cursor,
+        order_by=order_by,
+        desc=desc,
+        limit=limit,
+    )
+    todos = (await db.exec(statement)).unique().all()
+    return split_page(todos, order_by=order_by, desc=desc, limit=limit)
+
+
+async def get_todo_rows(
+    *,
+    db: AsyncSession,
+    author_uuid: str | None = None,
+    skip: int = 0,
+    limit: int = 100,
+    filters: TodoFilter | None = None,
+    order_by: str = "created_at",
+    desc: bool = False,
+    fields: Sequence[str] = TODO_FIELDS
+) -> list[dict]:
+    statement = todos_statement(
+        author_uuid=author_uuid,
+        filters=filters,
+        order_by=order_by,
+        desc=desc,
+        fields=fields,
+    )
+    result = await db.exec(statement.offset(skip).limit(limit))
+    return [todo_row_to_dict(row, fields) for row in result]
+
+
+async def get_todo_rows_page(
+    *,
+    db: AsyncSession,
+    author_uuid: str | None = None,
+    filters: TodoFilter | None = None,
+    cursor: str | None = None,
+    order_by: str = "created_at",
+    desc: bool = False,
+    limit: int = 100,
+    fields: Sequence[str] = TODO_FIELDS
+) -> tuple[list[dict], str | None]:
+    statement = todos_page_statement(
+        author_uuid=author_uuid,
+        filters=filters,
+        cursor=cursor,
+        order_by=order_by,
+        desc=desc,
+        limit=limit,
+        fields=fields,
+    )
+    rows, next_cursor = split_page(
+        (await db.exec(statement)).all(), order_by=order_by, desc=desc, limit=limit
+    )
+    return [todo_row_to_dict(row, fields) for row in rows], next_cursor
+
+
+async def search_todos(
+    *,
+    db: AsyncSession,
+    q: str,
+    author_uuid: str | None = None,
+    cursor: str | None = None,
+    limit: int = 100
+) -> tuple[list[Todo], str | None]:
+    statement = todos_search_statement(
+        q=q, author_uuid=author_uuid, cursor=cursor, limit=limit
+    )
+    rows = (await db.exec(statement)).unique().all()
+    return split_search_page(rows, q=q, limit=limit)
+
+
+async def update_todo(
+    db: AsyncSession, todo_id: UUID, todo_update: TodoUpdate
+) -> Optional[Todo]:
+    db_todo = await db.get(Todo, todo_id)
+    if not db_todo:
+        return None
+
+    for key, value in todo_update.model_dump(exclude_unset=True).items():
+        setattr(db_todo, key, value)
+
+    db.add(db_todo)
+    await db.commit()
+    await db.refresh(db_todo)
+    return db_todo
+
+
+async def delete_todo(db: AsyncSession, todo_id: UUID) -> Optional[Todo]:
+    todo = await db.get(Todo, todo_id)
+    if not todo:
+        return None
+    await _record_deletions(db, [(todo.id, todo.author_uuid)])
+    await db.delete(todo)
+    await db.commit()
+    return todo
+
+
+async def create_todos(db: AsyncSession, todos: list[TodoCreate]) -> list[TodoBulkResult]:
+    existing_authors = set((await db.exec(authors_statement(todos))).all())
+    rows, results = plan_create(todos, existing_authors)
+    if rows:
+        await db.exec(insert_statement(rows))
+    await db.commit()
+    return results
+
+
+async def update_todos(
+    db: AsyncSession, items: list[TodoBulkUpdateItem]
+) -> list[TodoBulkResult]:
+    groups, touch_ids, results = plan_update(items)
+    found: set[UUID] = set()
+    for columns, rows in groups.items():
+        found.update((await db.exec(update_statement(columns, rows))).scalars().all())
+    if touch_ids:
+        found.update((await db.exec(touch_statement(touch_ids))).scalars().all())
+    await db.commit()
+    return mark_missing(results, found)
+
+
+async def delete_todos(db: AsyncSession, ids: list[UUID]) -> list[TodoBulkResult]:
+    results = [
+        TodoBulkResult(index=index, id=todo_id, status="deleted")
+        for index, todo_id in enumerate(ids)
+    ]
+    deleted = []
+    if ids:
+        deleted = (await db.exec(delete_statement(list(set(ids))))).all()
+    await _record_deletions(db, deleted)
+    await db.commit()
+    found = {todo_id for todo_id, _ in deleted}
+    return mark_missing(results, found)
+
+
+async def _record_deletions(db: AsyncSession, deleted: list[tuple[UUID, str]]) -> None:
+    if not deleted:
+        return
+    for statement in tombstone_statements(deleted):
+        await db.exec(statement)
+
+
+async def get_todo_changes(
+    *, db: AsyncSession, author_uuid: str, since: str | None = None
+) -> TodoChanges:
+    since_at = decode_sync_token(author_uuid, since) if since else None
+    started_at = datetime.now(timezone.utc)
+
+    changed = (await db.exec(changed_statement(author_uuid, since_at))).unique().all()
+    deleted = []
+    if since_at is not None:
+        deleted = (await db.exec(deleted_statement(author_uuid, since_at))).all()
+    return TodoChanges(
+        changed=changed,
+        deleted=deleted,
+        next_token=encode_sync_token(author_uuid, started_at),
+    )
@@ -0,0 +1,101 @@
+"""crud.user の AsyncSession 版"""
+
+from fastapi import Depends, HTTPException, Request, status
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from core.config import settings
+from core.password import averify_password
+from core.tokens import token_verifier
+from core.user_cache import user_cache
+from crud.user import user_from_snapshot, user_to_snapshot
+from db.session import get_async_session
+from models.User import User
+
+# auth
+from jose import JWTError
+
+
+async def get_user_by_uuid(session: AsyncSession, uuid: str) -> User | None:
+    return (await session.exec(select(User).where(User.uuid == uuid))).first()
+
+
+async def get_user_by_email(*, session: AsyncSession, email: str) -> User | None:
+    statement = select(User).where(User.email == email)
+    return (await session.exec(statement)).first()
+
+
+async def get_cached_user(session: AsyncSession, uuid: str) -> User | None:
+    if not settings.USER_CACHE_ENABLED:
+        return await get_user_by_uuid(session, uuid)
+
+    snapshot = user_cache.get(uuid)
+    if snapshot is not None:
+        return user_from_snapshot(snapshot)
+
+    user = await get_user_by_uuid(session, uuid)
+    if user:
+        user_cache.set(uuid, user_to_snapshot(user))
+    return user
+
+
+async def authenticate(
+    *, session: AsyncSession, email: str, password: str
+) -> User | None:
+    db_user = await get_user_by_email(session=session, email=email)
+    if not db_user:
+        return None
+    # bcrypt はプロセスプールで実行し、イベントループを止めない
+    if not await averify_password(password, db_user.hashed_password):
+        return None
+    return db_user
+
+
+async def get_current_user_from_token(session: AsyncSession, token: str, token_type: str):
+    try:
+        payload = token_verifier.decode(token)
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token."
+        )
+
+    if payload["token_type"] != token_type:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="token_type does not match.",
+        )
+
+    if token_type == "access_token":
+        current_user = await get_cached_user(session, payload["uuid"])
+    else:
+        current_user = await get_user_by_uuid(session, payload["uuid"])
+
+    if not current_user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found."
+        )
+    if token_type == "refresh_token" and current_user.refresh_token != token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="refresh_token does not match.",
+        )
+    return current_user
+
+
+async def get_current_user(
+    request: Request,
+    token: str = Depends(settings.oauth2_schema),
+    session: AsyncSession = Depends(get_async_session),
+):
+    current_user = getattr(request.state, "current_user", None)
+    if current_user is None:
+        current_user = await get_current_user_from_token(session, token, "access_token")
+        request.state.current_user = current_user
+    return current_user
+
+
+async def get_user_from_refresh_token(
+    token: str = Depends(settings.oauth2_schema),
+    session: AsyncSession = Depends(get_async_session),
+):
+    return await get_current_user_from_token(session, token, "refresh_token")
@@ -1,10 +1,96 @@
-from typing import Optional, Type
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Sequence, Type
 from uuid import UUID
 
+from fastapi import HTTPException, status
 from sqlmodel import Session, select
+from sqlalchemy import Float, and_, cast, func, or_, tuple_
 from sqlalchemy.orm import selectinload, joinedload
 
-from models.Todo import Todo, TodoCreate, TodoRead, TodoUpdate
+from core.pagination import decode_cursor, encode_cursor
+from crud.todo_sync import record_deletions
+from models.Todo import (
+    Todo,
+    TodoCreate,
+    TodoFilter,
+    TodoRead,
+    TodoUpdate,
+    todo_search_document,
+)
+from models.User import User
+
+
+# キーセットページネーションで使用できる並び順 (複合インデックスと対応)
+TODO_ORDER_COLUMNS = {
+    "created_at": Todo.created_at,
+    "updated_at": Todo.updated_at,
+    "limit_date": Todo.limit_date,
+}
+
+
+# 一覧の高速パスで返せる項目 (TodoRead と同じ順序)
+TODO_FIELDS = (
+    "title",
+    "description",
+    "completed",
+    "limit_date",
+    "id",
+    "created_at",
+    "updated_at",
+    "author_uuid",
+    "author",
+)
+# view=summary で返す項目
+TODO_SUMMARY_FIELDS = ("id", "title", "completed", "limit_date")
+
+
+def parse_todo_fields(fields: str | None, view: str = "full") -> tuple[str, ...]:
+    """
+    fields (カンマ区切り) または view から返す項目を決めます。
+    - fields を指定した場合は view より優先する
+    """
+    if fields is None:
+        return TODO_SUMMARY_FIELDS if view == "summary" else TODO_FIELDS
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - set(TODO_FIELDS)
+    if unknown or not requested:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}. "
+            f"Available fields: {', '.join(TODO_FIELDS)}.",
+        )
+    return tuple(name for name in TODO_FIELDS if name in requested)
+
+
+def todo_row_columns(fields: Sequence[str], order_by: str) -> list:
+    """
+    返す項目に必要な列だけを選択する
+    - キーセットページネーションのため並び順の列と id は常に含める
+    - author は作成者の username が必要なため user との JOIN を伴う
+    """
+    names = set(fields) | {"id", order_by}
+    if "author" in names:
+        names.add("author_uuid")
+    columns = [
+        getattr(Todo, name) for name in TODO_FIELDS if name in names and name != "author"
+    ]
+    if "author" in fields:
+        columns.append(User.username)
+    return columns
+
+
+def todo_row_to_dict(row, fields: Sequence[str] = TODO_FIELDS) -> dict:
+    """Core の select 結果の行を TodoRead と同じ形 (fields の項目のみ) の dict に変換します。"""
+    todo = {}
+    for name in fields:
+        if name == "author":
+            todo["author"] = {"uuid": row.author_uuid, "username": row.username}
+        elif name == "id":
+            # asyncpg は uuid.UUID のサブクラスを返し orjson が直接扱えないため文字列にする
+            todo["id"] = str(row.id)
+        else:
+            todo[name] = getattr(row, name)
+    return todo
 
 
 def create_todo(db: Session, todo: TodoCreate) -> Todo:
@@ -19,10 +105,49 @@ def get_todo(db: Session, todo_id: UUID) -> Optional[Todo]:
     return db.get(Todo, todo_id)
 
 
-def get_todos(db: Session, skip: int = 0, limit: int = 100) -> list[TodoRead]:
-    return db.exec(
-        select(Todo).options(selectinload(Todo.author)).offset(skip).limit(limit)
-    ).all()
+def todo_version_statement(todo_id: UUID, for_update: bool = False):
+    """Todo単体のETag用のバージョン (Todo と作成者の updated_at)"""
+    statement = (
+        select(Todo.updated_at, User.updated_at)
+        .join(User, Todo.author_uuid == User.uuid)
+        .where(Todo.id == todo_id)
+    )
+    if for_update:
+        statement = statement.with_for_update(of=Todo)
+    return statement
+
+
+def author_todos_version_statement(author_uuid: str):
+    """作成者毎のTodo一覧のETag用のバージョン (件数・最終更新時刻・作成者の updated_at)"""
+    author_updated_at = (
+        select(User.updated_at).where(User.uuid == author_uuid).scalar_subquery()
+    )
+    return select(
+        func.count(Todo.id), func.max(Todo.updated_at), author_updated_at
+    ).where(Todo.author_uuid == author_uuid)
+
+
+def get_todo_version(
+    db: Session, todo_id: UUID, for_update: bool = False
+) -> Optional[tuple]:
+    return db.exec(todo_version_statement(todo_id, for_update)).first()
+
+
+def get_author_todos_version(db: Session, author_uuid: str) -> tuple:
+    return db.exec(author_todos_version_statement(author_uuid)).one()
+
+
+def get_todos(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    *,
+    filters: TodoFilter | None = None,
+    order_by: str = "created_at",
+    desc: bool = False
+) -> list[TodoRead]:
+    statement = todos_statement(filters=filters, order_by=order_by, desc=desc)
+    return db.exec(statement.offset(skip).limit(limit)).all()
 
 
 def get_todos_by_author_uuid(
@@ -30,20 +155,318 @@ def get_todos_by_author_uuid(
     db: Session,
     author_uuid: str,
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    filters: TodoFilter | None = None,
+    order_by: str = "created_at",
+    desc: bool = False
 ) -> list[TodoRead]:
     """
     指定された author_uuid に紐づくTodoアイテムを取得します。
     """
 
-    statement = (
-        select(Todo)
-        .where(Todo.author_uuid == author_uuid)
-        .options(joinedload(Todo.author))
-        .offset(skip)
-        .limit(limit)
+    statement = todos_statement(
+        author_uuid=author_uuid, filters=filters, order_by=order_by, desc=desc
+    )
+    return db.exec(statement.offset(skip).limit(limit)).unique().all()
+
+
+def apply_todo_filters(statement, filters: TodoFilter | None, now: datetime | None = None):
+    """
+    絞り込み条件を WHERE 句に追加します。
+    - 各条件は (author_uuid,) completed, limit_date / updated_at の複合インデックスで処理できる形にする
+    """
+    if filters is None:
+        return statement
+    now = now or datetime.now(timezone.utc)
+
+    if filters.completed is not None:
+        statement = statement.where(Todo.completed == filters.completed)
+    if filters.due == "overdue":
+        statement = statement.where(
+            Todo.completed == False,  # noqa: E712
+            Todo.limit_date < now,
+        )
+    elif filters.due == "this_week":
+        statement = statement.where(
+            Todo.completed == False,  # noqa: E712
+            Todo.limit_date >= now,
+            Todo.limit_date < now + timedelta(days=7),
+        )
+    if filters.limit_date_from is not None:
+        statement = statement.where(Todo.limit_date >= filters.limit_date_from)
+    if filters.limit_date_to is not None:
+        statement = statement.where(Todo.limit_date < filters.limit_date_to)
+    if filters.updated_since is not None:
+        statement = statement.where(Todo.updated_at >= filters.updated_since)
+    return statement
+
+
+def todos_statement(
+    *,
+    author_uuid: str | None = None,
+    filters: TodoFilter | None = None,
+    order_by: str = "created_at",
+    desc: bool = False,
+    fields: Sequence[str] | None = None
+):
+    """
+    絞り込みと並び順を適用したTodo一覧のクエリを組み立てます。
+    - fields を指定した場合は ORM オブジェクトではなく必要な列だけの行を取得する
+    """
+    order_column = TODO_ORDER_COLUMNS[order_by]
+
+    if fields is not None:
+        statement = select(*todo_row_columns(fields, order_by))
+        if "author" in fields:
+            statement = statement.join(User, Todo.author_uuid == User.uuid)
+        if author_uuid is not None:
+            statement = statement.where(Todo.author_uuid == author_uuid)
+    else:
+        statement = select(Todo)
+        if author_uuid is not None:
+            statement = statement.where(Todo.author_uuid == author_uuid).options(
+                joinedload(Todo.author)
+            )
+        else:
+            statement = statement.options(selectinload(Todo.author))
+    statement = apply_todo_filters(statement, filters)
+
+    # limit_date は NULL を取り得るため、昇順では末尾・降順では先頭に並ぶ (PostgreSQL の既定)
+    if desc:
+        return statement.order_by(order_column.desc(), Todo.id.desc())
+    return statement.order_by(order_column, Todo.id)
+
+
+def todos_page_statement(
+    *,
+    author_uuid: str | None = None,
+    filters: TodoFilter | None = None,
+    cursor: str | None = None,
+    order_by: str = "created_at",
+    desc: bool = False,
+    limit: int = 100,
+    fields: Sequence[str] | None = None
+):
+    """
+    (order_by, id) をキーにしたキーセットページネーションのクエリを組み立てます。
+    - 次ページの有無を判定するため limit より1件多く取得する
+    """
+    statement = todos_statement(
+        author_uuid=author_uuid,
+        filters=filters,
+        order_by=order_by,
+        desc=desc,
+        fields=fields,
+    )
+
+    if cursor:
+        value, last_id = decode_cursor(
+            cursor, _cursor_key(order_by, desc), (_parse_datetime, UUID)
+        )
+        statement = statement.where(
+            _after_cursor(TODO_ORDER_COLUMNS[order_by], value, last_id, desc)
+        )
+
+    return statement.limit(limit + 1)
+
+
+def _parse_datetime(value: str | None) -> datetime | None:
+    return None if value is None else datetime.fromisoformat(value)
+
+
+def _after_cursor(order_column, value: datetime | None, last_id: UUID, desc: bool):
+    """
+    カーソル位置より後ろの行を表す条件
+    - NULL は昇順で末尾・降順で先頭になるため、NULL のカーソル値を個別に扱う
+    - NULL の条件は OR になりインデックスの範囲検索にならないため、NULL を取り得る
+      limit_date の場合のみ付ける (created_at / updated_at は行比較だけにする)
+    """
+    keys = tuple_(order_column, Todo.id)
+    if order_column is not Todo.limit_date:
+        return keys < tuple_(value, last_id) if desc else keys > tuple_(value, last_id)
+    if not desc:
+        if value is None:
+            return and_(order_column.is_(None), Todo.id > last_id)
+        return or_(keys > tuple_(value, last_id), order_column.is_(None))
+    if value is None:
+        return or_(
+            and_(order_column.is_(None), Todo.id < last_id),
+            order_column.is_not(None),
+        )
+    return keys < tuple_(value, last_id)
+
+
+def split_page(
+    todos: list[Todo], *, order_by: str, desc: bool, limit: int
+) -> tuple[list[Todo], str | None]:
+    """limit+1件の取得結果からページと next_cursor を作成します。"""
+    if len(todos) <= limit:
+        return todos, None
+    todos = todos[:limit]
+    last = todos[-1]
+    value = getattr(last, order_by)
+    next_cursor = encode_cursor(
+        _cursor_key(order_by, desc),
+        [value.isoformat() if value is not None else None, str(last.id)],
+    )
+    return todos, next_cursor
+
+
+def _cursor_key(order_by: str, desc: bool) -> str:
+    return f"{order_by}:{'desc' if desc else 'asc'}"
+
+
+def get_todos_page(
+    *,
+    db: Session,
+    author_uuid: str | None = None,
+    filters: TodoFilter | None = None,
+    cursor: str | None = None,
+    order_by: str = "created_at",
+    desc: bool = False,
+    limit: int = 100
+) -> tuple[list[Todo], str | None]:
+    """
+    (order_by, id) をキーにしたキーセットページネーションでTodoを取得します。
+    - cursor が空の場合は先頭ページを返す
+    - 次のページが存在する場合は next_cursor を返す
+    """
+    statement = todos_page_statement(
+        author_uuid=author_uuid,
+        filters=filters,
+        cursor=cursor,
+        order_by=order_by,
+        desc=desc,
+        limit=limit,
+    )
+    todos = db.exec(statement).unique().all()
+    return split_page(todos, order_by=order_by, desc=desc, limit=limit)
+
+
+def _like_pattern(q: str) -> str:
+    """ILIKE の特殊文字をエスケープした部分一致パターン"""
+    escaped = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def todos_search_statement(
+    *,
+    q: str,
+    author_uuid: str | None = None,
+    cursor: str | None = None,
+    limit: int = 100
+):
+    """
+    タイトルまたは説明欄に q を含むTodoを関連度順に取得するクエリを組み立てます。
+    - 絞り込みは ILIKE '%q%' (ix_todo_search_trgm が使われる)
+    - 関連度は word_similarity、同順位は id で並べ (rank, id) をキーセットにする
+    """
+    rank = cast(func.word_similarity(q, todo_search_document), Float)
+
+    statement = select(Todo, rank.label("rank")).where(
+        todo_search_document.ilike(_like_pattern(q), escape="\\")
+    )
+    if author_uuid is not None:
+        statement = statement.where(Todo.author_uuid == author_uuid).options(
+            joinedload(Todo.author)
+        )
+    else:
+        statement = statement.options(selectinload(Todo.author))
+
+    if cursor:
+        boundary = tuple_(*decode_cursor(cursor, _search_cursor_key(q), (float, UUID)))
+        statement = statement.where(tuple_(rank, Todo.id) < boundary)
+
+    return statement.order_by(rank.desc(), Todo.id.desc()).limit(limit + 1)
+
+
+def split_search_page(
+    rows: list, *, q: str, limit: int
+) -> tuple[list[Todo], str | None]:
+    """(Todo, rank) の取得結果からページと next_cursor を作成します。"""
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_todo, last_rank = rows[-1]
+        next_cursor = encode_cursor(
+            _search_cursor_key(q), [last_rank, str(last_todo.id)]
+        )
+    return [todo for todo, _ in rows], next_cursor
+
+
+def _search_cursor_key(q: str) -> str:
+    return f"search:{q}"
+
+
+def search_todos(
+    *,
+    db: Session,
+    q: str,
+    author_uuid: str | None = None,
+    cursor: str | None = None,
+    limit: int = 100
+) -> tuple[list[Todo], str | None]:
+    """
+    タイトルまたは説明欄のキーワード検索 (関連度順・キーセットページネーション)
+    """
+    statement = todos_search_statement(
+        q=q, author_uuid=author_uuid, cursor=cursor, limit=limit
+    )
+    rows = db.exec(statement).unique().all()
+    return split_search_page(rows, q=q, limit=limit)
+
+
+def get_todo_rows(
+    *,
+    db: Session,
+    author_uuid: str | None = None,
+    skip: int = 0,
+    limit: int = 100,
+    filters: TodoFilter | None = None,
+    order_by: str = "created_at",
+    desc: bool = False,
+    fields: Sequence[str] = TODO_FIELDS
+) -> list[dict]:
+    """
+    get_todos / get_todos_by_author_uuid の高速パス
+    - ORM オブジェクトを作らず、fields の項目に必要な列だけを取得して dict で返す
+    """
+    statement = todos_statement(
+        author_uuid=author_uuid,
+        filters=filters,
+        order_by=order_by,
+        desc=desc,
+        fields=fields,
+    )
+    result = db.exec(statement.offset(skip).limit(limit))
+    return [todo_row_to_dict(row, fields) for row in result]
+
+
+def get_todo_rows_page(
+    *,
+    db: Session,
+    author_uuid: str | None = None,
+    filters: TodoFilter | None = None,
+    cursor: str | None = None,
+    order_by: str = "created_at",
+    desc: bool = False,
+    limit: int = 100,
+    fields: Sequence[str] = TODO_FIELDS
+) -> tuple[list[dict], str | None]:
+    """get_todos_page の高速パス"""
+    statement = todos_page_statement(
+        author_uuid=author_uuid,
+        filters=filters,
+        cursor=cursor,
+        order_by=order_by,
+        desc=desc,
+        limit=limit,
+        fields=fields,
+    )
+    rows, next_cursor = split_page(
+        db.exec(statement).all(), order_by=order_by, desc=desc, limit=limit
     )
-    return db.exec(statement).all()
+    return [todo_row_to_dict(row, fields) for row in rows], next_cursor
 
 
 def update_todo(db: Session, todo_id: str, todo_update: TodoUpdate) -> Optional[Todo]:
@@ -65,6 +488,7 @@ def delete_todo(db: Session, todo_id: str) -> Optional[Todo]:
     todo = db.get(Todo, todo_id)
     if not todo:
         return None
+    record_deletions(db, [(todo.id, todo.author_uuid)])
     db.delete(todo)
     db.commit()
     return todo
@@ -0,0 +1,166 @@
+"""
+Todo の一括作成・更新・削除
+- すべての操作を1トランザクションで実行する
+- 作成は multi-row INSERT ... RETURNING, 更新は UPDATE ... FROM (VALUES ...),
+  削除は DELETE ... WHERE id = ANY(...) を使用する
+- 削除したTodoは差分同期用に todo_tombstone に記録する
+- SQL文の組み立てと結果の集計は AsyncSession 版 (crud.async_todo) と共有する
+"""
+
+from datetime import datetime, timezone
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import ARRAY, Uuid, any_, bindparam, cast, column, delete, insert, update, values
+from sqlmodel import Session, select
+
+from crud.todo_sync import record_deletions
+from models.Todo import Todo, TodoBulkResult, TodoBulkUpdateItem, TodoCreate
+from models.User import User
+
+# null を設定できない列 (更新時に null が指定された項目はエラーにする)
+NOT_NULL_COLUMNS = ("title", "completed")
+
+
+def authors_statement(todos: list[TodoCreate]):
+    return select(User.uuid).where(User.uuid.in_({todo.author_uuid for todo in todos}))
+
+
+def plan_create(
+    todos: list[TodoCreate], existing_authors: set[str]
+) -> tuple[list[dict[str, Any]], list[TodoBulkResult]]:
+    """登録する行と、作成者が存在しない項目のエラーを返す"""
+    rows: list[dict[str, Any]] = []
+    results: list[TodoBulkResult] = []
+    for index, todo in enumerate(todos):
+        if todo.author_uuid not in existing_authors:
+            results.append(
+                TodoBulkResult(index=index, status="failed", detail="Author not found.")
+            )
+            continue
+        row = Todo.model_validate(todo).model_dump()
+        rows.append(row)
+        results.append(TodoBulkResult(index=index, id=row["id"], status="created"))
+    return rows, results
+
+
+def insert_statement(rows: list[dict[str, Any]]):
+    return insert(Todo).values(rows).returning(Todo.id)
+
+
+def plan_update(
+    items: list[TodoBulkUpdateItem],
+) -> tuple[
+    dict[tuple[str, ...], dict[UUID, dict[str, Any]]], list[UUID], list[TodoBulkResult]
+]:
+    """
+    更新する列の組み合わせ毎に項目をまとめる
+    - id が重複した場合は先に id 毎に列をマージし (同じ列は後の項目を優先)、
+      1つの id が複数の UPDATE に分かれないようにする
+    - 更新する列が指定されていない項目は updated_at のみ更新する
+    """
+    merged: dict[UUID, dict[str, Any]] = {}
+    results: list[TodoBulkResult] = []
+    for index, item in enumerate(items):
+        data = item.model_dump(exclude_unset=True, exclude={"id"})
+        null_columns = [name for name in NOT_NULL_COLUMNS if name in data and data[name] is None]
+        if null_columns:
+            results.append(
+                TodoBulkResult(
+                    index=index,
+                    id=item.id,
+                    status="failed",
+                    detail=f"{', '.join(null_columns)} cannot be null.",
+                )
+            )
+            continue
+        results.append(TodoBulkResult(index=index, id=item.id, status="updated"))
+        merged.setdefault(item.id, {}).update(data)
+
+    groups: dict[tuple[str, ...], dict[UUID, dict[str, Any]]] = {}
+    touch_ids: list[UUID] = []
+    for todo_id, data in merged.items():
+        if data:
+            groups.setdefault(tuple(sorted(data)), {})[todo_id] = data
+        else:
+            touch_ids.append(todo_id)
+    return groups, touch_ids, results
+
+
+def update_statement(columns: tuple[str, ...], rows: dict[UUID, dict[str, Any]]):
+    table = Todo.__table__
+    source = values(
+        column("id", table.c.id.type),
+        *(column(name, table.c[name].type) for name in columns),
+        name="v",
+    ).data([(todo_id, *(data[name] for name in columns)) for todo_id, data in rows.items()])
+    # VALUES の各列はパラメータのため型を明示する
+    return (
+        update(Todo)
+        .where(Todo.id == cast(source.c.id, table.c.id.type))
+        .values(
+            {
+                **{name: cast(source.c[name], table.c[name].type) for name in columns},
+                "updated_at": datetime.now(timezone.utc),
+            }
+        )
+        .returning(Todo.id)
+    )
+
+
+def touch_statement(ids: list[UUID]):
+    return (
+        update(Todo)
+        .where(Todo.id == any_(cast(bindparam("ids", ids, type_=ARRAY(Uuid)), ARRAY(Uuid))))
+        .values(updated_at=datetime.now(timezone.utc))
+        .returning(Todo.id)
+    )
+
+
+def delete_statement(ids: list[UUID]):
+    return (
+        delete(Todo)
+        .where(Todo.id == any_(cast(bindparam("ids", ids, type_=ARRAY(Uuid)), ARRAY(Uuid))))
+        .returning(Todo.id, Todo.author_uuid)
+    )
+
+
+def mark_missing(results: list[TodoBulkResult], found: set[UUID]) -> list[TodoBulkResult]:
+    """RETURNING に含まれなかった項目を not_found にする"""
+    for result in results:
+        if result.status in ("updated", "deleted") and result.id not in found:
+            result.status = "not_found"
+            result.detail = "Todo not found"
+    return results
+
+
+def create_todos(db: Session, todos: list[TodoCreate]) -> list[TodoBulkResult]:
+    existing_authors = set(db.exec(authors_statement(todos)).all())
+    rows, results = plan_create(todos, existing_authors)
+    if rows:
+        db.exec(insert_statement(rows))
+    db.commit()
+    return results
+
+
+def update_todos(db: Session, items: list[TodoBulkUpdateItem]) -> list[TodoBulkResult]:
+    groups, touch_ids, results = plan_update(items)
+    found: set[UUID] = set()
+    for columns, rows in groups.items():
+        found.update(db.exec(update_statement(columns, rows)).scalars().all())
+    if touch_ids:
+        found.update(db.exec(touch_statement(touch_ids)).scalars().all())
+    db.commit()
+    return mark_missing(results, found)
+
+
+def delete_todos(db: Session, ids: list[UUID]) -> list[TodoBulkResult]:
+    results = [
+        TodoBulkResult(index=index, id=todo_id, status="deleted")
+        for index, todo_id in enumerate(ids)
+    ]
+    deleted = db.exec(delete_statement(list(set(ids)))).all() if ids else []
+    record_deletions(db, deleted)
+    db.commit()
+    found = {todo_id for todo_id, _ in deleted}
+    return mark_missing(results, found)
@@ -0,0 +1,114 @@
+"""
+Todo の差分同期
+- 作成・更新は updated_at、削除は todo_tombstone の deleted_at で since 以降の変更を求める
+- トークンには取得開始時刻を入れ、次回は少しさかのぼって取得する
+  (同じTodoが重複して返ることがあるため、クライアントは id で上書きする)
+- SQL文の組み立ては AsyncSession 版 (crud.async_todo) と共有する
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import joinedload
+from sqlmodel import Session, select
+
+from core.config import settings
+from core.pagination import decode_cursor, encode_cursor
+from models.Todo import Todo, TodoChanges, TodoTombstone
+
+
+def encode_sync_token(author_uuid: str, at: datetime) -> str:
+    return encode_cursor(_token_key(author_uuid), [at.isoformat()])
+
+
+def decode_sync_token(author_uuid: str, token: str) -> datetime:
+    """トークンを復元し、削除記録の保持期間を過ぎていれば 410 を返す"""
+    (since,) = decode_cursor(token, _token_key(author_uuid), (_parse_time,))
+    retention = timedelta(days=settings.TODO_TOMBSTONE_RETENTION_DAYS)
+    if since < datetime.now(timezone.utc) - retention:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Sync token expired. Fetch the full list again.",
+        )
+    return since
+
+
+def _parse_time(value: str) -> datetime:
+    at = datetime.fromisoformat(value)
+    return at if at.tzinfo else at.replace(tzinfo=timezone.utc)
+
+
+def _token_key(author_uuid: str) -> str:
+    return f"changes:{author_uuid}"
+
+
+def changed_statement(author_uuid: str, since: datetime | None):
+    statement = (
+        select(Todo)
+        .where(Todo.author_uuid == author_uuid)
+        .options(joinedload(Todo.author))
+        .order_by(Todo.updated_at, Todo.id)
+    )
+    if since is not None:
+        statement = statement.where(Todo.updated_at >= _with_overlap(since))
+    return statement
+
+
+def deleted_statement(author_uuid: str, since: datetime):
+    return select(TodoTombstone.todo_id).where(
+        TodoTombstone.author_uuid == author_uuid,
+        TodoTombstone.deleted_at >= _with_overlap(since),
+    )
+
+
+def _with_overlap(since: datetime) -> datetime:
+    return since - timedelta(seconds=settings.TODO_SYNC_OVERLAP_SECONDS)
+
+
+def tombstone_statements(deleted: list[tuple[UUID, str]]) -> list[Any]:
+    """削除したTodoの記録と、保持期間を過ぎた記録の削除"""
+    now = datetime.now(timezone.utc)
+    rows = [
+        {"todo_id": todo_id, "author_uuid": author_uuid, "deleted_at": now}
+        for todo_id, author_uuid in deleted
+    ]
+    retention = timedelta(days=settings.TODO_TOMBSTONE_RETENTION_DAYS)
+    return [
+        insert(TodoTombstone).values(rows).on_conflict_do_nothing(),
+        delete(TodoTombstone).where(TodoTombstone.deleted_at < now - retention),
+    ]
+
+
+def record_deletions(db: Session, deleted: list[tuple[UUID, str]]) -> None:
+    """削除記録を追加する (コミットは呼び出し元のトランザクションで行う)"""
+    if not deleted:
+        return
+    for statement in tombstone_statements(deleted):
+        db.exec(statement)
+
+
+def get_todo_changes(
+    *, db: Session, author_uuid: str, since: str | None = None
+) -> TodoChanges:
+    """
+    since のトークン以降に変更されたTodoと削除されたTodoの id を返します。
+    - since を指定しない場合は全件を返す (削除記録は返さない)
+    """
+    since_at = decode_sync_token(author_uuid, since) if since else None
+    started_at = datetime.now(timezone.utc)
+
+    changed = db.exec(changed_statement(author_uuid, since_at)).unique().all()
+    deleted = (
+        db.exec(deleted_statement(author_uuid, since_at)).all()
+        if since_at is not None
+        else []
+    )
+    return TodoChanges(
+        changed=changed,
+        deleted=deleted,
+        next_token=encode_sync_token(author_uuid, started_at),
+    )
@@ -1,22 +1,27 @@
-import os
+import logging
 from typing import Any, Optional
 
-from fastapi import Depends, HTTPException, status
-import pandas as pd
-from sqlmodel import Session, select
+from fastapi import Depends, HTTPException, Request, status
+from sqlmodel import Session, func, select
+from starlette.concurrency import run_in_threadpool
 
+from db.explain import estimated_rows
 from db.session import get_session
+from core.pagination import decode_cursor, encode_cursor
+from core.password import averify_password, verify_password
 from core.security import get_password_hash
+from core.tokens import token_verifier
+from core.user_cache import user_cache
 from crud.base import CRUDBase
-from models.User import User, UserCreate, UserUpdate
+from crud.user_import import import_users
+from models.User import User, UserCreate, UserListVersion, UsersPublic, UserUpdate
 from models.GenericSchema import TokenData
 from core.config import settings
 
 # auth
-from jose import jwt, JWTError
+from jose import JWTError
 
-# uuid
-import uuid as uuid_pkg
+logger = logging.getLogger(__name__)
 
 
 def create_user(*, session: Session, user_create: UserCreate) -> User:
@@ -48,6 +53,7 @@ def update_user(*, session: Session, db_user: User, user_in: UserUpdate) -> User
 
     session.add(db_user)
     session.commit()
+    user_cache.invalidate(db_user.uuid)
     session.refresh(db_user)
     return db_user
 
@@ -56,6 +62,112 @@ def get_user_by_uuid(session, uuid: str):
     return session.query(User).filter(User.uuid == uuid).first()
 
 
+def users_statement(
+    *,
+    is_active: bool | None = None,
+    is_superuser: bool | None = None,
+    email_prefix: str | None = None,
+):
+    """ユーザー一覧の絞り込み条件を適用したクエリ"""
+    statement = select(User)
+    if is_active is not None:
+        statement = statement.where(User.is_active == is_active)
+    if is_superuser is not None:
+        statement = statement.where(User.is_superuser == is_superuser)
+    if email_prefix:
+        # lower(email) の text_pattern_ops インデックスで前方一致を処理する
+        escaped = (
+            email_prefix.lower()
+            .replace("\\", "\\\\")
+            .replace("%", "\\%")
+            .replace("_", "\\_")
+        )
+        statement = statement.where(
+            func.lower(User.email).like(f"{escaped}%", escape="\\")
+        )
+    return statement
+
+
+def get_users_page(
+    session: Session,
+    *,
+    limit: int = 100,
+    cursor: str | None = None,
+    is_active: bool | None = None,
+    is_superuser: bool | None = None,
+    email_prefix: str | None = None,
+    exact_count: bool = False,
+) -> UsersPublic:
+    """
+    email をキーにしたキーセットページネーションでユーザーを取得します。
+    - count は既定ではプランナーの推定件数 (EXPLAIN)、exact_count=True の場合のみ count(*) を実行する
+    """
+    statement = users_statement(
+        is_active=is_active, is_superuser=is_superuser, email_prefix=email_prefix
+    )
+    if exact_count:
+        count = session.exec(
+            select(func.count()).select_from(statement.subquery())
+        ).one()
+    else:
+        count = estimated_rows(session, statement)
+
+    statement = statement.order_by(User.email)
+    if cursor:
+        (email,) = decode_cursor(cursor, "users:email", (str,))
+        statement = statement.where(User.email > email)
+    users = session.exec(statement.limit(limit + 1)).all()
+
+    next_cursor = None
+    if len(users) > limit:
+        users = users[:limit]
+        next_cursor = encode_cursor("users:email", [users[-1].email])
+    return UsersPublic(data=users, count=count, next_cursor=next_cursor)
+
+
+def get_user_version(session: Session, uuid: str):
+    """ユーザー単体のETag用のバージョン (updated_at)"""
+    return session.exec(select(User.updated_at).where(User.uuid == uuid)).first()
+
+
+def get_users_version(session: Session) -> tuple:
+    """
+    ユーザー一覧のETag用のバージョン (最終更新時刻・削除回数)
+    - max(updated_at) は ix_user_updated_at の末尾1件、削除回数は1行の読み取りで求める
+    """
+    deletions = select(UserListVersion.deletions).where(UserListVersion.id == 1)
+    return session.exec(
+        select(func.max(User.updated_at), deletions.scalar_subquery())
+    ).one()
+
+
+def user_to_snapshot(user: User) -> dict[str, Any]:
+    # refresh_token はログインの度に変わるためキャッシュしない
+    return user.model_dump(exclude={"refresh_token"})
+
+
+def user_from_snapshot(snapshot: dict[str, Any]) -> User:
+    return User.model_validate(snapshot, update={"refresh_token": None})
+
+
+def get_cached_user(session, uuid: str) -> User | None:
+    """
+    USER_CACHE_ENABLED の場合はキャッシュ済みのスナップショットからユーザーを返す
+    - キャッシュから返したユーザーはセッションに紐づかないため更新には使用しないこと
+    """
+    if not settings.USER_CACHE_ENABLED:
+        return get_user_by_uuid(session, uuid)
+
+    snapshot = user_cache.get(uuid)
+    if snapshot is not None:
+        return user_from_snapshot(snapshot)
+
+    user = get_user_by_uuid(session, uuid)
+    if user:
+        user_cache.set(uuid, user_to_snapshot(user))
+    return user
+
+
 def get_user_by_email(*, session: Session, email: str) -> User | None:
     statement = select(User).where(User.email == email)
     session_user = session.exec(statement).first()
@@ -71,20 +183,44 @@ def authenticate(*, session: Session, email: str, password: str) -> User | None:
     return db_user
 
 
-def get_current_user_from_token(session, token: str, token_type: str):
-    payload = jwt.decode(
-        token, os.environ["SECRET_KEY"], algorithms=[os.environ["ALGORITHM"]]
-    )
+async def aauthenticate(*, session: Session, email: str, password: str) -> User | None:
+    """
+    authenticate の async 版 (同期の Session を使うルート用)
+    - DB の処理はスレッドプールで行い、bcrypt の検証中はスレッドを占有しない
+    """
+    db_user = await run_in_threadpool(get_user_by_email, session=session, email=email)
+    if not db_user:
+        return None
+    if not await averify_password(password, db_user.hashed_password):
+        return None
+    return db_user
 
-    current_user = get_user_by_uuid(session, payload["uuid"])
+
+def get_current_user_from_token(session, token: str, token_type: str):
+    try:
+        payload = token_verifier.decode(token)
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token."
+        )
 
     if payload["token_type"] != token_type:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="token_type does not match.",
         )
+
+    if token_type == "access_token":
+        current_user = get_cached_user(session, payload["uuid"])
+    else:
+        current_user = get_user_by_uuid(session, payload["uuid"])
+
+    if not current_user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found."
+        )
     if token_type == "refresh_token" and current_user.refresh_token != token:
-        # print(current_user.refresh_token, "¥n", token)
+        logger.info("refresh_token of user %s does not match.", current_user.uuid)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="refresh_token does not match.",
@@ -93,12 +229,16 @@ def get_current_user_from_token(session, token: str, token_type: str):
 
 
 def get_current_user(
+    request: Request,
     token: str = Depends(settings.oauth2_schema),
     session: Session = Depends(get_session),
 ):
-    # print(token)
-    print(get_current_user_from_token(session, token, "access_token"))
-    return get_current_user_from_token(session, token, "access_token")
+    # 同一リクエスト内ではトークンの検証とユーザーの取得を1回だけ行う
+    current_user = getattr(request.state, "current_user", None)
+    if current_user is None:
+        current_user = get_current_user_from_token(session, token, "access_token")
+        request.state.current_user = current_user
+    return current_user
 
 
 def get_user_from_refresh_token(
@@ -110,13 +250,7 @@ def get_user_from_refresh_token(
 
 def verify_token(token: str):
     try:
-        payload = jwt.decode(
-            token,
-            os.environ["SECRET_KEY"],
-            algorithms=[
-                os.environ["ALGORITHM"],
-            ],
-        )
+        payload = token_verifier.decode(token)
         uuid: str = payload.get("uuid")
         if uuid is None:
             raise HTTPException(
@@ -131,10 +265,6 @@ def verify_token(token: str):
         )
 
 
-def verify_password(password, hashed_password):
-    return settings.pwd_context.verify(password, hashed_password)
-
-
 def check_user(session, user):
     checked_user = session.exec(
         select(User)
@@ -148,77 +278,15 @@ def check_user(session, user):
 
 
 def users_register(session, file_path: str):
-
-    failed_users = []
-
-    if file_path.endswith(".csv"):
-        df = pd.read_csv(file_path)
-    elif file_path.endswith(".xlsx"):
-        df = pd.read_excel(file_path)
-    else:
+    if not file_path.endswith((".csv", ".xlsx")):
         raise ValueError(
             "Invalid file format. Please provide a CSV or EXCEL file.",
         )
 
-    for index, row in df.iterrows():
-        # A: username, B: email, C:password, D:is_active, E: is_superuser
-        username = row["username"]
-        email = row["email"]
-        password = row["password"]
-        is_active = row["is_active"]
-        is_superuser = row["is_superuser"]
-
-        if pd.isna(username) or pd.isna(email) or pd.isna(password):
-            failed_users.append(
-                {
-                    "username": username,
-                    "error": "Username, email, password are required fired.",
-                }
-            )
-            continue
-
-        try:
-            hashed_password = get_password_hash(password)
-
-            # 既存ユーザーの検索
-            existing_user = (
-                session.query(User)
-                .filter((User.username == username) | (User.email == email))
-                .first()
-            )
-
-            if existing_user:
-                # ユーザーが存在する場合、情報を更新（空欄の場合はその項目をスキップ）
-                if not pd.isna(username):
-                    existing_user.username = username
-                if not pd.isna(email):
-                    existing_user.email = email
-                if not pd.isna(password):
-                    existing_user.hashed_password = hashed_password
-                if not pd.isna(is_active):
-                    existing_user.is_active = is_active
-                if not pd.isna(is_superuser):
-                    existing_user.is_superuser = is_superuser
-
-            else:
-                # ユーザーが存在しない場合、新規作成
-                new_user = User(
-                    uuid=str(uuid_pkg.uuid4()),
-                    username=username,
-                    email=email,
-                    hashed_password=hashed_password,
-                    is_active=is_active,
-                    is_superuser=is_superuser,
-                )
-
-                session.add(new_user)
-
-        except Exception as e:
-            failed_users.append({"username": username, "error": str(e)})
-
-    session.commit()
-
-    return failed_users
+    with open(file_path, "rb") as file:
+        return import_users(
+            session, file, file_path, batch_size=settings.USER_IMPORT_BATCH_SIZE
+        )
 
 
 def delete_user(session, uuid):
@@ -231,4 +299,5 @@ def delete_user(session, uuid):
 
     session.delete(user)
     session.commit()
+    user_cache.invalidate(uuid)
     return {"message": "User was deleted."}
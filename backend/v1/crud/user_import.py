@@ -0,0 +1,245 @@
+"""一括登録 (CSV / Excel) の取り込み処理"""
+
+import csv
+import io
+import uuid as uuid_pkg
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import IO, Any, Callable, Iterator, Optional
+
+from sqlalchemy import or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel import Session, select
+
+from core.password import hash_passwords
+from core.user_cache import user_cache
+from models.User import User
+
+REQUIRED_ERROR = "Username, email, password are required fired."
+FORMAT_ERROR = "Invalid file format. Please provide a CSV or EXCEL file."
+
+# 既存ユーザーと一致した場合に上書きする列 (refresh_token, created_at は維持する)
+UPSERT_COLUMNS = (
+    "username",
+    "email",
+    "hashed_password",
+    "is_active",
+    "is_superuser",
+    "updated_at",
+)
+
+
+@dataclass
+class ImportRow:
+    username: str
+    email: str
+    password: str
+    is_active: Optional[bool]
+    is_superuser: Optional[bool]
+
+
+def iter_rows(file: IO[bytes], filename: str) -> Iterator[dict[str, Any]]:
+    """
+    ファイル全体をメモリに載せずに1行ずつ dict で返す
+    - A: username, B: email, C:password, D:is_active, E: is_superuser
+    """
+    if filename.endswith(".csv"):
+        text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+        try:
+            yield from csv.DictReader(text)
+        finally:
+            text.detach()
+    elif filename.endswith(".xlsx"):
+        # openpyxl は読み込みに時間がかかるため、Excel を取り込む時に初めて import する
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(file, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = [str(value).strip() if value is not None else "" for value in next(rows, ())]
+            for values in rows:
+                yield dict(zip(header, values))
+        finally:
+            workbook.close()
+    else:
+        raise ValueError(FORMAT_ERROR)
+
+
+def count_rows(file: IO[bytes], filename: str) -> int:
+    """進捗表示用のデータ行数 (ヘッダーを除く)"""
+    if filename.endswith(".xlsx"):
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(file, read_only=True)
+        try:
+            total = max((workbook.active.max_row or 1) - 1, 0)
+        finally:
+            workbook.close()
+    else:
+        total = max(sum(1 for _ in file) - 1, 0)
+    file.seek(0)
+    return total
+
+
+def _clean(value: Any) -> Any:
+    if isinstance(value, str):
+        value = value.strip()
+    return None if value == "" else value
+
+
+def _to_bool(value: Any) -> Optional[bool]:
+    value = _clean(value)
+    if value is None or isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return bool(value)
+    lowered = str(value).lower()
+    if lowered in ("true", "t", "yes", "y", "1"):
+        return True
+    if lowered in ("false", "f", "no", "n", "0"):
+        return False
+    raise ValueError(f"Invalid boolean value: {value}")
+
+
+def _parse_row(row: dict[str, Any]) -> ImportRow:
+    username, email, password = (
+        _clean(row.get("username")),
+        _clean(row.get("email")),
+        _clean(row.get("password")),
+    )
+    if username is None or email is None or password is None:
+        raise ValueError(REQUIRED_ERROR)
+    return ImportRow(
+        username=str(username),
+        email=str(email),
+        password=str(password),
+        is_active=_to_bool(row.get("is_active")),
+        is_superuser=_to_bool(row.get("is_superuser")),
+    )
+
+
+def _upsert(session: Session, values: list[dict[str, Any]]) -> None:
+    statement = insert(User).values(values)
+    statement = statement.on_conflict_do_update(
+        index_elements=[User.uuid],
+        set_={column: statement.excluded[column] for column in UPSERT_COLUMNS},
+    )
+    session.exec(statement)
+
+
+def _import_batch(
+    session: Session, batch: list[ImportRow], failed_users: list[dict[str, Any]]
+) -> None:
+    # 既存ユーザーの検索 (バッチ毎に1回の IN クエリ)
+    usernames = [row.username for row in batch]
+    emails = [row.email for row in batch]
+    existing = session.exec(
+        select(User).where(or_(User.username.in_(usernames), User.email.in_(emails)))
+    ).all()
+    known: dict[str, dict[str, Any]] = {}
+    for user in existing:
+        known[f"username:{user.username}"] = known[f"email:{user.email}"] = {
+            "uuid": user.uuid,
+            "is_active": user.is_active,
+            "is_superuser": user.is_superuser,
+            "created_at": user.created_at,
+        }
+
+    hashed_passwords = hash_passwords([row.password for row in batch])
+    now = datetime.now(timezone.utc)
+
+    # 同じユーザーがバッチ内に複数回現れた場合は後の行で上書きする
+    values: dict[str, dict[str, Any]] = {}
+    for row, hashed_password in zip(batch, hashed_passwords):
+        current = known.get(f"username:{row.username}") or known.get(
+            f"email:{row.email}"
+        )
+        if current is None:
+            current = {
+                "uuid": str(uuid_pkg.uuid4()),
+                "is_active": True,
+                "is_superuser": False,
+                "created_at": now,
+            }
+
+        value = {
+            "uuid": current["uuid"],
+            "username": row.username,
+            "email": row.email,
+            "hashed_password": hashed_password,
+            # 空欄の場合は既存の値 (新規の場合は既定値) を維持する
+            "is_active": current["is_active"] if row.is_active is None else row.is_active,
+            "is_superuser": (
+                current["is_superuser"]
+                if row.is_superuser is None
+                else row.is_superuser
+            ),
+            "is_stuff": True,
+            "created_at": current["created_at"],
+            "updated_at": now,
+            "refresh_token": None,
+        }
+        values[value["uuid"]] = value
+        known[f"username:{row.username}"] = known[f"email:{row.email}"] = value
+
+    try:
+        _upsert(session, list(values.values()))
+        session.commit()
+    except SQLAlchemyError:
+        session.rollback()
+        # バッチ内の失敗した行を特定するため1行ずつ登録し直す
+        for value in values.values():
+            try:
+                _upsert(session, [value])
+                session.commit()
+            except SQLAlchemyError as e:
+                session.rollback()
+                failed_users.append(
+                    {
+                        "username": value["username"],
+                        "error": str(getattr(e, "orig", None) or e),
+                    }
+                )
+
+    for user in existing:
+        user_cache.invalidate(user.uuid)
+
+
+def import_users(
+    session: Session,
+    file: IO[bytes],
+    filename: str,
+    *,
+    batch_size: int = 1000,
+    on_progress: Callable[[int, int], None] | None = None,
+) -> list[dict[str, Any]]:
+    """
+    ファイルをストリーミングで読み込み、batch_size 行毎に登録する
+    - 既存ユーザー (username または email が一致) は更新、それ以外は新規作成
+    - 行単位のエラーは failed_users として返す
+    - on_progress(処理済み行数, 失敗行数) はバッチ毎に呼ばれる
+    """
+    failed_users: list[dict[str, Any]] = []
+    processed = 0
+    batch: list[ImportRow] = []
+
+    def flush() -> None:
+        nonlocal processed, batch
+        if batch:
+            _import_batch(session, batch, failed_users)
+        if on_progress:
+            on_progress(processed, len(failed_users))
+        batch = []
+
+    for row in iter_rows(file, filename):
+        processed += 1
+        try:
+            batch.append(_parse_row(row))
+        except ValueError as e:
+            failed_users.append({"username": _clean(row.get("username")), "error": str(e)})
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+
+    return failed_users
@@ -0,0 +1,250 @@
+import logging
+import os
+import shutil
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from tempfile import SpooledTemporaryFile
+from typing import IO, Optional
+from uuid import UUID
+
+from fastapi import UploadFile
+from sqlalchemy import or_
+from sqlmodel import Session, update
+
+from core.config import settings
+from crud.user_import import count_rows, import_users
+from db.session import engine
+from models.UserImportJob import UserImportJob, UserImportJobPublic
+
+logger = logging.getLogger(__name__)
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.USER_IMPORT_WORKERS, thread_name_prefix="user-import"
+)
+
+# 未完了のジョブ (アップロードファイルを持つプロセスが止まると続行できない)
+UNFINISHED_STATUSES = ("queued", "running")
+INTERRUPTED_ERROR = "The server stopped before the job finished. Please upload the file again."
+
+_heartbeat_lock = threading.Lock()
+_heartbeat_thread: Optional[threading.Thread] = None
+
+
+def _now() -> datetime:
+    # DBから読み込んだ値 (naive UTC) と比較するため tzinfo を外す
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _owner() -> str:
+    # preload_app で fork した各ワーカーで異なる値になるよう、呼び出し時に求める
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def record_heartbeat() -> int:
+    """このプロセスが受け付けた未完了のジョブの heartbeat_at を更新する"""
+    with Session(engine) as session:
+        result = session.exec(
+            update(UserImportJob)
+            .where(
+                UserImportJob.owner == _owner(),
+                UserImportJob.status.in_(UNFINISHED_STATUSES),
+            )
+            .values(heartbeat_at=_now())
+        )
+        session.commit()
+        return result.rowcount
+
+
+def _heartbeat_loop() -> None:
+    while True:
+        time.sleep(settings.USER_IMPORT_HEARTBEAT_SECONDS)
+        try:
+            record_heartbeat()
+        except Exception:
+            logger.exception("Failed to record the user import heartbeat.")
+
+
+def _start_heartbeat() -> None:
+    """最初のジョブを受け付けたときに生存の記録を始める (プロセスの終了まで続ける)"""
+    global _heartbeat_thread
+    with _heartbeat_lock:
+        if _heartbeat_thread is None or not _heartbeat_thread.is_alive():
+            _heartbeat_thread = threading.Thread(
+                target=_heartbeat_loop, name="user-import-heartbeat", daemon=True
+            )
+            _heartbeat_thread.start()
+
+
+def enqueue_user_import(session: Session, upload: UploadFile) -> UserImportJob:
+    """
+    アップロードファイルを一時ファイルにコピーし、取り込みジョブを登録する
+    - 小さいファイルはメモリ上、USER_IMPORT_SPOOL_MAX_SIZE を超えるとディスクに退避される
+    - ファイルはこのプロセス内にしか無いため、ジョブにこのプロセスを記録し生存を定期的に記録する
+    """
+    spooled = SpooledTemporaryFile(max_size=settings.USER_IMPORT_SPOOL_MAX_SIZE)
+    shutil.copyfileobj(upload.file, spooled)
+    spooled.seek(0)
+
+    job = UserImportJob(filename=upload.filename, owner=_owner(), heartbeat_at=_now())
+    session.add(job)
+    session.commit()
+    session.refresh(job)
+
+    _start_heartbeat()
+    _executor.submit(run_user_import_job, job.id, spooled, upload.filename)
+    return job
+
+
+def _claim(session: Session, job_id: UUID) -> bool:
+    """queued のジョブだけを running にする (既に interrupted などになったジョブは実行しない)"""
+    now = _now()
+    result = session.exec(
+        update(UserImportJob)
+        .where(UserImportJob.id == job_id, UserImportJob.status == "queued")
+        .values(status="running", started_at=now, updated_at=now)
+    )
+    session.commit()
+    return result.rowcount == 1
+
+
+def run_user_import_job(job_id: UUID, file: IO[bytes], filename: str) -> None:
+    try:
+        with Session(engine) as session:
+            if not _claim(session, job_id):
+                logger.warning("User import job %s is no longer queued; skipped.", job_id)
+                return
+            job = session.get(UserImportJob, job_id)
+            job.total_rows = count_rows(file, filename)
+            session.add(job)
+            session.commit()
+
+            def on_progress(processed: int, failed: int) -> None:
+                job.processed_rows = processed
+                job.failed_rows = failed
+                job.updated_at = _now()
+                session.add(job)
+                session.commit()
+
+            failed_users = import_users(
+                session,
+                file,
+                filename,
+                batch_size=settings.USER_IMPORT_BATCH_SIZE,
+                on_progress=on_progress,
+            )
+            job.status = "succeeded"
+            job.failed_users = failed_users
+            job.failed_rows = len(failed_users)
+            job.finished_at = job.updated_at = _now()
+            session.add(job)
+            session.commit()
+    except Exception as e:
+        logger.exception("User import job %s failed.", job_id)
+        with Session(engine) as session:
+            job = session.get(UserImportJob, job_id)
+            if job:
+                job.status = "failed"
+                job.error = str(e)
+                job.finished_at = job.updated_at = _now()
+                session.add(job)
+                session.commit()
+    finally:
+        file.close()
+
+
+def _orphaned(job: UserImportJob, now: datetime) -> bool:
+    heartbeat_before = now - timedelta(seconds=settings.USER_IMPORT_HEARTBEAT_TIMEOUT)
+    return job.heartbeat_at is None or job.heartbeat_at < heartbeat_before
+
+
+def interrupt_orphaned_jobs() -> int:
+    """
+    受け付けたプロセスの生存の記録が USER_IMPORT_HEARTBEAT_TIMEOUT 秒途絶えた
+    未完了のジョブ (queued / running) を interrupted にする (起動時に実行する)
+    - 再起動・異常終了したプロセスのジョブはアップロードファイルが失われており再開できない
+    - 他のワーカー・ホストが処理中・処理待ちのジョブは生存の記録が更新されているため対象外
+    """
+    now = _now()
+    heartbeat_before = now - timedelta(seconds=settings.USER_IMPORT_HEARTBEAT_TIMEOUT)
+    with Session(engine) as session:
+        result = session.exec(
+            update(UserImportJob)
+            .where(
+                UserImportJob.status.in_(UNFINISHED_STATUSES),
+                or_(
+                    UserImportJob.heartbeat_at.is_(None),
+                    UserImportJob.heartbeat_at < heartbeat_before,
+                ),
+            )
+            .values(
+                status="interrupted",
+                error=INTERRUPTED_ERROR,
+                finished_at=now,
+                updated_at=now,
+            )
+        )
+        session.commit()
+    if result.rowcount:
+        logger.warning("Marked %d orphaned user import job(s) as interrupted.", result.rowcount)
+    return result.rowcount
+
+
+def get_user_import_job(session: Session, job_id: UUID) -> Optional[UserImportJob]:
+    """
+    ジョブを取得する
+    - 受け付けたプロセスが止まった未完了のジョブ (queued / running) は interrupted に変更する
+    - 実行中に進捗が USER_IMPORT_STALE_SECONDS 秒途絶えたジョブも interrupted に変更する
+    """
+    job = session.get(UserImportJob, job_id)
+    now = _now()
+    stale_before = now - timedelta(seconds=settings.USER_IMPORT_STALE_SECONDS)
+    if job and job.status in UNFINISHED_STATUSES and (
+        _orphaned(job, now) or (job.status == "running" and job.updated_at < stale_before)
+    ):
+        job.status = "interrupted"
+        job.error = job.error or INTERRUPTED_ERROR
+        job.finished_at = now
+        session.add(job)
+        session.commit()
+        session.refresh(job)
+    return job
+
+
+def to_public(job: UserImportJob) -> UserImportJobPublic:
+    """処理速度 (行/秒) と残り時間の見込みを付けて返す"""
+    public = UserImportJobPublic.model_validate(job)
+    if job.started_at and job.processed_rows:
+        elapsed = ((job.finished_at or _now()) - job.started_at).total_seconds()
+        if elapsed > 0:
+            public.rows_per_second = round(job.processed_rows / elapsed, 2)
+            if job.total_rows is not None and job.status == "running":
+                remaining = max(job.total_rows - job.processed_rows, 0)
+                public.eta_seconds = round(remaining / public.rows_per_second, 1)
+    return public
+
+
+def shutdown() -> None:
+    """
+    処理待ちのジョブを取り消し、このプロセスの queued のジョブを interrupted にする
+    (実行中のジョブはプロセスの終了まで続け、異常終了した場合は生存の記録が途絶えて interrupted になる)
+    """
+    _executor.shutdown(wait=False, cancel_futures=True)
+    now = _now()
+    try:
+        with Session(engine) as session:
+            session.exec(
+                update(UserImportJob)
+                .where(UserImportJob.owner == _owner(), UserImportJob.status == "queued")
+                .values(
+                    status="interrupted",
+                    error=INTERRUPTED_ERROR,
+                    finished_at=now,
+                    updated_at=now,
+                )
+            )
+            session.commit()
+    except Exception:
+        logger.exception("Failed to mark queued user import jobs as interrupted.")
@@ -0,0 +1,26 @@
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) <statement> を実行するための SQL 構文"""
+
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def explain_plan(session, statement) -> dict:
+    """実行計画 (最上位の Plan ノード) を返す。クエリ自体は実行しない"""
+    return session.connection().execute(Explain(statement)).scalar()[0]["Plan"]
+
+
+def estimated_rows(session, statement) -> int:
+    """プランナーの推定行数 (pg_class.reltuples と統計情報に基づく概算)"""
+    return int(explain_plan(session, statement)["Plan Rows"])
@@ -1,8 +1,73 @@
+import os
+import re
+
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
 from sqlmodel import SQLModel
 
+from core.config import settings
 from db.session import engine
 from models.User import User  # noqa: F401
+from models.UserImportJob import UserImportJob  # noqa: F401
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "migrations")
+
+_REVISION = re.compile(r"^revision\b.*?=\s*['\"](\w+)['\"]", re.MULTILINE)
+_DOWN_REVISION = re.compile(r"^down_revision\b.*?=(.*)$", re.MULTILINE)
+_QUOTED = re.compile(r"['\"](\w+)['\"]")
 
 
 def create_db_and_tables():
     SQLModel.metadata.create_all(engine)
+
+
+def migration_heads() -> set[str]:
+    """
+    migrations/versions のリビジョンのうち、他のリビジョンの down_revision になっていないもの
+    - alembic の import (1秒近くかかる) を避けるため、ファイルの revision / down_revision を直接読む
+    """
+    revisions: set[str] = set()
+    parents: set[str] = set()
+    versions_dir = os.path.join(MIGRATIONS_DIR, "versions")
+    for filename in os.listdir(versions_dir):
+        if not filename.endswith(".py"):
+            continue
+        with open(os.path.join(versions_dir, filename), encoding="utf-8") as f:
+            source = f.read()
+        revision = _REVISION.search(source)
+        if revision is None:
+            continue
+        revisions.add(revision.group(1))
+        down_revision = _DOWN_REVISION.search(source)
+        if down_revision is not None:
+            parents.update(_QUOTED.findall(down_revision.group(1)))
+    return revisions - parents
+
+
+def check_migration_head():
+    """
+    DB の Alembic リビジョンが migrations の head と一致するかだけを確認する (DDL は実行しない)
+    - 一致しない場合は起動を中止する
+    """
+    heads = migration_heads()
+    try:
+        with engine.connect() as connection:
+            current = set(
+                connection.execute(text("SELECT version_num FROM alembic_version")).scalars()
+            )
+    except ProgrammingError:
+        # alembic_version が存在しない (一度もマイグレーションしていない)
+        current = set()
+    if current != heads:
+        raise RuntimeError(
+            f"Database revision {sorted(current) or None} does not match migration head "
+            f"{sorted(heads)}. Run 'alembic upgrade head' before starting the app."
+        )
+
+
+def init_db():
+    """DB_STARTUP_MODE に応じて起動時の DB の準備・確認を行う"""
+    if settings.DB_STARTUP_MODE == "create_all":
+        create_db_and_tables()
+    elif settings.DB_STARTUP_MODE == "check":
+        check_migration_head()
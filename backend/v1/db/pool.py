@@ -0,0 +1,76 @@
+import threading
+import time
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, QueuePool
+
+
+class PoolMetrics:
+    """コネクションプールのチェックアウト待ち時間とタイムアウトの集計"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.checkout_wait_seconds_total = 0.0
+        self.checkout_wait_seconds_max = 0.0
+
+    def record(self, waited: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.checkout_timeouts += 1
+            else:
+                self.checkouts += 1
+            self.checkout_wait_seconds_total += waited
+            self.checkout_wait_seconds_max = max(self.checkout_wait_seconds_max, waited)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.checkout_timeouts,
+                "checkout_wait_seconds_total": round(self.checkout_wait_seconds_total, 6),
+                "checkout_wait_seconds_max": round(self.checkout_wait_seconds_max, 6),
+            }
+
+
+class InstrumentedPoolMixin:
+    """QueuePool の _do_get をラップしてチェックアウト待ち時間を計測する"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record(time.perf_counter() - started, timed_out=True)
+            raise
+        self.metrics.record(time.perf_counter() - started)
+        return connection
+
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncAdaptedQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_status(pool: Pool) -> dict:
+    """/metrics/pool で返すプールの状態"""
+    if isinstance(pool, NullPool):
+        return {"poolclass": "NullPool"}
+    status = {
+        "poolclass": type(pool).__name__,
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+    }
+    if isinstance(pool, InstrumentedPoolMixin):
+        status.update(pool.metrics.as_dict())
+    return status
@@ -0,0 +1,48 @@
+"""
+pytest 用のクエリ数チェック (tests/conftest.py の pytest_plugins で読み込む)
+
+    def test_read_todos(client, query_budget):
+        with query_budget("GET", "/api/v1/todos/{author_uuid}"):
+            client.get(f"/api/v1/todos/{author_uuid}")
+
+- 上限は QUERY_BUDGETS にエンドポイント (メソッド, ルートのパス) 毎に定義する
+- 同じ形の SQL が max_repeats 回を超えて実行された場合も N+1 として失敗させる
+"""
+
+import pytest
+
+from db.query_inspector import query_budget as _query_budget
+
+# (メソッド, ルートのパス) -> 1リクエストで実行してよいクエリ数
+# sync / async (USE_ASYNC_DB) の両方で計測した多い方の値
+QUERY_BUDGETS: dict[tuple[str, str], int] = {
+    ("POST", "/api/v1/users/signup"): 3,
+    ("POST", "/api/v1/auth/login/access_token"): 3,
+    ("GET", "/api/v1/auth/me"): 1,
+    ("GET", "/api/v1/users/all_user"): 3,
+    ("GET", "/api/v1/users/{user_uuid}"): 2,
+    ("GET", "/api/v1/todos"): 1,
+    ("GET", "/api/v1/todos/search"): 2,
+    ("GET", "/api/v1/todos/{author_uuid}"): 2,
+    ("GET", "/api/v1/todos/{author_uuid}/changes"): 1,
+    ("GET", "/api/v1/todo/{todo_id}"): 3,
+}
+
+
+@pytest.fixture
+def query_budget():
+    def budget(
+        method: str,
+        route: str,
+        *,
+        max_queries: int | None = None,
+        max_repeats: int = 2,
+    ):
+        if max_queries is None:
+            key = (method.upper(), route)
+            if key not in QUERY_BUDGETS:
+                pytest.fail(f"No query budget is defined for {method} {route}.")
+            max_queries = QUERY_BUDGETS[key]
+        return _query_budget(max_queries, max_repeats=max_repeats)
+
+    return budget
@@ -0,0 +1,210 @@
+"""
+N+1 と遅いクエリの検出 (テスト・ステージング向け、既定では無効)
+- リクエスト毎に実行された SQL を記録し、同じ形の SQL が繰り返された場合 (N+1) や
+  クエリ数が上限を超えた場合に警告する
+- 閾値を超えた SELECT はリクエスト終了後に EXPLAIN を取得して実行計画と共にログに出す
+- query_budget はテストでエンドポイント毎のクエリ数の上限を確認するために使う
+"""
+
+import json
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from core.config import settings
+from core.metrics import route_label
+from db.explain import explain_plan
+
+logger = logging.getLogger(__name__)
+
+# IN (%(id_1)s, %(id_2)s, ...) / IN ($1, $2, ...) のように展開されたプレースホルダ
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\?\s*,\s*)*\?\s*\)")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|\$\d+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """パラメータと IN の要素数の違いを無視した SQL の形"""
+    shape = _PLACEHOLDER.sub("?", statement)
+    shape = _PLACEHOLDER_LIST.sub("(?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+@dataclass
+class QueryRecord:
+    statement: str
+    seconds: float
+    # EXPLAIN に使う SQL 構文 (SELECT のみ)
+    invoked: Any = None
+
+    @property
+    def shape(self) -> str:
+        return statement_shape(self.statement)
+
+
+@dataclass
+class QueryLog:
+    queries: list[QueryRecord] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    @property
+    def seconds(self) -> float:
+        return sum(query.seconds for query in self.queries)
+
+    def repeated(self, threshold: int) -> dict[str, int]:
+        """threshold 回以上実行された SQL の形とその回数"""
+        counts = Counter(query.shape for query in self.queries)
+        return {shape: count for shape, count in counts.items() if count >= threshold}
+
+    def slow(self, threshold_seconds: float) -> list[QueryRecord]:
+        return [query for query in self.queries if query.seconds >= threshold_seconds]
+
+
+_request_log: ContextVar[QueryLog | None] = ContextVar("query_log", default=None)
+# query_budget 用: スレッド・リクエストに関係なくすべてのクエリを記録する
+_global_logs: list[QueryLog] = []
+_global_lock = threading.Lock()
+# EXPLAIN の実行自体は記録しない
+_explaining: ContextVar[bool] = ContextVar("query_log_explaining", default=False)
+
+
+def _active_logs() -> list[QueryLog]:
+    logs = list(_global_logs)
+    request_log = _request_log.get()
+    if request_log is not None:
+        logs.append(request_log)
+    return logs
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if not _explaining.get() and (_global_logs or _request_log.get() is not None):
+        conn.info.setdefault("query_inspector_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("query_inspector_started")
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    invoked = getattr(context, "invoked_statement", None)
+    if invoked is not None and not getattr(invoked, "is_select", False):
+        invoked = None
+    record = QueryRecord(statement=statement, seconds=elapsed, invoked=invoked)
+    with _global_lock:
+        for log in _active_logs():
+            log.queries.append(record)
+
+
+@contextmanager
+def capture_queries() -> Iterator[QueryLog]:
+    """with 内で (同じコンテキストから) 実行された SQL を記録する"""
+    log = QueryLog()
+    token = _request_log.set(log)
+    try:
+        yield log
+    finally:
+        _request_log.reset(token)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def query_budget(max_queries: int, *, max_repeats: int | None = None) -> Iterator[QueryLog]:
+    """
+    with 内で実行された SQL の数が max_queries を超えた場合や、
+    同じ形の SQL が max_repeats 回を超えて実行された場合に QueryBudgetExceeded を送出する
+    - TestClient のようにアプリが別スレッドで動く場合も記録できるよう、プロセス全体のクエリを数える
+    """
+    log = QueryLog()
+    with _global_lock:
+        _global_logs.append(log)
+    try:
+        yield log
+    finally:
+        with _global_lock:
+            _global_logs.remove(log)
+
+    problems = []
+    if log.count > max_queries:
+        problems.append(f"{log.count} queries executed (budget: {max_queries})")
+    if max_repeats is not None:
+        for shape, count in log.repeated(max_repeats + 1).items():
+            problems.append(f"{count} x {shape}")
+    if problems:
+        raise QueryBudgetExceeded("\n".join(problems))
+
+
+def explain(record: QueryRecord) -> str | None:
+    if record.invoked is None:
+        return None
+    token = _explaining.set(True)
+    try:
+        from db.session import engine
+
+        with Session(engine) as session:
+            return json.dumps(explain_plan(session, record.invoked), indent=2)
+    except Exception:
+        logger.exception("Failed to EXPLAIN slow query.")
+        return None
+    finally:
+        _explaining.reset(token)
+
+
+def report(log: QueryLog, method: str, route: str) -> None:
+    """リクエスト1回分の記録を確認し、問題があれば警告する (EXPLAIN はここで実行する)"""
+    if log.count > settings.QUERY_INSPECTOR_MAX_QUERIES:
+        logger.warning(
+            "%s %s executed %d queries (limit: %d).",
+            method,
+            route,
+            log.count,
+            settings.QUERY_INSPECTOR_MAX_QUERIES,
+        )
+    for shape, count in log.repeated(settings.QUERY_INSPECTOR_REPEAT_THRESHOLD).items():
+        logger.warning("Possible N+1 in %s %s: %d x %s", method, route, count, shape)
+    for record in log.slow(settings.QUERY_INSPECTOR_SLOW_MS / 1000):
+        plan = explain(record) if settings.QUERY_INSPECTOR_EXPLAIN else None
+        logger.warning(
+            "Slow query in %s %s (%.1f ms): %s%s",
+            method,
+            route,
+            record.seconds * 1000,
+            record.statement,
+            f"\n{plan}" if plan else "",
+        )
+
+
+class QueryInspectorMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with capture_queries() as log:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                # レスポンスの送信後に確認するため、EXPLAIN の時間はクライアントへの応答時間に含まれない
+                await run_in_threadpool(report, log, scope["method"], route_label(scope))
@@ -0,0 +1,235 @@
+"""
+読み取り専用レプリカへの振り分け (READ_REPLICA_URLS)
+- get_read_session / get_async_read_session (db.session) は正常なレプリカをラウンドロビンで選ぶ
+- 各レプリカの遅延を READ_REPLICA_CHECK_INTERVAL 秒毎に確認し、
+  READ_REPLICA_MAX_LAG_SECONDS を超えた・接続できないレプリカは次の確認まで使わない
+  (使えるレプリカが無い場合はプライマリで読む)
+- 書き込み後 READ_YOUR_WRITES_SECONDS の間は、同じクライアントの読み取りをプライマリに送る
+  (ReadYourWritesMiddleware が Cookie と Authorization ヘッダーで同じクライアントを判定する)
+- Authorization ヘッダーによる判定は書き込みを処理したワーカーの中でのみ有効で、
+  複数ワーカー間では Cookie が返ってきた場合のみ有効になる
+  (サーバーから API を呼ぶクライアントは Set-Cookie を保持・中継する必要がある。
+  フロントエンドは app/data/readPrimary.server.ts でブラウザとの間で中継する)
+"""
+
+import hashlib
+import itertools
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from http.cookies import CookieError, SimpleCookie
+
+from sqlalchemy import Engine, text
+from sqlalchemy.exc import SQLAlchemyError
+
+logger = logging.getLogger(__name__)
+
+# プライマリ (リカバリ中でない) と、受信済みの WAL をすべて適用済みのレプリカは遅延 0 とする
+# (更新の無い間も pg_last_xact_replay_timestamp からの経過時間は増え続けるため)
+LAG_SQL = text(
+    "SELECT CASE"
+    " WHEN NOT pg_is_in_recovery() THEN 0"
+    " WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+    " ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+    " END"
+)
+
+READ_PRIMARY_COOKIE = "read_primary_until"
+
+_SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class Replica:
+    """レプリカ1台分の Engine と直近の確認結果"""
+
+    def __init__(self, name: str, engine: Engine, async_engine=None):
+        self.name = name
+        self.engine = engine
+        self.async_engine = async_engine
+        self.healthy = True
+        self.lag_seconds: float | None = None
+        self.last_error: str | None = None
+        self.checked_at = -math.inf  # time.monotonic()
+
+    def status(self) -> dict:
+        return {
+            "healthy": self.healthy,
+            "lag_seconds": self.lag_seconds,
+            "last_error": self.last_error,
+        }
+
+
+class ReplicaSet:
+    """正常なレプリカのラウンドロビンと、遅延・死活の確認"""
+
+    def __init__(self, replicas: list[Replica], max_lag_seconds: float, check_interval: float):
+        self.replicas = replicas
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval = check_interval
+        self._counter = itertools.count()
+        self._check_lock = threading.Lock()
+        self._reads_lock = threading.Lock()
+        # 読み取り先 (レプリカ名 / primary) 毎のセッション数
+        self.reads: dict[str, int] = {}
+
+    def check_due(self) -> bool:
+        now = time.monotonic()
+        return any(now - replica.checked_at >= self.check_interval for replica in self.replicas)
+
+    def refresh(self) -> None:
+        """確認の期限が来たレプリカの遅延を確認する (他のスレッドが確認中の場合は待たない)"""
+        if not self._check_lock.acquire(blocking=False):
+            return
+        try:
+            now = time.monotonic()
+            for replica in self.replicas:
+                if now - replica.checked_at >= self.check_interval:
+                    self._check(replica)
+        finally:
+            self._check_lock.release()
+
+    def _check(self, replica: Replica) -> None:
+        was_healthy = replica.healthy
+        try:
+            with replica.engine.connect() as connection:
+                lag = float(connection.execute(LAG_SQL).scalar() or 0)
+        except SQLAlchemyError as e:
+            replica.healthy = False
+            replica.lag_seconds = None
+            replica.last_error = type(e.orig if getattr(e, "orig", None) else e).__name__
+        else:
+            replica.lag_seconds = round(lag, 3)
+            replica.healthy = lag <= self.max_lag_seconds
+            replica.last_error = None if replica.healthy else "lagging"
+        replica.checked_at = time.monotonic()
+        if replica.healthy != was_healthy:
+            if replica.healthy:
+                logger.info("Read replica %s is back in rotation.", replica.name)
+            else:
+                logger.warning(
+                    "Read replica %s removed from rotation (%s, lag=%s).",
+                    replica.name,
+                    replica.last_error,
+                    replica.lag_seconds,
+                )
+
+    def mark_down(self, replica: Replica, error: BaseException) -> None:
+        """リクエスト中に接続できなかったレプリカを次の確認まで使わない"""
+        if replica.healthy:
+            logger.warning("Read replica %s is unreachable (%s).", replica.name, type(error).__name__)
+        replica.healthy = False
+        replica.last_error = type(error).__name__
+        replica.checked_at = time.monotonic()
+
+    def choose(self) -> Replica | None:
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return None
+        return healthy[next(self._counter) % len(healthy)]
+
+    def record(self, target: str) -> None:
+        with self._reads_lock:
+            self.reads[target] = self.reads.get(target, 0) + 1
+
+    def status(self) -> dict:
+        with self._reads_lock:
+            reads = dict(self.reads)
+        return {
+            "max_lag_seconds": self.max_lag_seconds,
+            "replicas": {replica.name: replica.status() for replica in self.replicas},
+            "reads": reads,
+        }
+
+
+class WriteTracker:
+    """クライアント毎の最後の書き込みから window_seconds の間だけ保持する (TTL付きLRU)"""
+
+    def __init__(self, window_seconds: float, max_size: int = 10000):
+        self.window_seconds = window_seconds
+        self.max_size = max_size
+        self._items: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def mark(self, key: str) -> None:
+        with self._lock:
+            self._items[key] = time.monotonic() + self.window_seconds
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def recent(self, key: str) -> bool:
+        with self._lock:
+            until = self._items.get(key)
+            if until is None:
+                return False
+            if until < time.monotonic():
+                del self._items[key]
+                return False
+            return True
+
+
+def _client_key(authorization: bytes | None) -> str | None:
+    # トークンそのものはメモリ上にも保持しない
+    if not authorization:
+        return None
+    return hashlib.blake2b(authorization, digest_size=16).hexdigest()
+
+
+def _cookie_until(cookie_header: bytes | None) -> float:
+    if not cookie_header:
+        return 0.0
+    cookie = SimpleCookie()
+    try:
+        cookie.load(cookie_header.decode("latin-1"))
+        return float(cookie[READ_PRIMARY_COOKIE].value)
+    except (CookieError, KeyError, ValueError):
+        return 0.0
+
+
+class ReadYourWritesMiddleware:
+    """
+    書き込み直後の読み取りをプライマリに送るための印を付ける
+    - GET/HEAD/OPTIONS 以外で 4xx/5xx 以外を返した場合、Cookie (複数ワーカー間で有効) と
+      プロセス内の記録 (Authorization ヘッダー毎) に書き込み時刻を残す
+    - 以降のリクエストで window_seconds 以内であれば request.state.read_primary を True にする
+    """
+
+    def __init__(self, app, window_seconds: float):
+        self.app = app
+        self.window_seconds = window_seconds
+        self.writes = WriteTracker(window_seconds)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        key = _client_key(headers.get(b"authorization"))
+        read_primary = _cookie_until(headers.get(b"cookie")) > time.time() or (
+            key is not None and self.writes.recent(key)
+        )
+        scope.setdefault("state", {})["read_primary"] = read_primary
+
+        if scope["method"] in _SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                if key is not None:
+                    self.writes.mark(key)
+                until = int(time.time() + self.window_seconds) + 1
+                cookie = (
+                    f"{READ_PRIMARY_COOKIE}={until}; Max-Age={math.ceil(self.window_seconds)}; "
+                    "Path=/; HttpOnly; SameSite=Lax"
+                )
+                message = {
+                    **message,
+                    "headers": [*message.get("headers", []), (b"set-cookie", cookie.encode("latin-1"))],
+                }
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
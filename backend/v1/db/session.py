@@ -1,11 +1,150 @@
+from fastapi import Request
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
 from sqlmodel import create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.concurrency import run_in_threadpool
 
 from core.config import settings
+from db.pool import InstrumentedAsyncAdaptedQueuePool, InstrumentedQueuePool
+from db.replica import Replica, ReplicaSet
 
 
-engine = create_engine(str(settings.DATABASE_URL))
+def connect_args(is_async: bool = False) -> dict:
+    """
+    接続時のセッション設定
+    - 日時は UTCDateTime で UTC の naive datetime として timestamp 列に保存するため、
+      サーバーの TimeZone に関わらず now() などが UTC で評価されるよう固定する
+      (options を渡せない接続プーラーを使う場合は ALTER DATABASE ... SET timezone TO 'UTC' で代替する)
+    """
+    if is_async:
+        return {"server_settings": {"timezone": "UTC"}}
+    return {"options": "-c timezone=UTC"}
+
+
+def engine_options(is_async: bool = False) -> dict:
+    """Settings からコネクションプールの設定を組み立てる"""
+    if settings.DB_USE_NULLPOOL:
+        return {
+            "poolclass": NullPool,
+            "pool_pre_ping": settings.DB_POOL_PRE_PING,
+            "connect_args": connect_args(is_async),
+        }
+    return {
+        "connect_args": connect_args(is_async),
+        "poolclass": (
+            InstrumentedAsyncAdaptedQueuePool if is_async else InstrumentedQueuePool
+        ),
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+engine = create_engine(str(settings.DATABASE_URL), **engine_options())
+
+# asyncpg は USE_ASYNC_DB が有効な場合のみ読み込む
+async_engine = (
+    create_async_engine(str(settings.ASYNC_DATABASE_URL), **engine_options(is_async=True))
+    if settings.USE_ASYNC_DB
+    else None
+)
+
+
+def _create_replica(index: int, url: str) -> Replica:
+    # 停止しているレプリカへの接続でリクエストを待たせないよう、接続タイムアウトを短くする
+    timeout = settings.READ_REPLICA_CONNECT_TIMEOUT
+    options = engine_options()
+    options["connect_args"] = {**options["connect_args"], "connect_timeout": timeout}
+    replica_engine = create_engine(url, **options)
+    replica_async_engine = None
+    if settings.USE_ASYNC_DB:
+        async_url = make_url(url).set(drivername="postgresql+asyncpg")
+        options = engine_options(is_async=True)
+        options["connect_args"] = {**options["connect_args"], "timeout": timeout}
+        replica_async_engine = create_async_engine(async_url, **options)
+    return Replica(f"replica-{index}", replica_engine, replica_async_engine)
+
+
+replica_set = (
+    ReplicaSet(
+        [_create_replica(i, url) for i, url in enumerate(settings.READ_REPLICA_URLS)],
+        max_lag_seconds=settings.READ_REPLICA_MAX_LAG_SECONDS,
+        check_interval=settings.READ_REPLICA_CHECK_INTERVAL,
+    )
+    if settings.READ_REPLICA_URLS
+    else None
+)
 
 
 def get_session():
     with Session(engine) as session:
         yield session
+
+
+async def get_async_session():
+    async with AsyncSession(async_engine) as session:
+        yield session
+
+
+def _read_primary(request: Request) -> bool:
+    # ReadYourWritesMiddleware が書き込み直後のクライアントに付ける印
+    return replica_set is None or getattr(request.state, "read_primary", False)
+
+
+def get_read_session(request: Request):
+    """
+    GET のルート用のセッション
+    - 正常なレプリカをラウンドロビンで選び、使えない場合や書き込み直後はプライマリで読む
+    - 接続をここで取得し、失敗した場合はそのレプリカを外してプライマリに切り替える
+    """
+    session = None
+    if not _read_primary(request):
+        replica_set.refresh()
+        replica = replica_set.choose()
+        if replica is not None:
+            session = Session(replica.engine)
+            try:
+                session.connection()
+            except DBAPIError as e:
+                session.close()
+                replica_set.mark_down(replica, e)
+                session = None
+            else:
+                replica_set.record(replica.name)
+    if session is None:
+        if replica_set is not None:
+            replica_set.record("primary")
+        session = Session(engine)
+    with session:
+        yield session
+
+
+async def get_async_read_session(request: Request):
+    """get_read_session の async 版"""
+    session = None
+    if not _read_primary(request):
+        # 遅延の確認は同期の Engine で行うため、期限が来た場合のみスレッドで実行する
+        if replica_set.check_due():
+            await run_in_threadpool(replica_set.refresh)
+        replica = replica_set.choose()
+        if replica is not None:
+            session = AsyncSession(replica.async_engine)
+            try:
+                await session.connection()
+            except (DBAPIError, OSError) as e:
+                await session.close()
+                replica_set.mark_down(replica, e)
+                session = None
+            else:
+                replica_set.record(replica.name)
+    if session is None:
+        if replica_set is not None:
+            replica_set.record("primary")
+        session = AsyncSession(async_engine)
+    async with session:
+        yield session
@@ -0,0 +1,47 @@
+"""
+本番用の起動設定 (gunicorn + uvicorn のワーカー)
+
+    cd backend/v1
+    gunicorn -c gunicorn.conf.py main:app
+
+- ワーカー数は WEB_CONCURRENCY (既定: CPUコア数)
+- preload_app でアプリをマスタープロセスで1回だけ import し、各ワーカーは fork で起動する
+- SIGTERM を受けると各ワーカーは SHUTDOWN_DRAIN_SECONDS 秒間 /readyz を 503 にしたまま
+  リクエストを受け付け、その後新しい接続の受け付けを止めて処理中のリクエストを待って終了する
+  (SIGTERM から GRACEFUL_TIMEOUT 秒で強制終了される)
+- 各ワーカーは起動時にウォームアップを行い、完了してからリクエストを受け付ける
+"""
+
+import multiprocessing
+import os
+
+cpu_count = multiprocessing.cpu_count()
+
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("WEB_CONCURRENCY", cpu_count))
+worker_class = "uvicorn_worker.UvicornWorker"
+preload_app = True
+graceful_timeout = int(os.environ.get("GRACEFUL_TIMEOUT", "30"))
+timeout = int(os.environ.get("WORKER_TIMEOUT", "60"))
+keepalive = 5
+accesslog = "-"
+
+# Settings はアプリの import 時に読み込まれるため、preload の前に既定値を設定する
+os.environ.setdefault("WARMUP_ENABLED", "true")
+os.environ.setdefault("DB_STARTUP_MODE", "check")
+os.environ.setdefault("SHUTDOWN_DRAIN_SECONDS", str(min(5, graceful_timeout / 3)))
+# ワーカー毎に bcrypt のプロセスプールを持つため、合計がコア数程度になるようにする
+os.environ.setdefault("PASSWORD_HASH_WORKERS", str(max(cpu_count // workers, 1)))
+
+
+def post_fork(server, worker):
+    # マスタープロセスで作られた接続をワーカー間で共有しないよう、プールを作り直す
+    from db.session import async_engine, engine, replica_set
+
+    engine.dispose(close=False)
+    if async_engine is not None:
+        async_engine.sync_engine.dispose(close=False)
+    for replica in replica_set.replicas if replica_set is not None else []:
+        replica.engine.dispose(close=False)
+        if replica.async_engine is not None:
+            replica.async_engine.sync_engine.dispose(close=False)
@@ -2,8 +2,14 @@ from fastapi import FastAPI
 from fastapi.routing import APIRoute
 from starlette.middleware.cors import CORSMiddleware
 
-from api.routes import auth, users, todos
-from db.init_db import create_db_and_tables
+from api.routes import auth, health, metrics, users, todos
+from core import password
+from core.compression import CompressionMiddleware
+from core.metrics import MetricsMiddleware
+from core.config import settings
+from core.warmup import install_drain_handler, readiness, warm_up
+from crud import user_import_job
+from db.init_db import init_db
 
 
 def custom_generate_unique_id(route: APIRoute):
@@ -20,12 +26,65 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        encodings=settings.COMPRESSION_ENCODINGS,
+        content_types=settings.COMPRESSION_CONTENT_TYPES,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+        zstd_level=settings.COMPRESSION_ZSTD_LEVEL,
+    )
+
+if settings.READ_REPLICA_URLS:
+    from db.replica import ReadYourWritesMiddleware
+
+    app.add_middleware(ReadYourWritesMiddleware, window_seconds=settings.READ_YOUR_WRITES_SECONDS)
+
+if settings.QUERY_INSPECTOR_ENABLED:
+    from db.query_inspector import QueryInspectorMiddleware
+
+    app.add_middleware(QueryInspectorMiddleware)
+
+# 圧縮などのミドルウェアの処理時間も含めて計測するため最後に追加する (最も外側)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 
 @app.on_event("startup")
 def on_startup():
-    create_db_and_tables()
+    init_db()
+    # 前のプロセスが残した未完了の一括登録ジョブを interrupted にする
+    user_import_job.interrupt_orphaned_jobs()
+
+
+@app.on_event("startup")
+async def on_startup_warm_up():
+    if settings.WARMUP_ENABLED:
+        await warm_up()
+    readiness.ready = True
+    install_drain_handler(settings.SHUTDOWN_DRAIN_SECONDS)
+
+
+@app.on_event("shutdown")
+def on_shutdown():
+    readiness.ready = False
+    password.shutdown()
+    user_import_job.shutdown()
+
+
+# USE_ASYNC_DB が有効な場合は auth / todos を AsyncEngine 版のルートに切り替える
+# (使用しない方のルートと asyncpg は import しない)
+if settings.USE_ASYNC_DB:
+    from api.routes import async_auth, async_todos
 
+    auth_router, todos_router = async_auth.router, async_todos.router
+else:
+    auth_router, todos_router = auth.router, todos.router
 
-app.include_router(auth.router, prefix="/api/v1/auth", tags=["auth"])
+app.include_router(auth_router, prefix="/api/v1/auth", tags=["auth"])
 app.include_router(users.router, prefix="/api/v1/users", tags=["users"])
-app.include_router(todos.router, prefix="/api/v1", tags=["todos"])
+app.include_router(todos_router, prefix="/api/v1", tags=["todos"])
+app.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
+app.include_router(health.router, tags=["health"])
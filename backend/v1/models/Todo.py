@@ -1,10 +1,15 @@
 from datetime import datetime, timezone
-from typing import Optional, TYPE_CHECKING
+from typing import Literal, Optional, TYPE_CHECKING
 from uuid import UUID, uuid4
 
 from pydantic import ValidationInfo, field_validator
+from sqlalchemy import DDL, Index, event, func, literal_column
 from sqlmodel import Field, Relationship, SQLModel
 
+from core.config import settings
+
+from .types import UTCDateTime
+
 
 if TYPE_CHECKING:
     from .User import User
@@ -14,7 +19,7 @@ class TodoBase(SQLModel):
     title: str = Field(index=True)
     description: Optional[str] = None
     completed: bool = Field(default=False)
-    limit_date: datetime | None = Field(nullable=True)
+    limit_date: datetime | None = Field(nullable=True, sa_type=UTCDateTime)
 
     # 空文字を None に変換するバリデータ
     @field_validator("limit_date", mode="before")
@@ -37,13 +42,34 @@ class TodoUpdate(TodoBase):
 
 
 class Todo(TodoBase, table=True):
+    # キーセットページネーション (created_at / updated_at, id) 用の複合インデックス
+    __table_args__ = (
+        Index("ix_todo_created_at_id", "created_at", "id"),
+        Index("ix_todo_updated_at_id", "updated_at", "id"),
+        Index("ix_todo_author_uuid_created_at_id", "author_uuid", "created_at", "id"),
+        Index("ix_todo_author_uuid_updated_at_id", "author_uuid", "updated_at", "id"),
+        # 完了状態・期限による絞り込みと期限順の並び替え用
+        Index("ix_todo_completed_limit_date", "completed", "limit_date"),
+        Index("ix_todo_limit_date_id", "limit_date", "id"),
+        Index(
+            "ix_todo_author_uuid_completed_limit_date",
+            "author_uuid",
+            "completed",
+            "limit_date",
+        ),
+        Index("ix_todo_author_uuid_limit_date_id", "author_uuid", "limit_date", "id"),
+    )
+
     id: Optional[UUID] = Field(default_factory=uuid4, primary_key=True)
     created_at: datetime = Field(
-        default_factory=lambda: datetime.now(timezone.utc), nullable=False
+        default_factory=lambda: datetime.now(timezone.utc),
+        nullable=False,
+        sa_type=UTCDateTime,
     )
     updated_at: datetime = Field(
         default_factory=lambda: datetime.now(timezone.utc),
         nullable=False,
+        sa_type=UTCDateTime,
         sa_column_kwargs={"onupdate": lambda: datetime.now(timezone.utc)},
     )
     author_uuid: str = Field(
@@ -52,6 +78,47 @@ class Todo(TodoBase, table=True):
     author: "User" = Relationship(back_populates="todos")
 
 
+# 全文検索の対象 (タイトル + 説明欄)
+# - pg_trgm の GIN インデックスと同じ式を検索クエリでも使うことでインデックスが選択される
+# - 日本語の部分一致にも対応できるよう tsvector ではなくトライグラムを使う
+todo_search_document = (
+    Todo.title
+    + literal_column("' '")
+    + func.coalesce(Todo.description, literal_column("''"))
+)
+Index(
+    "ix_todo_search_trgm",
+    todo_search_document.label("search_document"),
+    postgresql_using="gin",
+    postgresql_ops={"search_document": "gin_trgm_ops"},
+)
+event.listen(
+    Todo.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+
+class TodoTombstone(SQLModel, table=True):
+    """削除されたTodoの記録 (差分同期で削除をクライアントに伝えるため)"""
+
+    __tablename__ = "todo_tombstone"
+    __table_args__ = (
+        Index("ix_todo_tombstone_author_uuid_deleted_at", "author_uuid", "deleted_at"),
+        Index("ix_todo_tombstone_deleted_at", "deleted_at"),
+    )
+
+    todo_id: UUID = Field(primary_key=True)
+    author_uuid: str = Field(
+        foreign_key="user.uuid", nullable=False, ondelete="CASCADE"
+    )
+    deleted_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        nullable=False,
+        sa_type=UTCDateTime,
+    )
+
+
 class UserWithTodos(SQLModel):
     uuid: UUID
     username: str
@@ -60,12 +127,52 @@ class UserWithTodos(SQLModel):
 class TodoRead(TodoBase):
     id: UUID
     title: str
-    description: str
+    description: Optional[str] = None
     completed: bool
-    limit_date: datetime
+    limit_date: datetime | None = None
     created_at: datetime
     updated_at: datetime
     author_uuid: str
     author: "UserWithTodos"
 
 
+class TodosPublic(SQLModel):
+    data: list[TodoRead]
+    next_cursor: str | None = None
+
+
+class TodoChanges(SQLModel):
+    # since 以降に作成・更新されたTodo
+    changed: list[TodoRead]
+    # since 以降に削除されたTodoの id
+    deleted: list[UUID]
+    # 次回の差分取得に使うトークン
+    next_token: str
+
+
+class TodoFilter(SQLModel):
+    """Todo一覧の絞り込み条件 (クエリパラメータ)"""
+
+    completed: Optional[bool] = None
+    # overdue: 期限切れの未完了Todo / this_week: 今から7日以内が期限の未完了Todo
+    due: Optional[Literal["overdue", "this_week"]] = None
+    limit_date_from: Optional[datetime] = None
+    limit_date_to: Optional[datetime] = None
+    updated_since: Optional[datetime] = None
+
+
+class TodoBulkUpdateItem(TodoUpdate):
+    id: UUID
+
+
+class TodoBulkDelete(SQLModel):
+    ids: list[UUID] = Field(max_length=settings.TODO_BULK_MAX_ITEMS)
+
+
+class TodoBulkResult(SQLModel):
+    # リクエスト内の位置
+    index: int
+    id: Optional[UUID] = None
+    # created / updated / deleted / not_found / failed
+    status: str
+    detail: Optional[str] = None
@@ -1,10 +1,13 @@
 import uuid
 
 from pydantic import EmailStr, BaseModel
+from sqlalchemy import DDL, Index, event, func
 from sqlmodel import Field, SQLModel, Relationship
 from typing import List, TYPE_CHECKING
 from datetime import datetime, timezone
 
+from .types import UTCDateTime
+
 if TYPE_CHECKING:
     from .Todo import Todo
 
@@ -62,13 +65,16 @@ class User(UserBase, table=True):
     )
     hashed_password: str = Field(nullable=False)
     created_at: datetime = Field(
-        default=datetime.now(tz=timezone.utc),
+        default_factory=lambda: datetime.now(timezone.utc),
         nullable=False,
+        sa_type=UTCDateTime,
     )
+    # ETag の計算に使うため、更新の度に現在時刻を設定する
     updated_at: datetime = Field(
-        default_factory=datetime.now,
+        default_factory=lambda: datetime.now(timezone.utc),
         nullable=False,
-        sa_column_kwargs={"onupdate": datetime.now(tz=timezone.utc)},
+        sa_type=UTCDateTime,
+        sa_column_kwargs={"onupdate": lambda: datetime.now(timezone.utc)},
     )
     refresh_token: str | None = Field(
         nullable=True,
@@ -85,6 +91,56 @@ class User(UserBase, table=True):
     # )
 
 
+# メールアドレスの前方一致検索 (大文字小文字を区別しない) 用
+Index(
+    "ix_user_email_lower_pattern",
+    func.lower(User.email).label("email_lower"),
+    postgresql_ops={"email_lower": "text_pattern_ops"},
+)
+
+
+# ユーザー一覧の ETag 用 (max(updated_at) をインデックスの末尾1件から求める)
+Index("ix_user_updated_at", User.updated_at)
+
+
+class UserListVersion(SQLModel, table=True):
+    """
+    ユーザーの削除回数 (ユーザー一覧の ETag 用。id=1 の1行のみ)
+    - 削除は max(updated_at) に現れないため、user の DELETE 文毎にトリガーで1増やす
+    - 件数の代わりに使い、一覧の度に user テーブル全体を数えないようにする
+    """
+
+    __tablename__ = "user_list_version"
+
+    id: int = Field(default=1, primary_key=True)
+    deletions: int = Field(default=0, nullable=False)
+
+
+USER_LIST_VERSION_DDL = (
+    "INSERT INTO user_list_version (id, deletions) VALUES (1, 0) ON CONFLICT (id) DO NOTHING",
+    """
+    CREATE OR REPLACE FUNCTION bump_user_list_version() RETURNS trigger AS $$
+    BEGIN
+        UPDATE user_list_version SET deletions = deletions + 1 WHERE id = 1;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE TRIGGER user_list_version_on_delete
+    AFTER DELETE ON "user"
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_user_list_version()
+    """,
+)
+# create_all の場合 (user と user_list_version の両方が作成された後に実行する)
+for _statement in USER_LIST_VERSION_DDL:
+    event.listen(
+        SQLModel.metadata,
+        "after_create",
+        DDL(_statement).execute_if(dialect="postgresql"),
+    )
+
+
 class UserPublic(UserBase):
     uuid: str
     created_at: datetime
@@ -93,7 +149,9 @@ class UserPublic(UserBase):
 
 class UsersPublic(SQLModel):
     data: list[UserPublic]
+    # exact_count を指定しない場合はプランナーの推定件数
     count: int
+    next_cursor: str | None = None
 
 
 class PasswordChangeRequest(BaseModel):
@@ -0,0 +1,54 @@
+from datetime import datetime, timezone
+from typing import Any, Optional
+from uuid import UUID, uuid4
+
+from sqlalchemy import JSON, Index
+from sqlmodel import Field, SQLModel
+
+from .types import UTCDateTime
+
+
+class UserImportJobBase(SQLModel):
+    filename: str
+    # queued / running / succeeded / failed / interrupted
+    status: str = Field(default="queued", max_length=20)
+    total_rows: Optional[int] = None
+    processed_rows: int = 0
+    failed_rows: int = 0
+    error: Optional[str] = None
+
+
+class UserImportJob(UserImportJobBase, table=True):
+    __tablename__ = "user_import_job"
+    # 起動時・取得時に未完了のジョブを探すため
+    __table_args__ = (Index("ix_user_import_job_status", "status"),)
+
+    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    failed_users: list[dict[str, Any]] = Field(default_factory=list, sa_type=JSON)
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        nullable=False,
+        sa_type=UTCDateTime,
+    )
+    # 進捗の書き込み時刻 (一定時間更新がない実行中のジョブは中断として扱う)
+    updated_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        nullable=False,
+        sa_type=UTCDateTime,
+    )
+    started_at: Optional[datetime] = Field(default=None, sa_type=UTCDateTime)
+    finished_at: Optional[datetime] = Field(default=None, sa_type=UTCDateTime)
+    # ジョブを受け付けたプロセス (ホスト名:pid) と、そのプロセスが生きていることの最終確認時刻
+    # (アップロードファイルはこのプロセス内にしか無いため、プロセスが止まるとジョブは続行できない)
+    owner: Optional[str] = Field(default=None, max_length=255)
+    heartbeat_at: Optional[datetime] = Field(default=None, sa_type=UTCDateTime)
+
+
+class UserImportJobPublic(UserImportJobBase):
+    id: UUID
+    failed_users: list[dict[str, Any]]
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+    rows_per_second: Optional[float] = None
+    eta_seconds: Optional[float] = None
@@ -0,0 +1,20 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import DateTime
+from sqlalchemy.types import TypeDecorator
+
+
+class UTCDateTime(TypeDecorator):
+    """
+    timestamp without time zone 列に保存する前にタイムゾーン付きの値をUTCの
+    naive datetime に変換する
+    - asyncpg はタイムゾーン付きの値を timestamp 列に渡すとエラーになるため
+    """
+
+    impl = DateTime
+    cache_ok = True
+
+    def process_bind_param(self, value: datetime | None, dialect):
+        if value is not None and value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
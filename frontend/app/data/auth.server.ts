@@ -1,5 +1,15 @@
 import { redirect } from "react-router";
-import type { LoginType, SignUpType, Token, User } from "~/type/auth";
+import type {
+  LoginType,
+  SignUpType,
+  Token,
+  User,
+  UsersPage,
+} from "~/type/auth";
+import {
+  readPrimaryHeaders,
+  readPrimarySetCookie,
+} from "./readPrimary.server";
 import { sessionStorage } from "./session.server";
 
 export async function login({ email, password }: LoginType) {
@@ -122,18 +132,31 @@ export async function signup({ email, username, password }: SignUpType) {
 }
 
 export async function getAllUser(
-  access_token: string | undefined
-): Promise<User[] | undefined> {
-  const res = await fetch(`${process.env.API_ROOT_URL}/api/v1/users/all_user`, {
-    method: "GET",
-    headers: {
-      accept: "application/json",
-      // Authorization: `Bearer ${access_tokem}`,
-    },
-  });
+  request: Request,
+  access_token: string | undefined,
+  { cursor, limit }: { cursor?: string | null; limit?: number } = {}
+): Promise<UsersPage> {
+  // all_user は {data, count, next_cursor} のページ単位で返るため、1ページ分だけ取得する
+  // (続きは next_cursor を cursor に指定して画面側から取得する)
+  const params = new URLSearchParams({ limit: String(limit ?? 100) });
+  if (cursor) {
+    params.set("cursor", cursor);
+  }
+  const res = await fetch(
+    `${process.env.API_ROOT_URL}/api/v1/users/all_user?${params}`,
+    {
+      method: "GET",
+      headers: {
+        accept: "application/json",
+        // Authorization: `Bearer ${access_tokem}`,
+        ...readPrimaryHeaders(request),
+      },
+    }
+  );
 
   if (res.ok) {
-    return res.json();
+    const page: UsersPage = await res.json();
+    return page;
   } else if (res.status === 401) {
     throw new Error("Unauthorized.");
   } else {
@@ -208,7 +231,7 @@ export async function updateUser(
   email: string | undefined,
   is_active: boolean | undefined,
   is_superuser: boolean | undefined
-): Promise<User | undefined> {
+): Promise<{ user: User; headers: Headers } | undefined> {
   const token = await getTokenFromSession(request);
 
   try {
@@ -238,7 +261,8 @@ export async function updateUser(
       throw new Error("Failed to update user data.");
     }
 
-    return res.json();
+    // headers はアクションの応答に付けてブラウザに返す (readPrimary.server.ts)
+    return { user: await res.json(), headers: readPrimarySetCookie(res) };
   } catch (error: unknown) {
     // redirect("/auth/login")
     redirect("/login");
@@ -0,0 +1,25 @@
+// API (ReadYourWritesMiddleware) は書き込み後に read_primary_until の Cookie を返し、
+// それを送ってきたクライアントの読み取りを一定時間プライマリで行う (複数ワーカー間でも有効)。
+// API へのリクエストはブラウザではなくこのサーバーから送るため、
+// - 書き込みの応答の Set-Cookie をブラウザへの応答に付けて中継し
+// - 以降のリクエストで届いた Cookie を API への読み取りに付けて返す
+// (中継しない場合、書き込みを処理したのと別のワーカーがレプリカから古いデータを読むことがある)
+const READ_PRIMARY_COOKIE = "read_primary_until";
+
+export function readPrimaryHeaders(request: Request): Record<string, string> {
+  const cookie = request.headers
+    .get("Cookie")
+    ?.split(/;\s*/)
+    .find((item) => item.startsWith(`${READ_PRIMARY_COOKIE}=`));
+  return cookie ? { Cookie: cookie } : {};
+}
+
+export function readPrimarySetCookie(res: Response): Headers {
+  const headers = new Headers();
+  for (const cookie of res.headers.getSetCookie()) {
+    if (cookie.startsWith(`${READ_PRIMARY_COOKIE}=`)) {
+      headers.append("Set-Cookie", cookie);
+    }
+  }
+  return headers;
+}
@@ -1,6 +1,11 @@
 import type { Todo } from "~/type/todo";
+import {
+  readPrimaryHeaders,
+  readPrimarySetCookie,
+} from "./readPrimary.server";
 
 export async function getAllTodo(
+  request: Request,
   access_token: string | undefined
 ): Promise<Todo[] | undefined> {
   try {
@@ -9,6 +14,7 @@ export async function getAllTodo(
       headers: {
         accept: "application/json",
         // Authorization: `Bearer ${token?.access_token}`
+        ...readPrimaryHeaders(request),
       },
     });
 
@@ -25,6 +31,7 @@ export async function getAllTodo(
 }
 
 export async function getAllTodoByAuthorUuid(
+  request: Request,
   access_token: string | undefined,
   author_uuid: string | undefined
 ): Promise<Todo[] | undefined> {
@@ -36,6 +43,7 @@ export async function getAllTodoByAuthorUuid(
         headers: {
           accept: "application/json",
           // Authorization: `Bearer ${token?.access_token}`
+          ...readPrimaryHeaders(request),
         },
       }
     );
@@ -53,6 +61,7 @@ export async function getAllTodoByAuthorUuid(
 }
 
 export async function getTodoById(
+  request: Request,
   access_token: string | undefined,
   todo_id: string | undefined
 ): Promise<Todo | undefined> {
@@ -64,6 +73,7 @@ export async function getTodoById(
         headers: {
           accept: "application/json",
           // Authorization: `Bearer ${token?.access_token}`
+          ...readPrimaryHeaders(request),
         },
       }
     );
@@ -88,7 +98,7 @@ export async function updateTodo(
   description: string | undefined,
   completed: boolean | undefined,
   limit_date: Date | undefined
-): Promise<Todo | undefined> {
+): Promise<{ todo: Todo; headers: Headers } | undefined> {
   try {
     const res = await fetch(
       `${process.env.API_ROOT_URL}/api/v1/todos/edit/${todo_id}`,
@@ -109,7 +119,8 @@ export async function updateTodo(
     );
 
     if (res.ok) {
-      return res.json();
+      // headers はアクションの応答に付けてブラウザに返す (readPrimary.server.ts)
+      return { todo: await res.json(), headers: readPrimarySetCookie(res) };
     } else if (res.status === 401) {
       throw new Error("Unauthorized");
     } else {
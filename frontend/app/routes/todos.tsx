@@ -4,6 +4,7 @@ import { isBefore } from "date-fns";
 import { getTokenFromSession, requireAccountSession } from "~/data/auth.server";
 import type { Route } from "./+types/todos";
 import { getAllTodo, getAllTodoByAuthorUuid } from "~/data/todo.server";
+import { readPrimarySetCookie } from "~/data/readPrimary.server";
 import type { User } from "~/type/auth";
 import ConfirmDialog from "~/components/ConfirmDialog";
 import TodoSearch from "~/components/TodoSearch";
@@ -34,6 +35,7 @@ export async function loader({ request }: Route.LoaderArgs) {
   if (loginUser.is_superuser) {
     try {
       const todos = await getAllTodo(
+        request,
         token?.access_token
         // loginUser?.uuid
       );
@@ -45,6 +47,7 @@ export async function loader({ request }: Route.LoaderArgs) {
   } else {
     try {
       const todos = await getAllTodoByAuthorUuid(
+        request,
         token?.access_token,
         loginUser?.uuid
       );
@@ -89,7 +92,10 @@ export async function action({ request }: { request: Request }) {
         if (!response.ok) {
           throw new Error(`HTTP error! status: ${response.status}`);
         }
-        return Response.json({ type: "add-success" });
+        return Response.json(
+          { type: "add-success" },
+          { headers: readPrimarySetCookie(response) }
+        );
       }
       case "toggle": {
         const id = formData.get("id");
@@ -108,7 +114,10 @@ export async function action({ request }: { request: Request }) {
         if (!response.ok) {
           throw new Error(`HTTP error! status: ${response.status}`);
         }
-        return Response.json({ type: "toggle-success" });
+        return Response.json(
+          { type: "toggle-success" },
+          { headers: readPrimarySetCookie(response) }
+        );
       }
       case "delete": {
         const id = formData.get("id");
@@ -124,7 +133,8 @@ export async function action({ request }: { request: Request }) {
         if (!response.ok) {
           throw new Error(`HTTP error! status: ${response.status}`);
         }
-        return redirect("/"); // Redirect to revalidate loader data
+        // Redirect to revalidate loader data
+        return redirect("/", { headers: readPrimarySetCookie(response) });
       }
       case "edit": {
         const id = formData.get("id");
@@ -155,8 +165,11 @@ export async function action({ request }: { request: Request }) {
         if (!response.ok) {
           throw new Error(`HTTP error! status: ${response.status}`);
         }
-        // return redirect("/"); // Redirect to revalidate loader data
-        return Response.json({ type: "edit-success" });
+        // fetcher はアクションの後にローダーのデータを再取得するため redirect しない
+        return Response.json(
+          { type: "edit-success" },
+          { headers: readPrimarySetCookie(response) }
+        );
       }
       default:
         throw new Error("Invalid action");
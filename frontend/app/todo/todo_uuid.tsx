@@ -84,7 +84,7 @@ export async function action({ request }: Route.ActionArgs) {
   }
 
   try {
-    await updateTodo(
+    const result = await updateTodo(
       request,
       token?.access_token,
       uuid,
@@ -93,10 +93,13 @@ export async function action({ request }: Route.ActionArgs) {
       completed,
       limit_date
     );
-    return Response.json({
-      success: true,
-      message: "Todoの更新が完了しました。",
-    });
+    return Response.json(
+      {
+        success: true,
+        message: "Todoの更新が完了しました。",
+      },
+      { headers: result?.headers }
+    );
     // redirect(`/user/${uuid}`); // redirectで再読み込み
   } catch (error: unknown) {
     return Response.json({
@@ -109,7 +112,11 @@ export async function action({ request }: Route.ActionArgs) {
 export async function loader({ params, request }: Route.LoaderArgs) {
   const loginUser = await requireAccountSession(request);
   const token = await getTokenFromSession(request);
-  const todo = await getTodoById(token?.access_token, params.todo_uuid);
+  const todo = await getTodoById(
+    request,
+    token?.access_token,
+    params.todo_uuid
+  );
   return { loginUser, todo };
 }
 
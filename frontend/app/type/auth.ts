@@ -31,3 +31,10 @@ export type LoginType = {
   email: string | undefined;
   password: string | undefined;
 };
+
+export type UsersPage = {
+  data: User[];
+  // 推定件数
+  count: number;
+  next_cursor: string | null;
+};
@@ -87,11 +87,21 @@ export async function action({ request }: Route.ActionArgs) {
   }
 
   try {
-    await updateUser(request, uuid, username, email, is_active, is_superuser);
-    return Response.json({
-      success: true,
-      message: "ユーザー情報の更新が完了しました。",
-    });
+    const result = await updateUser(
+      request,
+      uuid,
+      username,
+      email,
+      is_active,
+      is_superuser
+    );
+    return Response.json(
+      {
+        success: true,
+        message: "ユーザー情報の更新が完了しました。",
+      },
+      { headers: result?.headers }
+    );
     // redirect(`/user/${uuid}`); // redirectで再読み込み
   } catch (error: unknown) {
     return Response.json({
@@ -105,6 +115,7 @@ export async function loader({ request }: Route.LoaderArgs) {
   const loginUser = await requireAccountSession(request);
   const token = await getTokenFromSession(request);
   const myTodo = await getAllTodoByAuthorUuid(
+    request,
     token?.access_token,
     loginUser?.uuid
   );
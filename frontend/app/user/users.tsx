@@ -75,11 +75,21 @@ export async function action({ request }: Route.ActionArgs) {
   }
 
   try {
-    await updateUser(request, uuid, username, email, is_active, is_superuser);
-    return Response.json({
-      success: true,
-      message: "ユーザー情報の更新が完了しました。",
-    });
+    const result = await updateUser(
+      request,
+      uuid,
+      username,
+      email,
+      is_active,
+      is_superuser
+    );
+    return Response.json(
+      {
+        success: true,
+        message: "ユーザー情報の更新が完了しました。",
+      },
+      { headers: result?.headers }
+    );
     // redirect(`/user/${uuid}`); // redirectで再読み込み
   } catch (error: unknown) {
     return Response.json({
@@ -89,13 +99,32 @@ export async function action({ request }: Route.ActionArgs) {
   }
 }
 
+const USERS_PAGE_SIZE = 100;
+
 export async function loader({ request }: Route.LoaderArgs) {
   const loginUser = await requireAccountSession(request);
   const token = await getTokenFromSession(request);
 
   if (loginUser?.is_superuser === true) {
-    const users = await getAllUser(token?.access_token);
-    return { loginUser, users };
+    // 1ページ分だけ取得し、続きは「次へ」のリンク (?cursor=...) で取得する
+    const url = new URL(request.url);
+    const cursor = url.searchParams.get("cursor");
+    const limit = Math.min(
+      Math.max(Number(url.searchParams.get("limit")) || USERS_PAGE_SIZE, 1),
+      1000
+    );
+    const page = await getAllUser(request, token?.access_token, {
+      cursor,
+      limit,
+    });
+    return {
+      loginUser,
+      users: page.data,
+      count: page.count,
+      nextCursor: page.next_cursor,
+      isFirstPage: !cursor,
+      limit,
+    };
   } else {
     return redirect("/");
   }
@@ -104,9 +133,17 @@ export async function loader({ request }: Route.LoaderArgs) {
 export default function UserDetail({
   loaderData,
 }: {
-  loaderData: { loginUser: User; users: User[] };
+  loaderData: {
+    loginUser: User;
+    users: User[];
+    count: number;
+    nextCursor: string | null;
+    isFirstPage: boolean;
+    limit: number;
+  };
 }) {
-  const { loginUser, users } = loaderData;
+  const { loginUser, users, count, nextCursor, isFirstPage, limit } =
+    loaderData;
 
   const actionData = useActionData<{ success?: boolean; message: string }>();
 
@@ -134,6 +171,7 @@ export default function UserDetail({
     setQuery(searchParams.get("query") || "");
   }, [searchParams]);
 
+  // 検索は表示中のページ内のユーザーに対して行う
   const filteredUsers = users.filter(
     (user) =>
       user?.username.toLowerCase().includes(query.toLowerCase()) ||
@@ -435,6 +473,27 @@ export default function UserDetail({
           <p>登録されているユーザーはありません。</p>
         </>
       )}
+
+      <div className="flex justify-between items-center mt-6">
+        {isFirstPage ? (
+          <span />
+        ) : (
+          <Link to={`?limit=${limit}`} className="underline">
+            最初のページへ
+          </Link>
+        )}
+        <p className="text-sm text-neutral-500">全 {count} 件 (推定)</p>
+        {nextCursor ? (
+          <Link
+            to={`?${new URLSearchParams({ cursor: nextCursor, limit: String(limit) })}`}
+            className="underline"
+          >
+            次へ
+          </Link>
+        ) : (
+          <span />
+        )}
+      </div>
     </div>
   );
 }
@@ -0,0 +1,68 @@
+// app/routes/todos.tsx の action の確認 (npm test)
+// - Vite (devDependencies) で TypeScript のルートモジュールを読み込み、API への fetch を差し替える
+import assert from "node:assert/strict";
+import { after, before, test } from "node:test";
+import { fileURLToPath } from "node:url";
+import { createServer } from "vite";
+import tsconfigPaths from "vite-tsconfig-paths";
+
+const READ_PRIMARY_SET_COOKIE =
+  "read_primary_until=1792295000; Max-Age=5; Path=/; HttpOnly; SameSite=Lax";
+
+let server;
+let action;
+
+before(async () => {
+  process.env.API_ROOT_URL = "http://api.test";
+  server = await createServer({
+    configFile: false,
+    root: fileURLToPath(new URL("..", import.meta.url)),
+    logLevel: "silent",
+    appType: "custom",
+    server: { middlewareMode: true, hmr: false },
+    plugins: [tsconfigPaths()],
+  });
+  ({ action } = await server.ssrLoadModule("/app/routes/todos.tsx"));
+});
+
+after(async () => {
+  await server?.close();
+});
+
+function formRequest(fields) {
+  return new Request("http://app.test/", {
+    method: "POST",
+    body: new URLSearchParams(fields),
+  });
+}
+
+test("edit returns edit-success and relays the read_primary_until cookie", async (t) => {
+  const calls = [];
+  t.mock.method(globalThis, "fetch", async (url, init) => {
+    calls.push({ url: String(url), init });
+    return new Response("{}", {
+      status: 200,
+      headers: { "Set-Cookie": READ_PRIMARY_SET_COOKIE },
+    });
+  });
+  t.mock.method(console, "log", () => {});
+
+  const response = await action({
+    request: formRequest({
+      _action: "edit",
+      id: "todo-1",
+      title: "title",
+      description: "description",
+      completed: "false",
+      limit_date: "",
+    }),
+  });
+
+  // 編集フォームは fetcher.data の edit-success を受け取って閉じる (redirect では閉じない)
+  assert.equal(response.status, 200);
+  assert.deepEqual(await response.json(), { type: "edit-success" });
+  assert.deepEqual(response.headers.getSetCookie(), [READ_PRIMARY_SET_COOKIE]);
+  assert.equal(calls.length, 1);
+  assert.equal(calls[0].init.method, "PUT");
+  assert.match(calls[0].url, /\/todos\/edit\/todo-1$/);
+});